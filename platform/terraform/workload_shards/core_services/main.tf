@@ -0,0 +1,45 @@
+# Workload shard of the core_services module, copied by CG DevX CLI to terraform/workloads/<workload>/core_services
+# Remote backend configuration is generated to backend.tf
+terraform {
+  required_providers {
+    harbor = {
+      source = "goharbor/harbor"
+    }
+    sonarqube = {
+      source = "jdamata/sonarqube"
+    }
+    vault = {
+      source = "hashicorp/vault"
+    }
+  }
+}
+
+# Credential to harbor provider passed through env variables HARBOR_URL, HARBOR_USERNAME, and HARBOR_PASSWORD
+provider "harbor" {
+}
+
+provider "sonarqube" {
+  user = "admin"
+  pass = var.code_quality_admin_password
+  host = local.code_quality_url
+}
+
+locals {
+  code_quality_url = "https://<CODE_QUALITY_INGRESS_URL>"
+}
+
+module "registry" {
+  source   = "../../../modules/registry_harbor/project"
+  for_each = var.workloads
+
+  project_name = each.key
+  description  = each.value.description
+}
+
+module "code_quality" {
+  source   = "../../../modules/code_quality_sonarqube/project"
+  for_each = var.workloads
+
+  project_name = each.key
+  description  = each.value.description
+}
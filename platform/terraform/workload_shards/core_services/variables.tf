@@ -0,0 +1,12 @@
+variable "code_quality_admin_password" {
+  type      = string
+  sensitive = true
+}
+
+variable "workloads" {
+  description = "Workloads configuration"
+  type = map(object({
+    description = optional(string, "")
+  }))
+  default = {}
+}
@@ -0,0 +1,22 @@
+# Workload shard of the secrets module, copied by CG DevX CLI to terraform/workloads/<workload>/secrets
+# Remote backend configuration is generated to backend.tf
+terraform {
+  required_providers {
+    vault = {
+      source = "hashicorp/vault"
+    }
+  }
+}
+
+# Vault configuration
+provider "vault" {
+  skip_tls_verify = "true"
+}
+
+module "workloads" {
+  source   = "../../../modules/secrets_vault/vault-workload"
+  for_each = var.workloads
+
+  workload_name = each.key
+  description   = each.value.description
+}
@@ -0,0 +1,7 @@
+variable "workloads" {
+  description = "Workloads configuration"
+  type = map(object({
+    description = optional(string, "")
+  }))
+  default = {}
+}
@@ -0,0 +1,29 @@
+# Workload shard of the vcs module, copied by CG DevX CLI to terraform/workloads/<workload>/vcs
+# Remote backend configuration is generated to backend.tf
+terraform {
+  required_providers {
+    # <GIT_REQUIRED_PROVIDER>
+  }
+}
+
+# Configure Git Provider
+# <GIT_PROVIDER_MODULE>
+
+
+locals {
+  atlantis_url   = "https://<IAC_PR_AUTOMATION_INGRESS_URL>/events"
+  cd_webhook_url = "https://<CD_INGRESS_URL>/api/webhook"
+  vcs_owner      = "<GIT_ORGANIZATION_NAME>"
+}
+
+
+module "vcs" {
+  source = "../../../modules/vcs_<GIT_PROVIDER>/workload"
+
+  atlantis_url                 = local.atlantis_url
+  atlantis_repo_webhook_secret = var.atlantis_repo_webhook_secret
+  cd_webhook_url               = local.cd_webhook_url
+  cd_webhook_secret            = var.cd_webhook_secret
+  workloads                    = var.workloads
+  vcs_owner                    = local.vcs_owner
+}
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of Kubernetes list and watch response handling on a synthetic pod list.
+
+Compares deserialization into kubernetes client models with the raw JSON projection used by KubeClient waits and
+pod searches, and checks both read the same names, phases and conditions.
+Usage: python tools/benchmarks/k8s_list_benchmark.py [--pods N] [--repeat N] [--chunk-size BYTES]
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "tools" / "cli"))
+
+from kubernetes import client, watch  # noqa: E402
+
+from services.k8s.projection import project  # noqa: E402
+from services.k8s.resumable_watch import watch_raw  # noqa: E402
+
+PHASES = ("Running", "Pending", "Succeeded")
+
+
+def synthetic_pod(i: int) -> dict:
+    """Pod shaped like a typical Helm chart workload, with two containers, probes, volumes and statuses"""
+    name = f"app-{i % 50}-{i:06d}"
+    containers = [{
+        "name": f"container-{c}",
+        "image": f"registry.example.com/app-{i % 50}:1.{c}.{i % 7}",
+        "args": ["--port=8080", "--log-level=info", f"--shard={i % 16}"],
+        "env": [{"name": f"ENV_{e}", "value": f"value-{e}-{i}"} for e in range(8)],
+        "ports": [{"containerPort": 8080, "name": "http", "protocol": "TCP"}],
+        "resources": {"limits": {"cpu": "500m", "memory": "512Mi"}, "requests": {"cpu": "100m", "memory": "128Mi"}},
+        "readinessProbe": {"httpGet": {"path": "/healthz", "port": 8080, "scheme": "HTTP"}, "periodSeconds": 10},
+        "volumeMounts": [{"mountPath": "/var/run/secrets/kubernetes.io/serviceaccount", "name": "token",
+                          "readOnly": True}],
+    } for c in range(2)]
+    return {
+        "apiVersion": "v1",
+        "kind": "Pod",
+        "metadata": {
+            "name": name,
+            "namespace": "default",
+            "uid": f"00000000-0000-0000-0000-{i:012d}",
+            "resourceVersion": str(1000 + i),
+            "creationTimestamp": "2024-01-01T00:00:00Z",
+            "labels": {"app.kubernetes.io/name": f"app-{i % 50}", "pod-template-hash": f"{i % 997:08x}"},
+            "annotations": {"kubectl.kubernetes.io/restartedAt": "2024-01-01T00:00:00Z"},
+            "ownerReferences": [{"apiVersion": "apps/v1", "kind": "ReplicaSet", "name": f"app-{i % 50}-rs",
+                                 "uid": f"10000000-0000-0000-0000-{i % 50:012d}", "controller": True}],
+        },
+        "spec": {
+            "containers": containers,
+            "nodeName": f"node-{i % 20}",
+            "serviceAccountName": "default",
+            "volumes": [{"name": "token", "projected": {"sources": [{"serviceAccountToken": {"path": "token"}}]}}],
+            "tolerations": [{"effect": "NoExecute", "key": "node.kubernetes.io/not-ready", "operator": "Exists",
+                             "tolerationSeconds": 300}],
+        },
+        "status": {
+            "phase": PHASES[i % len(PHASES)],
+            "hostIP": f"10.0.{i % 20}.1",
+            "podIP": f"10.1.{i // 250 % 250}.{i % 250}",
+            "startTime": "2024-01-01T00:00:00Z",
+            "conditions": [{"type": t, "status": "True" if i % 4 else "False",
+                            "lastTransitionTime": "2024-01-01T00:00:00Z"}
+                           for t in ("Initialized", "Ready", "ContainersReady", "PodScheduled")],
+            "containerStatuses": [{"name": f"container-{c}", "ready": bool(i % 4), "restartCount": i % 3,
+                                   "image": f"registry.example.com/app-{i % 50}:1.{c}.{i % 7}",
+                                   "imageID": f"registry.example.com/app@sha256:{i:064x}",
+                                   "state": {"running": {"startedAt": "2024-01-01T00:00:00Z"}}}
+                                  for c in range(2)],
+        },
+    }
+
+
+class ChunkedResponse:
+    """Stand-in for the urllib3 response of a watch request"""
+
+    def __init__(self, body: bytes, chunk_size: int):
+        self.body = body
+        self.chunk_size = chunk_size
+
+    def stream(self, amt=None, decode_content=None):
+        for start in range(0, len(self.body), self.chunk_size):
+            yield self.body[start:start + self.chunk_size]
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        pass
+
+
+def model_list(body: bytes):
+    pods = client.ApiClient().deserialize(SimpleNamespace(data=body), "V1PodList")
+    return [(pod.metadata.name, pod.status.phase, {c.type: c.status for c in pod.status.conditions or []})
+            for pod in pods.items]
+
+
+def raw_list(body: bytes):
+    return [(view.name, view.phase, view.conditions) for view in map(project, json.loads(body)["items"])]
+
+
+def model_watch(lines):
+    w = watch.Watch()
+    events = [w.unmarshal_event(line, "V1Pod") for line in lines]
+    return [(e["object"].metadata.name, e["object"].status.phase,
+             {c.type: c.status for c in e["object"].status.conditions or []}) for e in events]
+
+
+def raw_watch(body: bytes, chunk_size: int):
+    events = watch_raw(lambda **kwargs: ChunkedResponse(body, chunk_size))
+    return [(view.name, view.phase, view.conditions) for view in (project(e["object"]) for e in events)]
+
+
+def measure(func, repeat, *args):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def peak_memory(func, *args):
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pods", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--chunk-size", type=int, default=16 * 1024)
+    args = parser.parse_args()
+
+    pods = [synthetic_pod(i) for i in range(args.pods)]
+    list_body = json.dumps({"apiVersion": "v1", "kind": "PodList", "metadata": {"resourceVersion": "1"},
+                            "items": pods}).encode()
+    watch_lines = [json.dumps({"type": "MODIFIED", "object": pod}) for pod in pods]
+    watch_body = "\n".join(watch_lines).encode() + b"\n"
+
+    model_list_time, expected = measure(model_list, args.repeat, list_body)
+    raw_list_time, actual = measure(raw_list, args.repeat, list_body)
+    model_watch_time, expected_events = measure(model_watch, args.repeat, watch_lines)
+    raw_watch_time, actual_events = measure(raw_watch, args.repeat, watch_body, args.chunk_size)
+
+    if expected != actual or expected_events != actual_events:
+        print("Raw projection differs from the model path")
+        return 1
+
+    model_list_memory = peak_memory(model_list, list_body)
+    raw_list_memory = peak_memory(raw_list, list_body)
+
+    print(f"pods: {args.pods}, list size: {len(list_body) / 1024 / 1024:.1f} MiB")
+    print(f"list, models:         {model_list_time * 1000:8.1f} ms, peak {model_list_memory / 1024 / 1024:.1f} MiB")
+    print(f"list, raw projection: {raw_list_time * 1000:8.1f} ms, peak {raw_list_memory / 1024 / 1024:.1f} MiB "
+          f"({model_list_time / raw_list_time:.1f}x, {model_list_memory / raw_list_memory:.1f}x less memory)")
+    print(f"watch, models:        {model_watch_time * 1000:8.1f} ms")
+    print(f"watch, raw lines:     {raw_watch_time * 1000:8.1f} ms ({model_watch_time / raw_watch_time:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,10 +3,13 @@
 CG DevX CLI
 """
 
+import multiprocessing
+
 import click
 
 from commands.destroy import destroy
 from commands.setup import setup
+from commands.tools import tools
 from commands.workload.workload import workload
 
 
@@ -18,6 +21,9 @@ def entry_point():
 entry_point.add_command(setup)
 entry_point.add_command(destroy)
 entry_point.add_command(workload)
+entry_point.add_command(tools)
 
 if __name__ == '__main__':
+    # required for process pools in the PyInstaller build
+    multiprocessing.freeze_support()
     entry_point()
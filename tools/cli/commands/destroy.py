@@ -12,8 +12,7 @@ from common.enums.git_providers import GitProviders
 from common.logging_config import configure_logging
 from common.state_store import StateStore
 from common.utils.command_utils import init_cloud_provider, prepare_cloud_provider_auth_env_vars, set_envs, unset_envs, \
-    wait, init_git_provider, check_installation_presence, prepare_git_provider_env_vars
-from common.utils.k8s_utils import find_pod_by_name_fragment
+    wait, init_git_provider, check_installation_presence, prepare_git_provider_env_vars, record_timings
 from services.k8s.delivery_service_manager import DeliveryServiceManager, delete_application_via_k8s_portforward
 from services.k8s.k8s import KubeClient
 from services.platform_gitops import PlatformGitOpsRepo
@@ -27,6 +26,7 @@ urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
     ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'],
     case_sensitive=False
 ), default='CRITICAL', help='Set the verbosity level (DEBUG, INFO, WARNING, ERROR, CRITICAL)')
+@record_timings("destroy")
 def destroy(verbosity: str):
     """Destroy existing CG DevX installation."""
     # Initialize the start time to measure the duration of the platform destruction
@@ -117,11 +117,10 @@ def destroy(verbosity: str):
             pass
         try:
             deletion_wait_time = 300
-            k8s_pod = find_pod_by_name_fragment(
-                kube_config_path=p.internals["KCTL_CONFIG_PATH"],
-                name_fragment="argocd-server",
-                namespace=ARGOCD_NAMESPACE
-            )
+            try:
+                k8s_pod = kube_client.find_running_pod(namespace=ARGOCD_NAMESPACE, name_prefix="argocd-server")
+            finally:
+                kube_client.close()
             # Transitioned to asynchronous functions to address compatibility issues with the kr8s library.
             # Previously, the synchronous interaction with kr8s sometimes led to deadlocks and errors because the kr8s
             # library is inherently asynchronous.
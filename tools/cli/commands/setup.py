@@ -5,17 +5,18 @@ import os
 import socket
 import time
 import webbrowser
-from typing import List
+from functools import partial
+from typing import Dict, List, Tuple
 
 import click
 import hvac
 import yaml
-from alive_progress import alive_bar
 
 from common.const.common_path import LOCAL_TF_FOLDER_VCS, LOCAL_TF_FOLDER_HOSTING_PROVIDER, \
     LOCAL_TF_FOLDER_SECRETS_MANAGER, LOCAL_TF_FOLDER_USERS, LOCAL_TF_FOLDER_CORE_SERVICES
 from common.const.const import GITOPS_REPOSITORY_URL, GITOPS_REPOSITORY_BRANCH, KUBECTL_VERSION, PLATFORM_USER_NAME, \
-    TERRAFORM_VERSION, GITHUB_TF_REQUIRED_PROVIDER_VERSION, GITLAB_TF_REQUIRED_PROVIDER_VERSION
+    TERRAFORM_VERSION, GITHUB_TF_REQUIRED_PROVIDER_VERSION, GITLAB_TF_REQUIRED_PROVIDER_VERSION, \
+    PREFLIGHT_DNS_CHECK_TIMEOUT, K8S_INFORMERS
 from common.versions import (
     ARGOCD_VERSION, ARGO_WORKFLOWS_VERSION, VAULT_VERSION, EXTERNAL_SECRETS_VERSION,
     CERT_MANAGER_VERSION, EXTERNAL_DNS_VERSION, INGRESS_NGINX_VERSION,
@@ -40,12 +41,15 @@ from common.enums.cloud_providers import CloudProviders
 from common.enums.dns_registrars import DnsRegistrars
 from common.enums.git_providers import GitProviders
 from common.logging_config import configure_logging
+from common.preflight_runner import PreflightCheck, run_preflight_checks
+from common.stage_scheduler import Stage, StageScheduler
 from common.state_store import StateStore
 from common.tracing_decorator import trace
 from common.utils.command_utils import init_cloud_provider, init_git_provider, prepare_cloud_provider_auth_env_vars, \
-    set_envs, unset_envs, wait, wait_http_endpoint_readiness, prepare_git_provider_env_vars
+    wait, wait_http_endpoint_readiness, prepare_git_provider_env_vars, record_timings
 from common.utils.generators import random_string_generator
 from common.utils.k8s_utils import find_pod_by_name_fragment
+from common.utils.progress import exclusive_progress_bar
 from common.utils.optional_services_manager import OptionalServices, build_argo_exclude_string
 from services.cloud.cloud_provider_manager import CloudProviderManager
 from services.dependency_manager import DependencyManager
@@ -54,9 +58,10 @@ from services.k8s.config_builder import create_k8s_config, write_k8s_config
 from services.k8s.delivery_service_manager import DeliveryServiceManager, get_argocd_token_via_k8s_portforward
 from services.k8s.k8s import KubeClient, write_ca_cert
 from services.k8s.kctl_wrapper import KctlWrapper
+from services.k8s.readiness import ReadinessTarget, DEPLOYMENT, STATEFUL_SET, INGRESS, POD
 from services.keys.key_manager import KeyManager
 from services.platform_template_manager import GitOpsTemplateManager
-from services.tf_wrapper import TfWrapper
+from services.tf_wrapper import TfWrapper, TF_PROFILE_SETUP, TF_PROFILE_IAM_HEAVY
 from services.vcs.git_provider_manager import GitProviderManager
 
 
@@ -95,18 +100,21 @@ from services.vcs.git_provider_manager import GitProviderManager
 @click.option('--list-checkpoints', is_flag=True, default=False,
               help='List available setup checkpoints and exit')
 @click.option('--from-checkpoint', 'from_checkpoint', type=click.STRING, default=None,
-              help='Restart setup from a checkpoint (clears that checkpoint and all following from local state)')
+              help='Restart setup from a checkpoint (clears that checkpoint and all depending on it from local state)')
+@click.option('--max-parallel-stages', 'max_parallel_stages', type=click.IntRange(min=1), default=4,
+              help='Maximum number of independent setup stages executed concurrently')
 @click.option('--verbosity', type=click.Choice(
     ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'],
     case_sensitive=False
 ), default='CRITICAL', help='Set the verbosity level (DEBUG, INFO, WARNING, ERROR, CRITICAL)')
+@record_timings("setup")
 def setup(
         email: str, cloud_provider: CloudProviders, cloud_profile: str, cloud_key: str, cloud_secret: str,
         cloud_region: str, cluster_name: str, dns_reg: DnsRegistrars, dns_reg_token: str,
         dns_reg_key: str, dns_reg_secret: str, domain: str, git_provider: GitProviders, git_org: str, git_token: str,
         gitops_repo_name: str, gitops_template_url: str, gitops_template_branch: str, install_demo: bool,
         optional_services: List[str], image_registry_auth, config: click.File,
-        list_checkpoints: bool, from_checkpoint: str | None, verbosity: str
+        list_checkpoints: bool, from_checkpoint: str | None, max_parallel_stages: int, verbosity: str
 ):
     """Creates new CG DevX installation."""
     click.echo("Setup CG DevX installation...")
@@ -116,21 +124,9 @@ def setup(
     # Set up global logger
     configure_logging(verbosity)
 
-    available_checkpoints = [
-        "preflight",
-        "dependencies",
-        "one-time-setup",
-        "repo-prep",
-        "vcs-tf",
-        "k8s-tf",
-        "gitops-vcs",
-        "k8s-delivery",
-        "secrets-management",
-        "secrets-management-tf",
-        "users-tf",
-        "core-services-tf",
-        "tf-store-hardening",
-    ]
+    # stage graph with unbound stages, used to resolve checkpoints before providers are initialised
+    stage_graph = StageScheduler(build_setup_stages())
+    available_checkpoints = stage_graph.checkpoints
 
     if list_checkpoints:
         for c in available_checkpoints:
@@ -183,7 +179,7 @@ def setup(
             raise click.ClickException(
                 f"Unknown checkpoint '{from_checkpoint}'. Use --list-checkpoints to see available checkpoints."
             )
-        p.remove_checkpoints_from(from_checkpoint, inclusive=True)
+        p.remove_checkpoints(stage_graph.downstream(from_checkpoint))
         p.save_checkpoint()
 
     # validate parameters
@@ -241,74 +237,7 @@ def setup(
                         fg="yellow",
                     )
 
-    if not p.has_checkpoint("preflight"):
-        click.echo("1/12: Executing pre-flight checks...")
-
-        cloud_provider_check(cloud_man, p)
-        click.echo("Cloud provider pre-flight check. Done!")
-
-        git_provider_check(git_man, p)
-        click.echo("Git provider pre-flight check. Done!")
-
-        git_user_login, git_user_name, git_user_email = git_man.get_current_user_info()
-        p.internals["GIT_USER_LOGIN"] = git_user_login
-        p.parameters["<GIT_USER_LOGIN>"] = git_user_login
-        p.internals["GIT_USER_NAME"] = git_user_name
-        p.parameters["<GIT_USER_NAME>"] = git_user_name
-        p.internals["GIT_USER_EMAIL"] = git_user_email
-        p.parameters["<GIT_USER_EMAIL>"] = git_user_email
-        p.fragments["# <GIT_PROVIDER_MODULE>"] = git_man.create_tf_module_snippet()
-        p.fragments["# <GIT_REQUIRED_PROVIDER>"] = git_man.create_tf_required_provider_snippet()
-        p.parameters["<GITHUB_PROVIDER_VERSION>"] = GITHUB_TF_REQUIRED_PROVIDER_VERSION
-        p.parameters["<GITLAB_PROVIDER_VERSION>"] = GITLAB_TF_REQUIRED_PROVIDER_VERSION
-
-        git_subscription_plan = git_man.get_organization_plan()
-        p.parameters["<GIT_SUBSCRIPTION_PLAN>"] = str(bool(git_subscription_plan)).lower()
-        if git_subscription_plan > 0:
-            p.fragments["# <GIT_RUNNER_GROUP>"] = git_man.create_runner_group_snippet()
-            p.parameters["<GIT_RUNNER_GROUP_NAME>"] = p.get_input_param(PRIMARY_CLUSTER_NAME)
-        else:
-            # match the GitHub's default runner group
-            p.parameters["<GIT_RUNNER_GROUP_NAME>"] = "Default"
-
-        dns_provider_check(dns_man, p)
-        click.echo("DNS provider pre-flight check. Done!")
-
-        p.set_checkpoint("preflight")
-        p.save_checkpoint()
-        click.echo("1/12: Pre-flight checks. Done!")
-
-    # end preflight check section
-    else:
-        click.echo("1/12: Skipped pre-flight checks.")
-    dep_man: DependencyManager = DependencyManager()
-
-    if not p.has_checkpoint("dependencies"):
-        click.echo("2/12: Dependencies check...")
-
-        # terraform
-        if dep_man.check_tf():
-            click.echo("tf is installed. Continuing...")
-        else:
-            click.echo("Downloading and installing tf...")
-            dep_man.install_tf()
-            click.echo("tf is installed.")
-
-        # kubectl
-        if dep_man.check_kubectl():
-            click.echo("kubectl is installed. Continuing...")
-        else:
-            click.echo("Downloading and installing kubectl...")
-            dep_man.install_kubectl()
-            click.echo("kubectl is installed.")
-
-        click.echo("2/12: Dependencies check. Done!")
-        p.set_checkpoint("dependencies")
-        p.save_checkpoint()
-    else:
-        click.echo("2/12: Skipped dependencies check.")
-
-    # promote input params
+    # promote input params, done before the stage graph as every stage relies on them
     prepare_parameters(p, git_man)
     p.save_checkpoint()
 
@@ -370,255 +299,377 @@ def setup(
                                p.get_input_param(GITOPS_REPOSITORY_TEMPLATE_BRANCH),
                                p.get_input_param(GIT_ACCESS_TOKEN))
 
-    if not p.has_checkpoint("one-time-setup"):
-        click.echo("3/12: Setting initial parameters...")
-
-        # create ssh keys
-        click.echo("Generating ssh keys...")
-        default_public_key, public_key_path, default_private_key, private_key_path = KeyManager.create_ed_keys()
-        p.internals["DEFAULT_SSH_PUBLIC_KEY"] = p.parameters["<VCS_BOT_SSH_PUBLIC_KEY>"] = default_public_key
-        p.internals["DEFAULT_SSH_PUBLIC_KEY_PATH"] = public_key_path
-        p.internals["DEFAULT_SSH_PRIVATE_KEY"] = default_private_key
-        p.internals["DEFAULT_SSH_PRIVATE_KEY_PATH"] = private_key_path
-
-        # Optional K8s cluster keys
-        k8s_public_key, k8s_public_key_path, k8s_private_key, k8s_private_key_path = KeyManager.create_rsa_keys(
-            "cgdevx_k8s_rsa")
-        p.parameters["<CC_CLUSTER_SSH_PUBLIC_KEY>"] = k8s_public_key
-        p.internals["CLUSTER_SSH_PUBLIC_KEY_PATH"] = k8s_public_key_path
-        p.internals["CLUSTER_SSH_PRIVATE_KEY"] = k8s_private_key
-        p.internals["CLUSTER_SSH_PRIVATE_KEY_PATH"] = k8s_private_key_path
-
-        click.echo("Generating ssh keys. Done!")
-
-        # create terraform storage backend
-        click.echo("Creating tf backend storage...")
-
-        tf_backend_storage, key = cloud_man.create_iac_state_storage(p.get_input_param(GITOPS_REPOSITORY_NAME))
-        p.internals["TF_BACKEND_STORAGE_ACCESS_KEY"] = key
-        p.internals["TF_BACKEND_STORAGE_NAME"] = tf_backend_storage
-
-        p.fragments["# <TF_VCS_REMOTE_BACKEND>"] = cloud_man.create_iac_backend_snippet(tf_backend_storage,
-                                                                                        "vcs")
-        p.fragments["# <TF_HOSTING_REMOTE_BACKEND>"] = cloud_man.create_iac_backend_snippet(tf_backend_storage,
-                                                                                            "hosting_provider")
-        p.fragments["# <TF_SECRETS_REMOTE_BACKEND>"] = cloud_man.create_iac_backend_snippet(tf_backend_storage,
-                                                                                            "secrets")
-        p.fragments["# <TF_USERS_REMOTE_BACKEND>"] = cloud_man.create_iac_backend_snippet(tf_backend_storage,
-                                                                                          "users")
-        p.fragments["# <TF_CORE_SERVICES_REMOTE_BACKEND>"] = cloud_man.create_iac_backend_snippet(tf_backend_storage,
-                                                                                                  "core_services")
-
-        p.fragments["# <TF_HOSTING_PROVIDER>"] = cloud_man.create_hosting_provider_snippet()
-
-        p.fragments["# <CLOUD_PROVIDER_IAC_PR_AUTOMATION_CONFIG>"] = cloud_man.create_iac_pr_automation_config_snippet()
-        p.fragments["# <VCS_IAC_PR_AUTOMATION_CONFIG>"] = git_man.create_iac_pr_automation_config_snippet()
-
-        p.parameters["<K8S_ROLE_MAPPING>"] = cloud_man.create_k8s_cluster_role_mapping_snippet()
-
-        p.fragments["# <VELERO_CLOUD_PROVIDER_SPECIFIC_SNIPPET>"] = cloud_man.create_velero_config_snippet()
-
-        p.fragments["# <ADDITIONAL_LABELS>"] = cloud_man.create_additional_labels()
-        p.fragments["# <BASE_ADDITIONAL_ANNOTATIONS>"] = cloud_man.create_additional_labels()
-        p.fragments["# <INGRESS_ANNOTATIONS>"] = cloud_man.create_ingress_annotations()
-        p.fragments["# <SIDECAR_ANNOTATION>"] = cloud_man.create_sidecar_annotation()
-
-        p.fragments["# <KUBECOST_CLOUD_PROVIDER_CONFIGURATION>"] = cloud_man.create_kubecost_annotation()
-        p.fragments["# <GPU_OPERATOR_ADDITIONAL_PARAMETERS>"] = cloud_man.create_gpu_operator_parameters()
-
-        # dns zone info for external dns
-        dns_zone_name, is_dns_zone_private = dns_man.get_domain_zone(p.parameters["<DOMAIN_NAME>"])
-        p.internals["DNS_ZONE_NAME"] = dns_zone_name
-        p.internals["DNS_ZONE_IS_PRIVATE"] = is_dns_zone_private
-
-        p.fragments["# <EXTERNAL_DNS_ADDITIONAL_CONFIGURATION>"] = cloud_man.create_external_secrets_config(
-            location=dns_zone_name, is_private=is_dns_zone_private
-        )
+    # independent stages are executed concurrently, see build_setup_stages for the dependency graph
+    scheduler = StageScheduler(
+        build_setup_stages(p, cloud_man, git_man, dns_man, tm),
+        max_workers=max_parallel_stages
+    )
+    scheduler.run(p)
 
-        click.echo("Creating tf backend storage. Done!")
+    show_credentials(p)
 
-        p.set_checkpoint("one-time-setup")
-        p.save_checkpoint()
-        click.echo("3/12: Setting initial parameters. Done!")
+    # Calculate the total seconds elapsed
+    total_seconds = time.time() - func_start_time
 
-    # end preflight check section
+    # Use divmod to separate the total seconds into minutes and seconds
+    minutes, seconds = divmod(total_seconds, 60)
+
+    # Display the result with minutes as integers and seconds with two decimal places
+    click.echo(f"Platform setup completed in {int(minutes)} minutes, {int(seconds)} seconds")
+
+    return True
+
+
+def build_setup_stages(p: StateStore = None, cloud_man: CloudProviderManager = None,
+                       git_man: GitProviderManager = None, dns_man: DNSManager = None,
+                       tm: GitOpsTemplateManager = None) -> List[Stage]:
+    """
+    Setup stage dependency graph. Stage names are the setup checkpoints.
+    Stages are bound to the provided managers; graph could be built without them to inspect checkpoints only.
+
+    Args:
+        p: State store
+        cloud_man: Cloud provider manager
+        git_man: Git provider manager
+        dns_man: DNS provider manager
+        tm: GitOps template manager
+
+    Returns:
+        List of stages in the reference (sequential) order.
+    """
+    return [
+        Stage("preflight", partial(preflight_stage, p, cloud_man, git_man, dns_man),
+              skip_message="1/12: Skipped pre-flight checks."),
+        Stage("dependencies", dependencies_stage,
+              skip_message="2/12: Skipped dependencies check."),
+        Stage("one-time-setup", partial(one_time_setup_stage, p, cloud_man, git_man, dns_man),
+              depends_on=["preflight"],
+              skip_message="3/12: Skipped setting initial parameters."),
+        # GitOps generation must be idempotent, template is always re-cloned and re-built
+        Stage("repo-prep", partial(repo_prep_stage, p, tm), always_run=True),
+        # Always (re)parametrise templates using current state/inputs.
+        # This prevents stale placeholders when repo-prep checkpoint exists.
+        Stage("repo-render", partial(repo_render_stage, p, tm), depends_on=["repo-prep", "one-time-setup"],
+              always_run=True, checkpoint=False),
+        Stage("vcs-tf", partial(vcs_tf_stage, p), depends_on=["repo-render", "dependencies"],
+              skip_message="5/12: Skipped VCS provisioning."),
+        Stage("k8s-tf", partial(k8s_tf_stage, p, cloud_man), depends_on=["repo-render", "dependencies"],
+              skip_message="6/12: Skipped K8s provisioning."),
+        # Always ensure GitOps repo content is up-to-date (idempotent).
+        Stage("gitops-vcs", partial(gitops_vcs_stage, p, tm), depends_on=["vcs-tf", "k8s-tf"], always_run=True),
+        Stage("k8s-delivery", partial(k8s_delivery_stage, p, cloud_man), depends_on=["gitops-vcs"],
+              skip_message="8/12: Skipped ArgoCD installation."),
+        Stage("secrets-management", partial(secrets_management_stage, p, cloud_man), depends_on=["k8s-delivery"],
+              skip_message="9/12: Skipped Secrets Manager initialization."),
+        Stage("secrets-management-tf", partial(secrets_management_tf_stage, p, cloud_man),
+              depends_on=["secrets-management"],
+              skip_message="10/12: Skipped setting Secrets."),
+        Stage("users-tf", partial(users_tf_stage, p), depends_on=["secrets-management-tf"],
+              skip_message="11/12: Skipped provisioning Users."),
+        Stage("core-services-tf", partial(core_services_tf_stage, p, cloud_man), depends_on=["secrets-management-tf"],
+              skip_message="12/12: Skipped core services configuration."),
+        Stage("tf-store-hardening", partial(tf_store_hardening_stage, p, cloud_man),
+              depends_on=["users-tf", "core-services-tf"]),
+    ]
+
+
+@trace()
+def preflight_stage(p: StateStore, cloud_man: CloudProviderManager, git_man: GitProviderManager, dns_man: DNSManager):
+    click.echo("1/12: Executing pre-flight checks...")
+
+    # checks are independent network round-trips, run them concurrently and report all failures at once
+    results = run_preflight_checks([
+        PreflightCheck("cloud-provider", partial(cloud_provider_check, cloud_man, p),
+                       done_message="Cloud provider pre-flight check. Done!"),
+        PreflightCheck("git-provider", partial(git_provider_check, git_man, p),
+                       done_message="Git provider pre-flight check. Done!"),
+        PreflightCheck("git-user-info", git_man.get_current_user_info),
+        PreflightCheck("git-organization-plan", git_man.get_organization_plan),
+        PreflightCheck("dns-provider", partial(dns_provider_check, dns_man, p), timeout=PREFLIGHT_DNS_CHECK_TIMEOUT,
+                       done_message="DNS provider pre-flight check. Done!"),
+    ])
+
+    git_user_login, git_user_name, git_user_email = results["git-user-info"]
+    p.internals["GIT_USER_LOGIN"] = git_user_login
+    p.parameters["<GIT_USER_LOGIN>"] = git_user_login
+    p.internals["GIT_USER_NAME"] = git_user_name
+    p.parameters["<GIT_USER_NAME>"] = git_user_name
+    p.internals["GIT_USER_EMAIL"] = git_user_email
+    p.parameters["<GIT_USER_EMAIL>"] = git_user_email
+    p.fragments["# <GIT_PROVIDER_MODULE>"] = git_man.create_tf_module_snippet()
+    p.fragments["# <GIT_REQUIRED_PROVIDER>"] = git_man.create_tf_required_provider_snippet()
+    p.parameters["<GITHUB_PROVIDER_VERSION>"] = GITHUB_TF_REQUIRED_PROVIDER_VERSION
+    p.parameters["<GITLAB_PROVIDER_VERSION>"] = GITLAB_TF_REQUIRED_PROVIDER_VERSION
+
+    git_subscription_plan = results["git-organization-plan"]
+    p.parameters["<GIT_SUBSCRIPTION_PLAN>"] = str(bool(git_subscription_plan)).lower()
+    if git_subscription_plan > 0:
+        p.fragments["# <GIT_RUNNER_GROUP>"] = git_man.create_runner_group_snippet()
+        p.parameters["<GIT_RUNNER_GROUP_NAME>"] = p.get_input_param(PRIMARY_CLUSTER_NAME)
     else:
-        click.echo("3/12: Skipped setting initial parameters.")
+        # match the GitHub's default runner group
+        p.parameters["<GIT_RUNNER_GROUP_NAME>"] = "Default"
+
+    click.echo("1/12: Pre-flight checks. Done!")
+
 
+@trace()
+def dependencies_stage():
+    dep_man: DependencyManager = DependencyManager()
+
+    click.echo("2/12: Dependencies check...")
+
+    # terraform
+    if dep_man.check_tf():
+        click.echo("tf is installed. Continuing...")
+    else:
+        click.echo("Downloading and installing tf...")
+        dep_man.install_tf()
+        click.echo("tf is installed.")
+
+    # kubectl
+    if dep_man.check_kubectl():
+        click.echo("kubectl is installed. Continuing...")
+    else:
+        click.echo("Downloading and installing kubectl...")
+        dep_man.install_kubectl()
+        click.echo("kubectl is installed.")
+
+    click.echo("2/12: Dependencies check. Done!")
+
+
+@trace()
+def one_time_setup_stage(p: StateStore, cloud_man: CloudProviderManager, git_man: GitProviderManager, dns_man: DNSManager):
+    click.echo("3/12: Setting initial parameters...")
+
+    # create ssh keys
+    click.echo("Generating ssh keys...")
+    default_public_key, public_key_path, default_private_key, private_key_path = KeyManager.create_ed_keys()
+    p.internals["DEFAULT_SSH_PUBLIC_KEY"] = p.parameters["<VCS_BOT_SSH_PUBLIC_KEY>"] = default_public_key
+    p.internals["DEFAULT_SSH_PUBLIC_KEY_PATH"] = public_key_path
+    p.internals["DEFAULT_SSH_PRIVATE_KEY"] = default_private_key
+    p.internals["DEFAULT_SSH_PRIVATE_KEY_PATH"] = private_key_path
+
+    # Optional K8s cluster keys
+    k8s_public_key, k8s_public_key_path, k8s_private_key, k8s_private_key_path = KeyManager.create_rsa_keys(
+        "cgdevx_k8s_rsa")
+    p.parameters["<CC_CLUSTER_SSH_PUBLIC_KEY>"] = k8s_public_key
+    p.internals["CLUSTER_SSH_PUBLIC_KEY_PATH"] = k8s_public_key_path
+    p.internals["CLUSTER_SSH_PRIVATE_KEY"] = k8s_private_key
+    p.internals["CLUSTER_SSH_PRIVATE_KEY_PATH"] = k8s_private_key_path
+
+    click.echo("Generating ssh keys. Done!")
+
+    # create terraform storage backend
+    click.echo("Creating tf backend storage...")
+
+    tf_backend_storage, key = cloud_man.create_iac_state_storage(p.get_input_param(GITOPS_REPOSITORY_NAME))
+    p.internals["TF_BACKEND_STORAGE_ACCESS_KEY"] = key
+    p.internals["TF_BACKEND_STORAGE_NAME"] = tf_backend_storage
+
+    p.fragments["# <TF_VCS_REMOTE_BACKEND>"] = cloud_man.create_iac_backend_snippet(tf_backend_storage,
+                                                                                    "vcs")
+    p.fragments["# <TF_HOSTING_REMOTE_BACKEND>"] = cloud_man.create_iac_backend_snippet(tf_backend_storage,
+                                                                                        "hosting_provider")
+    p.fragments["# <TF_SECRETS_REMOTE_BACKEND>"] = cloud_man.create_iac_backend_snippet(tf_backend_storage,
+                                                                                        "secrets")
+    p.fragments["# <TF_USERS_REMOTE_BACKEND>"] = cloud_man.create_iac_backend_snippet(tf_backend_storage,
+                                                                                      "users")
+    p.fragments["# <TF_CORE_SERVICES_REMOTE_BACKEND>"] = cloud_man.create_iac_backend_snippet(tf_backend_storage,
+                                                                                              "core_services")
+
+    p.fragments["# <TF_HOSTING_PROVIDER>"] = cloud_man.create_hosting_provider_snippet()
+
+    p.fragments["# <CLOUD_PROVIDER_IAC_PR_AUTOMATION_CONFIG>"] = cloud_man.create_iac_pr_automation_config_snippet()
+    p.fragments["# <VCS_IAC_PR_AUTOMATION_CONFIG>"] = git_man.create_iac_pr_automation_config_snippet()
+
+    p.parameters["<K8S_ROLE_MAPPING>"] = cloud_man.create_k8s_cluster_role_mapping_snippet()
+
+    p.fragments["# <VELERO_CLOUD_PROVIDER_SPECIFIC_SNIPPET>"] = cloud_man.create_velero_config_snippet()
+
+    p.fragments["# <ADDITIONAL_LABELS>"] = cloud_man.create_additional_labels()
+    p.fragments["# <BASE_ADDITIONAL_ANNOTATIONS>"] = cloud_man.create_additional_labels()
+    p.fragments["# <INGRESS_ANNOTATIONS>"] = cloud_man.create_ingress_annotations()
+    p.fragments["# <SIDECAR_ANNOTATION>"] = cloud_man.create_sidecar_annotation()
+
+    p.fragments["# <KUBECOST_CLOUD_PROVIDER_CONFIGURATION>"] = cloud_man.create_kubecost_annotation()
+    p.fragments["# <GPU_OPERATOR_ADDITIONAL_PARAMETERS>"] = cloud_man.create_gpu_operator_parameters()
+
+    # dns zone info for external dns
+    dns_zone_name, is_dns_zone_private = dns_man.get_domain_zone(p.parameters["<DOMAIN_NAME>"])
+    p.internals["DNS_ZONE_NAME"] = dns_zone_name
+    p.internals["DNS_ZONE_IS_PRIVATE"] = is_dns_zone_private
+
+    p.fragments["# <EXTERNAL_DNS_ADDITIONAL_CONFIGURATION>"] = cloud_man.create_external_secrets_config(
+        location=dns_zone_name, is_private=is_dns_zone_private
+    )
+
+    click.echo("Creating tf backend storage. Done!")
+
+    click.echo("3/12: Setting initial parameters. Done!")
+
+
+@trace()
+def repo_prep_stage(p: StateStore, tm: GitOpsTemplateManager):
     # GitOps generation must be idempotent.
     #
     # Rationale: when resuming from checkpoints, the local GitOps folder may contain stale content
-    # (or may not exist at all). If we don't re-clone & re-build from the template, we can end up
-    # pushing "old code" into the target GitOps repo, and ArgoCD will correctly sync that old code.
+    # (or may not exist at all). The template is always re-cloned and re-indexed, and the folder is re-rendered
+    # from it. Rendered files are kept between runs and tracked in the render manifest: files dropped from the
+    # template are removed on re-render, files not recorded in the manifest are never pushed, and the folder is
+    # cleaned when there is no manifest. Otherwise we could push "old code" into the target GitOps repo,
+    # and ArgoCD would correctly sync that old code.
     click.echo("4/12: Preparing your GitOps code...")
     tm.check_repository_existence()
     tm.clone()
     tm.build_repo_from_template(p.git_provider)
 
-    if not p.has_checkpoint("repo-prep"):
-        p.set_checkpoint("repo-prep")
-        p.save_checkpoint()
-
     click.echo("4/12: Preparing your GitOps code. Done!")
 
-    # Always (re)parametrise templates using current state/inputs.
-    # This prevents stale placeholders when repo-prep checkpoint exists.
-    tm.parametrise_tf(p)
-
-    # VCS provisioning
-    cloud_provider_auth_env_vars = prepare_cloud_provider_auth_env_vars(p)
-    git_provider_env_vars = prepare_git_provider_env_vars(p)
-
-    # VCS section
-    if not p.has_checkpoint("vcs-tf"):
-        click.echo("5/12: Provisioning VCS...")
-        # vcs env vars
-        vcs_tf_env_vars = {
-            **cloud_provider_auth_env_vars,
-            **git_provider_env_vars
-        }
-
-        # set envs as required by tf
-        set_envs(vcs_tf_env_vars)
 
-        tf_wrapper = TfWrapper(LOCAL_TF_FOLDER_VCS)
-        tf_wrapper.init()
-        tf_wrapper.apply({"atlantis_repo_webhook_secret": p.parameters["<IAC_PR_AUTOMATION_WEBHOOK_SECRET>"],
-                          "cd_webhook_secret": p.parameters["<CD_PUSH_EVENT_WEBHOOK_SECRET>"],
-                          "vcs_bot_ssh_public_key": p.parameters["<VCS_BOT_SSH_PUBLIC_KEY>"]})
-        vcs_out = tf_wrapper.output()
+@trace()
+def repo_render_stage(p: StateStore, tm: GitOpsTemplateManager):
+    unresolved = tm.parametrise_tf(p)
+    warn_unresolved_placeholders(unresolved, "Terraform")
 
-        # store out params
-        p.parameters["<GIT_REPOSITORY_GIT_URL>"] = vcs_out["gitops_repo_ssh_clone_url"]
-        p.parameters["<GIT_REPOSITORY_URL>"] = vcs_out["gitops_repo_html_url"]
-        p.internals["VCS_RUNNER_TOKEN"] = vcs_out["vcs_runner_token"]
 
-        # unset envs as no longer needed
-        unset_envs(vcs_tf_env_vars)
+@trace()
+def vcs_tf_stage(p: StateStore):
+    click.echo("5/12: Provisioning VCS...")
+    # vcs env vars
+    vcs_tf_env_vars = {
+        **prepare_cloud_provider_auth_env_vars(p),
+        **prepare_git_provider_env_vars(p)
+    }
+
+    # envs are passed to tf process only, as stages could run concurrently
+    tf_wrapper = TfWrapper(LOCAL_TF_FOLDER_VCS, env=vcs_tf_env_vars, profile=TF_PROFILE_SETUP)
+    tf_wrapper.init()
+    tf_wrapper.apply({"atlantis_repo_webhook_secret": p.parameters["<IAC_PR_AUTOMATION_WEBHOOK_SECRET>"],
+                      "cd_webhook_secret": p.parameters["<CD_PUSH_EVENT_WEBHOOK_SECRET>"],
+                      "vcs_bot_ssh_public_key": p.parameters["<VCS_BOT_SSH_PUBLIC_KEY>"]})
+    vcs_out = tf_wrapper.output()
+
+    # store out params
+    p.parameters["<GIT_REPOSITORY_GIT_URL>"] = vcs_out["gitops_repo_ssh_clone_url"]
+    p.parameters["<GIT_REPOSITORY_URL>"] = vcs_out["gitops_repo_html_url"]
+    p.internals["VCS_RUNNER_TOKEN"] = vcs_out["vcs_runner_token"]
+
+    click.echo("5/12: Provisioning VCS. Done!")
 
-        p.set_checkpoint("vcs-tf")
-        p.save_checkpoint()
 
-        click.echo("5/12: Provisioning VCS. Done!")
-    else:
-        click.echo("5/12: Skipped VCS provisioning.")
+@trace()
+def k8s_tf_stage(p: StateStore, cloud_man: CloudProviderManager):
+    click.echo("6/12: Provisioning K8s cluster...")
 
-    # K8s Cluster section
-    if not p.has_checkpoint("k8s-tf"):
-        click.echo("6/12: Provisioning K8s cluster...")
+    cloud_provider_auth_env_vars = prepare_cloud_provider_auth_env_vars(p)
 
-        # run hosting provider tf to create K8s cluster
-        hp_tf_env_vars = {
-            **{},  # add vars here
-            **cloud_provider_auth_env_vars
-        }
-        # set envs as required by tf
-        set_envs(hp_tf_env_vars)
-
-        tf_wrapper = TfWrapper(LOCAL_TF_FOLDER_HOSTING_PROVIDER)
-        tf_wrapper.init()
-        tf_wrapper.apply({"cluster_ssh_public_key": p.parameters.get("<CC_CLUSTER_SSH_PUBLIC_KEY>", "")})
-        hp_out = tf_wrapper.output()
-
-        # store out params
-        # network
-        p.parameters["<NETWORK_ID>"] = hp_out["network_id"]
-
-        # roles - helper to avoid KeyError on missing outputs
-        def get_role(key: str, placeholder: str) -> str:
-            value = hp_out.get(key)
-            if not value:
-                click.secho(f"Warning: Terraform output '{key}' not found, '{placeholder}' will be empty", fg="yellow")
-                return ""
-            return value
-
-        p.parameters["<CI_IAM_ROLE_RN>"] = get_role("ci_role", "<CI_IAM_ROLE_RN>")
-        p.parameters["<IAC_PR_AUTOMATION_IAM_ROLE_RN>"] = get_role("iac_pr_automation_role", "<IAC_PR_AUTOMATION_IAM_ROLE_RN>")
-        p.parameters["<CERT_MANAGER_IAM_ROLE_RN>"] = get_role("cert_manager_role", "<CERT_MANAGER_IAM_ROLE_RN>")
-        p.parameters["<EXTERNAL_DNS_IAM_ROLE_RN>"] = get_role("external_dns_role", "<EXTERNAL_DNS_IAM_ROLE_RN>")
-        p.parameters["<SECRET_MANAGER_IAM_ROLE_RN>"] = get_role("secret_manager_role", "<SECRET_MANAGER_IAM_ROLE_RN>")
-        p.parameters["<CLUSTER_AUTOSCALER_IAM_ROLE_RN>"] = get_role("cluster_autoscaler_role", "<CLUSTER_AUTOSCALER_IAM_ROLE_RN>")
-        p.parameters["<BACKUPS_MANAGER_IAM_ROLE_RN>"] = get_role("backups_manager_role", "<BACKUPS_MANAGER_IAM_ROLE_RN>")
-        p.parameters["<ALB_CONTROLLER_IRSA_ROLE_ARN>"] = get_role("alb_controller_role", "<ALB_CONTROLLER_IRSA_ROLE_ARN>")
-
-        # cluster
-        p.internals["CC_CLUSTER_ENDPOINT"] = hp_out["cluster_endpoint"]
-        p.internals["CC_CLUSTER_CA_CERT_DATA"] = hp_out["cluster_certificate_authority_data"]
-        p.internals["CC_CLUSTER_CA_CERT_PATH"] = write_ca_cert(hp_out["cluster_certificate_authority_data"])
-        p.internals["CC_CLUSTER_OIDC_ISSUER_URL"] = hp_out["cluster_oidc_issuer_url"]
-
-        # generate cluster autoscaler config here as it could depend on node groups configuration
-        p.fragments["# <K8S_AUTOSCALER>"] = cloud_man.create_autoscaler_snippet(
-            p.parameters["<PRIMARY_CLUSTER_NAME>"],
-            hp_out["cluster_node_groups"]
-        )
+    # run hosting provider tf to create K8s cluster
+    hp_tf_env_vars = {
+        **{},  # add vars here
+        **cloud_provider_auth_env_vars
+    }
+
+    tf_wrapper = TfWrapper(LOCAL_TF_FOLDER_HOSTING_PROVIDER, env=hp_tf_env_vars, profile=TF_PROFILE_IAM_HEAVY)
+    tf_wrapper.init()
+    tf_wrapper.apply({"cluster_ssh_public_key": p.parameters.get("<CC_CLUSTER_SSH_PUBLIC_KEY>", "")})
+    hp_out = tf_wrapper.output()
+
+    # store out params
+    # network
+    p.parameters["<NETWORK_ID>"] = hp_out["network_id"]
+
+    # roles - helper to avoid KeyError on missing outputs
+    def get_role(key: str, placeholder: str) -> str:
+        value = hp_out.get(key)
+        if not value:
+            click.secho(f"Warning: Terraform output '{key}' not found, '{placeholder}' will be empty", fg="yellow")
+            return ""
+        return value
+
+    p.parameters["<CI_IAM_ROLE_RN>"] = get_role("ci_role", "<CI_IAM_ROLE_RN>")
+    p.parameters["<IAC_PR_AUTOMATION_IAM_ROLE_RN>"] = get_role("iac_pr_automation_role", "<IAC_PR_AUTOMATION_IAM_ROLE_RN>")
+    p.parameters["<CERT_MANAGER_IAM_ROLE_RN>"] = get_role("cert_manager_role", "<CERT_MANAGER_IAM_ROLE_RN>")
+    p.parameters["<EXTERNAL_DNS_IAM_ROLE_RN>"] = get_role("external_dns_role", "<EXTERNAL_DNS_IAM_ROLE_RN>")
+    p.parameters["<SECRET_MANAGER_IAM_ROLE_RN>"] = get_role("secret_manager_role", "<SECRET_MANAGER_IAM_ROLE_RN>")
+    p.parameters["<CLUSTER_AUTOSCALER_IAM_ROLE_RN>"] = get_role("cluster_autoscaler_role", "<CLUSTER_AUTOSCALER_IAM_ROLE_RN>")
+    p.parameters["<BACKUPS_MANAGER_IAM_ROLE_RN>"] = get_role("backups_manager_role", "<BACKUPS_MANAGER_IAM_ROLE_RN>")
+    p.parameters["<ALB_CONTROLLER_IRSA_ROLE_ARN>"] = get_role("alb_controller_role", "<ALB_CONTROLLER_IRSA_ROLE_ARN>")
+
+    # cluster
+    p.internals["CC_CLUSTER_ENDPOINT"] = hp_out["cluster_endpoint"]
+    p.internals["CC_CLUSTER_CA_CERT_DATA"] = hp_out["cluster_certificate_authority_data"]
+    p.internals["CC_CLUSTER_CA_CERT_PATH"] = write_ca_cert(hp_out["cluster_certificate_authority_data"])
+    p.internals["CC_CLUSTER_OIDC_ISSUER_URL"] = hp_out["cluster_oidc_issuer_url"]
+
+    # generate cluster autoscaler config here as it could depend on node groups configuration
+    p.fragments["# <K8S_AUTOSCALER>"] = cloud_man.create_autoscaler_snippet(
+        p.parameters["<PRIMARY_CLUSTER_NAME>"],
+        hp_out["cluster_node_groups"]
+    )
 
-        # artifact storage
-        p.parameters["<CLOUD_BINARY_ARTIFACTS_STORE>"] = hp_out["artifact_storage"]
-        p.parameters["<CLOUD_BINARY_ARTIFACTS_STORE_ENDPOINT>"] = hp_out["artifact_storage_endpoint"]
-        p.internals["CLOUD_BINARY_ARTIFACTS_STORE_ACCESS_KEY"] = hp_out["artifacts_storage_access_key"]
+    # artifact storage
+    p.parameters["<CLOUD_BINARY_ARTIFACTS_STORE>"] = hp_out["artifact_storage"]
+    p.parameters["<CLOUD_BINARY_ARTIFACTS_STORE_ENDPOINT>"] = hp_out["artifact_storage_endpoint"]
+    p.internals["CLOUD_BINARY_ARTIFACTS_STORE_ACCESS_KEY"] = hp_out["artifacts_storage_access_key"]
 
-        # backups storage
-        p.parameters["<CLOUD_CLUSTER_BACKUPS_STORE>"] = hp_out["backups_storage"]
+    # backups storage
+    p.parameters["<CLOUD_CLUSTER_BACKUPS_STORE>"] = hp_out["backups_storage"]
 
 
 
-        # kms keys
-        p.parameters["<SECRET_MANAGER_UNSEAL_RN>"] = hp_out["secret_manager_unseal_key"]
-        p.parameters["<SECRET_MANAGER_UNSEAL_KEY_RING>"] = hp_out["secret_manager_unseal_key_ring"]
-        # TODO: find a better way to pass cloud provider specific params
-        p.fragments["# <SECRET_MANAGER_UNSEAL>"] = cloud_man.create_seal_snippet(
-            key_id=p.parameters["<SECRET_MANAGER_UNSEAL_RN>"],
-            name=p.parameters["<PRIMARY_CLUSTER_NAME>"],
-            key_ring=p.parameters["<SECRET_MANAGER_UNSEAL_KEY_RING>"]
-        )
+    # kms keys
+    p.parameters["<SECRET_MANAGER_UNSEAL_RN>"] = hp_out["secret_manager_unseal_key"]
+    p.parameters["<SECRET_MANAGER_UNSEAL_KEY_RING>"] = hp_out["secret_manager_unseal_key_ring"]
+    # TODO: find a better way to pass cloud provider specific params
+    p.fragments["# <SECRET_MANAGER_UNSEAL>"] = cloud_man.create_seal_snippet(
+        key_id=p.parameters["<SECRET_MANAGER_UNSEAL_RN>"],
+        name=p.parameters["<PRIMARY_CLUSTER_NAME>"],
+        key_ring=p.parameters["<SECRET_MANAGER_UNSEAL_KEY_RING>"]
+    )
 
-        # unset envs as no longer needed
-        unset_envs(hp_tf_env_vars)
+    if p.cloud_provider == CloudProviders.AWS:
+        # user could get kubeconfig by running command
+        # `aws eks update-kubeconfig --region region-code --name my-cluster --kubeconfig my-config-path`
+        # CLI could not follow this approach as aws client could be not configured properly when keys are used
+        # CLI is creating this file programmatically
+        command, command_args = cloud_man.get_k8s_auth_command()
+        kubeconfig_params = {
+            "<ENDPOINT>": p.internals["CC_CLUSTER_ENDPOINT"],
+            "<CLUSTER_AUTH_BASE64>": p.internals["CC_CLUSTER_CA_CERT_DATA"],
+            "<CLUSTER_NAME>": p.parameters["<PRIMARY_CLUSTER_NAME>"],
+            "<CLUSTER_REGION>": p.parameters["<CLOUD_REGION>"]
+        }
+        kctl_config_path = create_k8s_config(command, command_args, cloud_provider_auth_env_vars, kubeconfig_params)
+        p.parameters["<CC_CLUSTER_OIDC_PROVIDER>"] = hp_out["cluster_oidc_provider_arn"]
+    elif p.cloud_provider == CloudProviders.Azure:
+        # user could get kubeconfig by running command
+        # `az aks get-credentials --name my-cluster --resource-group my-rg --admin`
+        # get config from tf output
+        kctl_config_path = write_k8s_config(hp_out["kube_config_raw"])
+        p.parameters["<CLOUD_CLUSTER_STORAGE_ACCOUNT>"] = hp_out["storage_account"]
+        p.parameters["<CLOUD_CLUSTER_RESOURCE_GROUP>"] = hp_out["resource_group"]
+        p.parameters["<CLOUD_CLUSTER_NODE_RESOURCE_GROUP>"] = hp_out["node_resource_group"]
+    elif p.cloud_provider == CloudProviders.GCP:
+        command, command_args = cloud_man.get_k8s_auth_command()
+        kubeconfig_params = {
+            "<ENDPOINT>": f'{p.internals["CC_CLUSTER_ENDPOINT"]}:443',
+            "<CLUSTER_AUTH_BASE64>": p.internals["CC_CLUSTER_CA_CERT_DATA"],
+            "<CLUSTER_NAME>": p.parameters["<PRIMARY_CLUSTER_NAME>"],
+            "<CLUSTER_REGION>": p.parameters["<CLOUD_REGION>"]
+        }
+        kctl_config_path = create_k8s_config(command, command_args, cloud_provider_auth_env_vars, kubeconfig_params)
+    else:
+        raise NotImplementedError(f"Cloud provider \"{p.cloud_provider}\" is not yet supported.")
 
-        if p.cloud_provider == CloudProviders.AWS:
-            # user could get kubeconfig by running command
-            # `aws eks update-kubeconfig --region region-code --name my-cluster --kubeconfig my-config-path`
-            # CLI could not follow this approach as aws client could be not configured properly when keys are used
-            # CLI is creating this file programmatically
-            command, command_args = cloud_man.get_k8s_auth_command()
-            kubeconfig_params = {
-                "<ENDPOINT>": p.internals["CC_CLUSTER_ENDPOINT"],
-                "<CLUSTER_AUTH_BASE64>": p.internals["CC_CLUSTER_CA_CERT_DATA"],
-                "<CLUSTER_NAME>": p.parameters["<PRIMARY_CLUSTER_NAME>"],
-                "<CLUSTER_REGION>": p.parameters["<CLOUD_REGION>"]
-            }
-            kctl_config_path = create_k8s_config(command, command_args, cloud_provider_auth_env_vars, kubeconfig_params)
-            p.parameters["<CC_CLUSTER_OIDC_PROVIDER>"] = hp_out["cluster_oidc_provider_arn"]
-        elif p.cloud_provider == CloudProviders.Azure:
-            # user could get kubeconfig by running command
-            # `az aks get-credentials --name my-cluster --resource-group my-rg --admin`
-            # get config from tf output
-            kctl_config_path = write_k8s_config(hp_out["kube_config_raw"])
-            p.parameters["<CLOUD_CLUSTER_STORAGE_ACCOUNT>"] = hp_out["storage_account"]
-            p.parameters["<CLOUD_CLUSTER_RESOURCE_GROUP>"] = hp_out["resource_group"]
-            p.parameters["<CLOUD_CLUSTER_NODE_RESOURCE_GROUP>"] = hp_out["node_resource_group"]
-        elif p.cloud_provider == CloudProviders.GCP:
-            command, command_args = cloud_man.get_k8s_auth_command()
-            kubeconfig_params = {
-                "<ENDPOINT>": f'{p.internals["CC_CLUSTER_ENDPOINT"]}:443',
-                "<CLUSTER_AUTH_BASE64>": p.internals["CC_CLUSTER_CA_CERT_DATA"],
-                "<CLUSTER_NAME>": p.parameters["<PRIMARY_CLUSTER_NAME>"],
-                "<CLUSTER_REGION>": p.parameters["<CLOUD_REGION>"]
-            }
-            kctl_config_path = create_k8s_config(command, command_args, cloud_provider_auth_env_vars, kubeconfig_params)
-        else:
-            raise NotImplementedError(f"Cloud provider \"{p.cloud_provider}\" is not yet supported.")
+    p.internals["KCTL_CONFIG_PATH"] = kctl_config_path
 
-        p.internals["KCTL_CONFIG_PATH"] = kctl_config_path
 
-        p.set_checkpoint("k8s-tf")
-        p.save_checkpoint()
+    click.echo("6/12: Provisioning K8s cluster. Done!")
 
-        click.echo("6/12: Provisioning K8s cluster. Done!")
-    else:
-        click.echo("6/12: Skipped K8s provisioning.")
 
+@trace()
+def gitops_vcs_stage(p: StateStore, tm: GitOpsTemplateManager):
     # Always ensure GitOps repo content is up-to-date (idempotent).
     # This guarantees placeholders are re-parametrised and pushed even when restarting from later checkpoints.
     click.echo("7/12: Ensuring GitOps code is up-to-date...")
@@ -627,27 +678,30 @@ def setup(
     # but still need some values (e.g. ALB controller IRSA role ARN) to replace placeholders.
     if not p.parameters.get("<ALB_CONTROLLER_IRSA_ROLE_ARN>"):
         try:
-            hp_tf = TfWrapper(LOCAL_TF_FOLDER_HOSTING_PROVIDER)
-            try:
-                hp_tf.init()
-            except Exception as init_err:
-                # Self-heal: if local GitOps terraform got corrupted (e.g. "labels" appears inside terraform {}),
-                # rebuild from the template and retry.
-                msg = str(init_err)
-                if "An argument named \"labels\" is not expected here" in msg and "in terraform" in msg:
-                    click.secho(
-                        "Warning: Detected invalid terraform configuration in local GitOps (labels inside terraform block). "
-                        "Rebuilding GitOps from template and retrying terraform init...",
-                        fg="yellow",
-                    )
-                    tm.clone()
-                    tm.build_repo_from_template(p.git_provider)
-                    tm.parametrise_tf(p)
-                    hp_tf = TfWrapper(LOCAL_TF_FOLDER_HOSTING_PROVIDER)
+            hp_tf = TfWrapper(LOCAL_TF_FOLDER_HOSTING_PROVIDER, env=prepare_cloud_provider_auth_env_vars(p))
+            # read outputs from the remote state first, init is needed only to fall back to Terraform
+            hp_out = hp_tf.remote_output()
+            if hp_out is None:
+                try:
                     hp_tf.init()
-                else:
-                    raise
-            hp_out = hp_tf.output()
+                except Exception as init_err:
+                    # Self-heal: if local GitOps terraform got corrupted (e.g. "labels" appears inside terraform {}),
+                    # rebuild from the template and retry.
+                    msg = str(init_err)
+                    if "An argument named \"labels\" is not expected here" in msg and "in terraform" in msg:
+                        click.secho(
+                            "Warning: Detected invalid terraform configuration in local GitOps (labels inside terraform block). "
+                            "Rebuilding GitOps from template and retrying terraform init...",
+                            fg="yellow",
+                        )
+                        tm.clone()
+                        tm.build_repo_from_template(p.git_provider)
+                        tm.parametrise_tf(p)
+                        hp_tf = TfWrapper(LOCAL_TF_FOLDER_HOSTING_PROVIDER, env=prepare_cloud_provider_auth_env_vars(p))
+                        hp_tf.init()
+                    else:
+                        raise
+                hp_out = hp_tf.output()
             alb_role = hp_out.get("alb_controller_role")
             if alb_role:
                 p.parameters["<ALB_CONTROLLER_IRSA_ROLE_ARN>"] = alb_role
@@ -664,7 +718,8 @@ def setup(
                 fg="yellow",
             )
 
-    tm.parametrise(p)
+    unresolved = tm.parametrise(p)
+    warn_unresolved_placeholders(unresolved, "GitOps")
 
     tm.upload(
         p.parameters["<GIT_REPOSITORY_GIT_URL>"],
@@ -675,520 +730,461 @@ def setup(
         git_access_token=p.internals.get("GIT_ACCESS_TOKEN"),
     )
 
-    p.set_checkpoint("gitops-vcs")
-    p.save_checkpoint()
 
     click.echo("7/12: GitOps code is up-to-date. Done!")
 
-    # install ArgoCD
-    if not p.has_checkpoint("k8s-delivery"):
-        click.echo("8/12: Installing ArgoCD...")
-        with alive_bar(20, title='ArgoCD Installation Progress') as bar:
-
-            kube_client = init_k8s_client(cloud_man, p)
-            cd_man = DeliveryServiceManager(kube_client)
-            bar()
-
-            argocd_bootstrap_name = "argocd-bootstrap"
-            argocd_core_project_name = "core"
-            dns_deployment_name = cloud_man.get_cloud_provider_k8s_dns_deployment_name()
-            # get CoreDNS deployments to validate cluster
-            dns_deployment = kube_client.get_deployment("kube-system", dns_deployment_name)
-            bar()
-
-            # wait for deployment readiness
-            kube_client.wait_for_deployment(dns_deployment)
-            bar()  # Add a few here
-
-            kube_client.create_namespace(ARGOCD_NAMESPACE)
-            bar()
-            kube_client.create_service_account(ARGOCD_NAMESPACE, argocd_bootstrap_name)
-            bar()
-            kube_client.create_cluster_role(ARGOCD_NAMESPACE, argocd_bootstrap_name)
-            bar()
-
-            kube_client.create_cluster_role_binding(ARGOCD_NAMESPACE, argocd_bootstrap_name, argocd_bootstrap_name)
-            bar()
-
-            job = cd_man.create_argocd_bootstrap_job(argocd_bootstrap_name)
-            kube_client.wait_for_job(job)
-            bar()  # Add a few here
-            # cleanup temp resources
-            try:
-                kube_client.remove_service_account(ARGOCD_NAMESPACE, argocd_bootstrap_name)
-                kube_client.remove_cluster_role(argocd_bootstrap_name)
-                kube_client.remove_cluster_role_binding(argocd_bootstrap_name)
-            except Exception as e:
-                click.echo("Could not clean up ArgoCD bootstrap temporary resources, manual clean-up is required")
-            bar()
-
-            # wait for ArgoCD to be ready
-
-            argocd_ss = kube_client.get_stateful_set_objects(ARGOCD_NAMESPACE, "argocd-application-controller")
-            kube_client.wait_for_stateful_set(argocd_ss)
-            bar()
-
-            # 	argocd-server
-            argocd_server = kube_client.get_deployment(ARGOCD_NAMESPACE, "argocd-server")
-            kube_client.wait_for_deployment(argocd_server)
-            bar()  # add a few here
-            # wait for additional ArgoCD Pods to transition to Running
-            # this is related to a condition where apps attempt to deploy before
-            # repo, redis, or other health checks are passing
-            # this can cause future steps to break since the registry app
-            # may never apply
-
-            # 	argocd-repo-server
-            argocd_repo_server = kube_client.get_deployment(ARGOCD_NAMESPACE, "argocd-repo-server")
-            kube_client.wait_for_deployment(argocd_repo_server)
-            bar()
 
+@trace()
+def k8s_delivery_stage(p: StateStore, cloud_man: CloudProviderManager):
+    click.echo("8/12: Installing ArgoCD...")
+    with exclusive_progress_bar(20, title='ArgoCD Installation Progress') as bar:
+
+        kube_client = init_k8s_client(cloud_man, p, informers=[(POD, ARGOCD_NAMESPACE)])
+        cd_man = DeliveryServiceManager(kube_client)
+        bar()
+
+        argocd_bootstrap_name = "argocd-bootstrap"
+        argocd_core_project_name = "core"
+        dns_deployment_name = cloud_man.get_cloud_provider_k8s_dns_deployment_name()
+        # get CoreDNS deployments to validate cluster
+        dns_deployment = kube_client.get_deployment("kube-system", dns_deployment_name)
+        bar()
+
+        # wait for deployment readiness
+        kube_client.wait_for_deployment(dns_deployment)
+        bar()  # Add a few here
+
+        kube_client.create_namespace(ARGOCD_NAMESPACE)
+        bar()
+        kube_client.create_service_account(ARGOCD_NAMESPACE, argocd_bootstrap_name)
+        bar()
+        kube_client.create_cluster_role(ARGOCD_NAMESPACE, argocd_bootstrap_name)
+        bar()
+
+        kube_client.create_cluster_role_binding(ARGOCD_NAMESPACE, argocd_bootstrap_name, argocd_bootstrap_name)
+        bar()
+
+        job = cd_man.create_argocd_bootstrap_job(argocd_bootstrap_name)
+        kube_client.wait_for_job(job)
+        bar()  # Add a few here
+        # cleanup temp resources
+        try:
+            kube_client.remove_service_account(ARGOCD_NAMESPACE, argocd_bootstrap_name)
+            kube_client.remove_cluster_role(argocd_bootstrap_name)
+            kube_client.remove_cluster_role_binding(argocd_bootstrap_name)
+        except Exception as e:
+            click.echo("Could not clean up ArgoCD bootstrap temporary resources, manual clean-up is required")
+        bar()
+
+        # wait for ArgoCD to be ready, components start concurrently and are waited for at once
+        # wait for additional ArgoCD Pods to transition to Running
+        # this is related to a condition where apps attempt to deploy before
+        # repo, redis, or other health checks are passing
+        # this can cause future steps to break since the registry app
+        # may never apply
+        kube_client.wait_for_all([
+            ReadinessTarget(STATEFUL_SET, ARGOCD_NAMESPACE, "argocd-application-controller"),
+            ReadinessTarget(DEPLOYMENT, ARGOCD_NAMESPACE, "argocd-server"),
+            ReadinessTarget(DEPLOYMENT, ARGOCD_NAMESPACE, "argocd-repo-server"),
             # HA components
-
-            # argocd-redis-ha-haproxy Deployment
-            argocd_redis_ha_haproxy = kube_client.get_deployment(ARGOCD_NAMESPACE, "argocd-redis-ha-haproxy")
-            kube_client.wait_for_deployment(argocd_redis_ha_haproxy)
-            bar()
-
-            # argocd-redis-ha StatefulSet
-            cert_manager = kube_client.get_stateful_set_objects(ARGOCD_NAMESPACE, "argocd-redis-ha-server")
-            kube_client.wait_for_stateful_set(cert_manager)
-            bar()
-
-            # create additional namespaces
-            kube_client.create_namespace(ARGO_WORKFLOW_NAMESPACE)
-            kube_client.create_namespace(ATLANTIS_NAMESPACE)
-            kube_client.create_namespace(EXTERNAL_SECRETS_OPERATOR_NAMESPACE)
-            bar()
-
-            # create additional service accounts
-            kube_client.create_service_account(ATLANTIS_NAMESPACE, "atlantis")
-            kube_client.create_service_account(EXTERNAL_SECRETS_OPERATOR_NAMESPACE, "external-secrets")
-            bar()
-
-            # create argocd kubernetes project and secret for connectivity to private gitops repos
-            annotations = {"managed-by": "argocd.argoproj.io"}
-
-            # credentials template
-            git_wildcard_url = "".join(p.parameters["<GIT_REPOSITORY_GIT_URL>"].partition("/")[:-1])
-
-            argocd_sec_secret_name = f'{p.parameters["<GIT_ORGANIZATION_NAME>"]}-repo-creds'.lower()
-            argocd_secret = {
-                "type": "git",
-                "name": argocd_sec_secret_name,
-                "url": git_wildcard_url,
-                "sshPrivateKey": p.internals["DEFAULT_SSH_PRIVATE_KEY"],
-            }
-            creds_labels = {"argocd.argoproj.io/secret-type": "repo-creds"}
-
-            kube_client.create_plain_secret(ARGOCD_NAMESPACE,
-                                            argocd_sec_secret_name,
-                                            argocd_secret,
-                                            annotations,
-                                            creds_labels)
-            bar()
-
-            # repo
-            argocd_sec_project_name = f'{p.parameters["<GIT_ORGANIZATION_NAME>"]}-gitops'.lower()
-            argocd_project = {
-                "type": "git",
-                "name": argocd_sec_project_name,
-                "url": p.parameters["<GIT_REPOSITORY_GIT_URL>"],
+            ReadinessTarget(DEPLOYMENT, ARGOCD_NAMESPACE, "argocd-redis-ha-haproxy"),
+            ReadinessTarget(STATEFUL_SET, ARGOCD_NAMESPACE, "argocd-redis-ha-server"),
+        ], timeout=600, on_ready=lambda target: bar())
+
+        # create additional namespaces
+        kube_client.create_namespace(ARGO_WORKFLOW_NAMESPACE)
+        kube_client.create_namespace(ATLANTIS_NAMESPACE)
+        kube_client.create_namespace(EXTERNAL_SECRETS_OPERATOR_NAMESPACE)
+        bar()
+
+        # create additional service accounts
+        kube_client.create_service_account(ATLANTIS_NAMESPACE, "atlantis")
+        kube_client.create_service_account(EXTERNAL_SECRETS_OPERATOR_NAMESPACE, "external-secrets")
+        bar()
+
+        # create argocd kubernetes project and secret for connectivity to private gitops repos
+        annotations = {"managed-by": "argocd.argoproj.io"}
+
+        # credentials template
+        git_wildcard_url = "".join(p.parameters["<GIT_REPOSITORY_GIT_URL>"].partition("/")[:-1])
+
+        argocd_sec_secret_name = f'{p.parameters["<GIT_ORGANIZATION_NAME>"]}-repo-creds'.lower()
+        argocd_secret = {
+            "type": "git",
+            "name": argocd_sec_secret_name,
+            "url": git_wildcard_url,
+            "sshPrivateKey": p.internals["DEFAULT_SSH_PRIVATE_KEY"],
+        }
+        creds_labels = {"argocd.argoproj.io/secret-type": "repo-creds"}
+
+        kube_client.create_plain_secret(ARGOCD_NAMESPACE,
+                                        argocd_sec_secret_name,
+                                        argocd_secret,
+                                        annotations,
+                                        creds_labels)
+        bar()
+
+        # repo
+        argocd_sec_project_name = f'{p.parameters["<GIT_ORGANIZATION_NAME>"]}-gitops'.lower()
+        argocd_project = {
+            "type": "git",
+            "name": argocd_sec_project_name,
+            "url": p.parameters["<GIT_REPOSITORY_GIT_URL>"],
+        }
+        repo_labels = {"argocd.argoproj.io/secret-type": "repository"}
+
+        kube_client.create_plain_secret(ARGOCD_NAMESPACE,
+                                        argocd_sec_project_name,
+                                        argocd_project,
+                                        annotations,
+                                        repo_labels)
+        bar()
+
+        # argocd pods are ready, get and set credentials
+        argo_pas = kube_client.get_secret(ARGOCD_NAMESPACE, "argocd-initial-admin-secret")
+        p.internals["ARGOCD_USER"] = "admin"
+        p.internals["ARGOCD_PASSWORD"] = argo_pas
+
+        # get argocd auth token
+        # Avoid relying on kubeconfig parsing here; we already have a working API client
+        # configured with endpoint/token/CA.
+        k8s_pod = kube_client.find_running_pod(
+            namespace=ARGOCD_NAMESPACE,
+            name_prefix="argocd-server",
+        )
+        # Port-forward uses kubectl which requires kubeconfig file path.
+        # Make this idempotent: (re)generate kubeconfig if it's missing.
+        if not os.path.exists(p.internals["KCTL_CONFIG_PATH"]):
+            command, command_args = cloud_man.get_k8s_auth_command()
+            kubeconfig_params = {
+                "<ENDPOINT>": p.internals["CC_CLUSTER_ENDPOINT"],
+                "<CLUSTER_AUTH_BASE64>": p.internals.get("CC_CLUSTER_CA_CERT_DATA", ""),
+                "<CLUSTER_NAME>": p.parameters["<PRIMARY_CLUSTER_NAME>"],
+                "<CLUSTER_REGION>": p.parameters["<CLOUD_REGION>"],
             }
-            repo_labels = {"argocd.argoproj.io/secret-type": "repository"}
-
-            kube_client.create_plain_secret(ARGOCD_NAMESPACE,
-                                            argocd_sec_project_name,
-                                            argocd_project,
-                                            annotations,
-                                            repo_labels)
-            bar()
-
-            # argocd pods are ready, get and set credentials
-            argo_pas = kube_client.get_secret(ARGOCD_NAMESPACE, "argocd-initial-admin-secret")
-            p.internals["ARGOCD_USER"] = "admin"
-            p.internals["ARGOCD_PASSWORD"] = argo_pas
-
-            # get argocd auth token
-            # Avoid relying on kubeconfig parsing here; we already have a working API client
-            # configured with endpoint/token/CA.
-            k8s_pod = kube_client.find_running_pod_by_name_fragment(
-                namespace=ARGOCD_NAMESPACE,
-                name_fragment="argocd-server",
+            cloud_provider_auth_env_vars = prepare_cloud_provider_auth_env_vars(p)
+            p.internals["KCTL_CONFIG_PATH"] = create_k8s_config(
+                command, command_args, cloud_provider_auth_env_vars, kubeconfig_params
             )
-            # Port-forward uses kubectl which requires kubeconfig file path.
-            # Make this idempotent: (re)generate kubeconfig if it's missing.
-            if not os.path.exists(p.internals["KCTL_CONFIG_PATH"]):
-                command, command_args = cloud_man.get_k8s_auth_command()
-                kubeconfig_params = {
-                    "<ENDPOINT>": p.internals["CC_CLUSTER_ENDPOINT"],
-                    "<CLUSTER_AUTH_BASE64>": p.internals.get("CC_CLUSTER_CA_CERT_DATA", ""),
-                    "<CLUSTER_NAME>": p.parameters["<PRIMARY_CLUSTER_NAME>"],
-                    "<CLUSTER_REGION>": p.parameters["<CLOUD_REGION>"],
-                }
-                cloud_provider_auth_env_vars = prepare_cloud_provider_auth_env_vars(p)
-                p.internals["KCTL_CONFIG_PATH"] = create_k8s_config(
-                    command, command_args, cloud_provider_auth_env_vars, kubeconfig_params
-                )
-            # Transitioned to asynchronous functions to address compatibility issues with the kr8s library.
-            # Previously, the synchronous interaction with kr8s sometimes led to deadlocks and errors because the kr8s
-            # library is inherently asynchronous.
-            argocd_token = asyncio.run(get_argocd_token_via_k8s_portforward(
-                user=p.internals["ARGOCD_USER"],
-                password=p.internals["ARGOCD_PASSWORD"],
-                k8s_pod=k8s_pod,
-                kube_config_path=p.internals["KCTL_CONFIG_PATH"]
-            ))
-            p.internals["ARGOCD_TOKEN"] = argocd_token
-            bar()
-            # create argocd "core" project
-            # TODO: explicitly whitelist project repositories
-            cd_man.create_project(argocd_core_project_name, [
-                p.parameters["<GIT_REPOSITORY_GIT_URL>"],
-                "https://charts.jetstack.io",
-                "https://kubernetes-sigs.github.io/external-dns",
-                "*"
-            ])
-
-            # deploy registry app
-            cd_man.create_core_application(argocd_core_project_name, p.parameters["<GIT_REPOSITORY_GIT_URL>"],
-                                           p.parameters["<CD_SERVICE_EXCLUDE_LIST>"])
-            bar()
-
-            p.set_checkpoint("k8s-delivery")
-            p.save_checkpoint()
+        # Transitioned to asynchronous functions to address compatibility issues with the kr8s library.
+        # Previously, the synchronous interaction with kr8s sometimes led to deadlocks and errors because the kr8s
+        # library is inherently asynchronous.
+        argocd_token = asyncio.run(get_argocd_token_via_k8s_portforward(
+            user=p.internals["ARGOCD_USER"],
+            password=p.internals["ARGOCD_PASSWORD"],
+            k8s_pod=k8s_pod,
+            kube_config_path=p.internals["KCTL_CONFIG_PATH"]
+        ))
+        p.internals["ARGOCD_TOKEN"] = argocd_token
+        bar()
+        # create argocd "core" project
+        # TODO: explicitly whitelist project repositories
+        cd_man.create_project(argocd_core_project_name, [
+            p.parameters["<GIT_REPOSITORY_GIT_URL>"],
+            "https://charts.jetstack.io",
+            "https://kubernetes-sigs.github.io/external-dns",
+            "*"
+        ])
+
+        # deploy registry app
+        cd_man.create_core_application(argocd_core_project_name, p.parameters["<GIT_REPOSITORY_GIT_URL>"],
+                                       p.parameters["<CD_SERVICE_EXCLUDE_LIST>"])
+        bar()
+
+    kube_client.close()
+
+    click.echo("8/12: Installing ArgoCD. Done!")
 
-        click.echo("8/12: Installing ArgoCD. Done!")
-    else:
-        click.echo("8/12: Skipped ArgoCD installation.")
-
-    # initialize and unseal vault
-    if not p.has_checkpoint("secrets-management"):
-        click.echo("9/12: Initializing Secrets Manager...")
-        with alive_bar(7, title='Initializing Secrets Manager') as bar:
-
-            # default AWS EKS auth token life-time is 14m
-            # to be safe should refresh token before proceeding
-            kube_client = init_k8s_client(cloud_man, p)
-            bar()
 
-            external_dns = kube_client.get_deployment("external-dns", "external-dns")
-            kube_client.wait_for_deployment(external_dns)
-            bar()
-
-            # wait for vault readiness (handle delayed creation)
-            vault_ss = None
-            for attempt in range(40):  # ~10 minutes with 15s intervals
-                try:
-                    vault_ss = kube_client.get_stateful_set_objects(VAULT_NAMESPACE, "vault")
-                    break
-                except Exception:
-                    time.sleep(15)
-            if not vault_ss:
-                raise click.ClickException(
-                    "Vault StatefulSet not found after waiting ~10 minutes. "
-                    "Ensure ArgoCD app 'vault-components' is synced and retry."
-                )
-            kube_client.wait_for_stateful_set(vault_ss, 600, wait_availability=False)
+@trace()
+def secrets_management_stage(p: StateStore, cloud_man: CloudProviderManager):
+    click.echo("9/12: Initializing Secrets Manager...")
+    with exclusive_progress_bar(7, title='Initializing Secrets Manager') as bar:
+
+        # default AWS EKS auth token life-time is 14m
+        # to be safe should refresh token before proceeding
+        kube_client = init_k8s_client(cloud_man, p, informers=[(STATEFUL_SET, VAULT_NAMESPACE)])
+        bar()
+
+        external_dns = kube_client.get_deployment("external-dns", "external-dns")
+        kube_client.wait_for_deployment(external_dns)
+        bar()
+
+        # wait for vault readiness (handle delayed creation)
+        vault_ss = None
+        for attempt in range(40):  # ~10 minutes with 15s intervals
+            try:
+                vault_ss = kube_client.get_stateful_set_objects(VAULT_NAMESPACE, "vault")
+                break
+            except Exception:
+                time.sleep(15)
+        if not vault_ss:
+            raise click.ClickException(
+                "Vault StatefulSet not found after waiting ~10 minutes. "
+                "Ensure ArgoCD app 'vault-components' is synced and retry."
+            )
+        kube_client.wait_for_stateful_set(vault_ss, 600, wait_availability=False)
+        bar()
+
+        # Vault init from the UI/API is broken from Vault version 1.12.0 till now 1.14.4
+        # https://discuss.hashicorp.com/t/cant-init-1-13-2-with-awskms/54000
+        # Workaround init using kubectl
+        # with portforward.forward(VAULT_NAMESPACE, "vault-0", 8200, 8200,
+        #                          config_path=p.internals["KCTL_CONFIG_PATH"], waiting=3,
+        #                          log_level=portforward.LogLevel.ERROR:
+        #
+        #     vault_client = hvac.Client(url='http://127.0.0.1:8200')
+        #     if not vault_client.sys.is_initialized():
+        #         vault_init_result = vault_client.sys.initialize()
+        #         vault_root_token = vault_init_result['root_token']
+        #         vault_keys = vault_init_result['keys']
+        #
+        #     if vault_client.sys.is_sealed():
+        #         vault_secret = {
+        #             "root-token": vault_root_token
+        #         }
+        #         for i, x in enumerate(vault_keys):
+        #             vault_secret[f"root-unseal-key-{i}"] = x
+        #         kube_client.create_plain_secret(VAULT_NAMESPACE, "vault-unseal-secret", vault_secret)
+
+        # use k8s console client
+        wait(30)
+        kctl = KctlWrapper(p.internals["KCTL_CONFIG_PATH"])
+        # Idempotency: if Vault is already initialized (common on reruns), reuse existing
+        # vault-unseal-secret and continue.
+        vault_root_token = None
+        existing_vault_secret = kube_client.get_secret_kv_decoded(VAULT_NAMESPACE, "vault-unseal-secret")
+        if existing_vault_secret.get("root-token"):
+            vault_root_token = [existing_vault_secret["root-token"]]
+            # keep progress bar shape (init step)
             bar()
-
-            # Vault init from the UI/API is broken from Vault version 1.12.0 till now 1.14.4
-            # https://discuss.hashicorp.com/t/cant-init-1-13-2-with-awskms/54000
-            # Workaround init using kubectl
-            # with portforward.forward(VAULT_NAMESPACE, "vault-0", 8200, 8200,
-            #                          config_path=p.internals["KCTL_CONFIG_PATH"], waiting=3,
-            #                          log_level=portforward.LogLevel.ERROR:
-            #
-            #     vault_client = hvac.Client(url='http://127.0.0.1:8200')
-            #     if not vault_client.sys.is_initialized():
-            #         vault_init_result = vault_client.sys.initialize()
-            #         vault_root_token = vault_init_result['root_token']
-            #         vault_keys = vault_init_result['keys']
-            #
-            #     if vault_client.sys.is_sealed():
-            #         vault_secret = {
-            #             "root-token": vault_root_token
-            #         }
-            #         for i, x in enumerate(vault_keys):
-            #             vault_secret[f"root-unseal-key-{i}"] = x
-            #         kube_client.create_plain_secret(VAULT_NAMESPACE, "vault-unseal-secret", vault_secret)
-
-            # use k8s console client
-            wait(30)
-            kctl = KctlWrapper(p.internals["KCTL_CONFIG_PATH"])
-            # Idempotency: if Vault is already initialized (common on reruns), reuse existing
-            # vault-unseal-secret and continue.
-            vault_root_token = None
-            existing_vault_secret = kube_client.get_secret_kv_decoded(VAULT_NAMESPACE, "vault-unseal-secret")
-            if existing_vault_secret.get("root-token"):
-                vault_root_token = [existing_vault_secret["root-token"]]
-                # keep progress bar shape (init step)
+        else:
+            try:
+                out = kctl.exec("vault-0", "-- vault operator init", container="vault", namespace=VAULT_NAMESPACE)
                 bar()
-            else:
-                try:
-                    out = kctl.exec("vault-0", "-- vault operator init", container="vault", namespace=VAULT_NAMESPACE)
-                    bar()
-                except Exception as e:
-                    err = str(e)
-                    if "Vault is already initialized" in err or "already initialized" in err:
-                        # Secret should exist; if it doesn't, we can't proceed automatically.
-                        existing_vault_secret = kube_client.get_secret_kv_decoded(VAULT_NAMESPACE, "vault-unseal-secret")
-                        if existing_vault_secret.get("root-token"):
-                            vault_root_token = [existing_vault_secret["root-token"]]
-                            bar()
-                        else:
-                            raise click.ClickException(
-                                "Vault is already initialized, but 'vault-unseal-secret' was not found in the cluster. "
-                                "Cannot continue idempotently without a root token."
-                            )
+            except Exception as e:
+                err = str(e)
+                if "Vault is already initialized" in err or "already initialized" in err:
+                    # Secret should exist; if it doesn't, we can't proceed automatically.
+                    existing_vault_secret = kube_client.get_secret_kv_decoded(VAULT_NAMESPACE, "vault-unseal-secret")
+                    if existing_vault_secret.get("root-token"):
+                        vault_root_token = [existing_vault_secret["root-token"]]
+                        bar()
                     else:
-                        raise click.ClickException(f"Could not init/unseal vault: {e}")
-
-                if vault_root_token is None:
-                    vault_keys = re.findall("^Recovery\\sKey\\s(?P<index>\\d):\\s(?P<key>.+)$", out, re.MULTILINE)
-                    vault_root_token = re.findall("^Initial\\sRoot\\sToken:\\s(?P<token>.+)$", out, re.MULTILINE)
-
-                    if not vault_root_token:
-                        raise click.ClickException("Could not parse Vault root token from init output")
-
-                    vault_secret = {"root-token": vault_root_token[0]}
-                    for i, v in vault_keys:
-                        vault_secret[f"root-unseal-key-{i}"] = v
-
-                    kube_client.create_plain_secret(VAULT_NAMESPACE, "vault-unseal-secret", vault_secret)
-
-            # keep progress bar shape (secret creation step)
-            bar()
-
-        p.internals["VAULT_ROOT_TOKEN"] = vault_root_token[0]
-        p.set_checkpoint("secrets-management")
-        p.save_checkpoint()
-
-        click.echo("9/12: Secrets Manager initialization. Done!")
-    else:
-        click.echo("9/12: Skipped Secrets Manager initialization.")
-
-    if not p.has_checkpoint("secrets-management-tf"):
-        click.echo("10/12: Setting Secrets...")
-
-        with alive_bar(5, title='Secret Manager Pre-Deployment Readiness') as bar:
-            # default AWS EKS auth token life-time is 14m
-            # to be safe should refresh token before proceeding
-            kube_client = init_k8s_client(cloud_man, p)
-            bar()
-
-            ingress = kube_client.get_ingress(VAULT_NAMESPACE, "vault")
-            kube_client.wait_for_ingress(ingress)
-            bar()
-
-            # We do NOT use cert-manager in this platform. TLS is terminated at ALB/ACM.
-            # Keep progress bar step for backwards-compatibility with older flows.
-            bar()
-
-            wait_http_endpoint_readiness(f'https://{p.parameters["<SECRET_MANAGER_INGRESS_URL>"]}')
-            bar()
+                        raise click.ClickException(
+                            "Vault is already initialized, but 'vault-unseal-secret' was not found in the cluster. "
+                            "Cannot continue idempotently without a root token."
+                        )
+                else:
+                    raise click.ClickException(f"Could not init/unseal vault: {e}")
 
-            # run security manager tf to create secrets and roles
-            sec_man_tf_env_vars = {
-                **{
-                    "VAULT_TOKEN": p.internals["VAULT_ROOT_TOKEN"],
-                    "VAULT_ADDR": f'https://{p.parameters["<SECRET_MANAGER_INGRESS_URL>"]}',
-                },
-                **cloud_provider_auth_env_vars}
-            # set envs as required by tf
-            set_envs(sec_man_tf_env_vars)
-            bar()
+            if vault_root_token is None:
+                vault_keys = re.findall("^Recovery\\sKey\\s(?P<index>\\d):\\s(?P<key>.+)$", out, re.MULTILINE)
+                vault_root_token = re.findall("^Initial\\sRoot\\sToken:\\s(?P<token>.+)$", out, re.MULTILINE)
 
-        tf_wrapper = TfWrapper(LOCAL_TF_FOLDER_SECRETS_MANAGER)
-        tf_wrapper.init()
-
-        sec_man_tf_params = {
-            "vcs_bot_ssh_public_key": p.internals["DEFAULT_SSH_PUBLIC_KEY"],
-            "vcs_bot_ssh_private_key": p.internals["DEFAULT_SSH_PRIVATE_KEY"],
-            "vcs_token": p.internals["GIT_ACCESS_TOKEN"],
-            "cd_webhook_secret": p.parameters["<CD_PUSH_EVENT_WEBHOOK_SECRET>"],
-            "atlantis_repo_webhook_secret": p.parameters["<IAC_PR_AUTOMATION_WEBHOOK_SECRET>"],
-            "atlantis_repo_webhook_url": p.parameters["<IAC_PR_AUTOMATION_WEBHOOK_URL>"],
-            "vault_token": p.internals["VAULT_ROOT_TOKEN"],
-            "cluster_endpoint": p.internals["CC_CLUSTER_ENDPOINT"],
-            "vcs_runner_token": p.internals["VCS_RUNNER_TOKEN"],
-        }
-        if "<CC_CLUSTER_SSH_PUBLIC_KEY>" in p.parameters:
-            sec_man_tf_params["cluster_ssh_public_key"] = p.parameters["<CC_CLUSTER_SSH_PUBLIC_KEY>"]
+                if not vault_root_token:
+                    raise click.ClickException("Could not parse Vault root token from init output")
 
-        if "TF_BACKEND_STORAGE_ACCESS_KEY" in p.internals:
-            sec_man_tf_params["tf_backend_storage_access_key"] = p.internals["TF_BACKEND_STORAGE_ACCESS_KEY"]
+                vault_secret = {"root-token": vault_root_token[0]}
+                for i, v in vault_keys:
+                    vault_secret[f"root-unseal-key-{i}"] = v
 
-        if "CLOUD_BINARY_ARTIFACTS_STORE_ACCESS_KEY" in p.internals:
-            sec_man_tf_params["cloud_binary_artifacts_store_access_key"] = p.internals[
-                "CLOUD_BINARY_ARTIFACTS_STORE_ACCESS_KEY"]
+                kube_client.create_plain_secret(VAULT_NAMESPACE, "vault-unseal-secret", vault_secret)
 
-        if "IMAGE_REGISTRY_AUTH" in p.internals:
-            sec_man_tf_params["image_registry_auth"] = p.internals["IMAGE_REGISTRY_AUTH"]
+        # keep progress bar shape (secret creation step)
+        bar()
 
-        tf_wrapper.apply(sec_man_tf_params)
+    p.internals["VAULT_ROOT_TOKEN"] = vault_root_token[0]
+    kube_client.close()
 
-        sec_man_out = tf_wrapper.output()
-        p.internals["REGISTRY_OIDC_CLIENT_ID"] = sec_man_out["registry_oidc_client_id"]
-        p.internals["REGISTRY_OIDC_CLIENT_SECRET"] = sec_man_out["registry_oidc_client_secret"]
-        p.internals["REGISTRY_ROBO_USER_PASSWORD"] = sec_man_out["registry_main_robot_user_password"]
-        p.internals["REGISTRY_PASSWORD"] = sec_man_out["registry_admin_user_password"]
-        p.internals["CODE_QUALITY_OIDC_CLIENT_ID"] = sec_man_out["code_quality_oidc_client_id"]
-        p.internals["CODE_QUALITY_OIDC_CLIENT_SECRET"] = sec_man_out["code_quality_oidc_client_secret"]
-        p.internals["CODE_QUALITY_PASSWORD"] = sec_man_out["code_quality_admin_user_password"]
+    click.echo("9/12: Secrets Manager initialization. Done!")
 
-        # prepare registry machine user
-        robo_user_name = "robot@main-robot"
-        p.internals["REGISTRY_ROBO_USER"] = robo_user_name
 
-        # unset envs as no longer needed
-        unset_envs(sec_man_tf_env_vars)
+@trace()
+def secrets_management_tf_stage(p: StateStore, cloud_man: CloudProviderManager):
+    click.echo("10/12: Setting Secrets...")
 
-        kube_client.create_configmap(VAULT_NAMESPACE, "vault-init", {})
+    with exclusive_progress_bar(5, title='Secret Manager Pre-Deployment Readiness') as bar:
+        # default AWS EKS auth token life-time is 14m
+        # to be safe should refresh token before proceeding
+        kube_client = init_k8s_client(cloud_man, p)
+        bar()
 
-        p.set_checkpoint("secrets-management-tf")
-        p.save_checkpoint()
-        click.echo("10/12: Secrets set. Done!")
+        ingress = kube_client.get_ingress(VAULT_NAMESPACE, "vault")
+        kube_client.wait_for_ingress(ingress)
+        bar()
 
-    else:
-        click.echo("10/12: Skipped setting Secrets.")
+        # We do NOT use cert-manager in this platform. TLS is terminated at ALB/ACM.
+        # Keep progress bar step for backwards-compatibility with older flows.
+        bar()
 
-    if not p.has_checkpoint("users-tf"):
-        click.echo("11/12: Provisioning Users...")
+        wait_http_endpoint_readiness(f'https://{p.parameters["<SECRET_MANAGER_INGRESS_URL>"]}')
+        bar()
 
         # run security manager tf to create secrets and roles
-        user_man_tf_env_vars = {
+        sec_man_tf_env_vars = {
             **{
                 "VAULT_TOKEN": p.internals["VAULT_ROOT_TOKEN"],
                 "VAULT_ADDR": f'https://{p.parameters["<SECRET_MANAGER_INGRESS_URL>"]}',
             },
-            **cloud_provider_auth_env_vars,
-            **git_provider_env_vars}
-        # set envs as required by tf
-        set_envs(user_man_tf_env_vars)
+            **prepare_cloud_provider_auth_env_vars(p)}
+        bar()
 
-        tf_wrapper = TfWrapper(LOCAL_TF_FOLDER_USERS)
-        tf_wrapper.init()
-        tf_wrapper.apply()
-        user_man_out = tf_wrapper.output()
+    tf_wrapper = TfWrapper(LOCAL_TF_FOLDER_SECRETS_MANAGER, env=sec_man_tf_env_vars, profile=TF_PROFILE_SETUP)
+    tf_wrapper.init()
 
-        # unset envs as no longer needed
-        unset_envs(user_man_tf_env_vars)
+    sec_man_tf_params = {
+        "vcs_bot_ssh_public_key": p.internals["DEFAULT_SSH_PUBLIC_KEY"],
+        "vcs_bot_ssh_private_key": p.internals["DEFAULT_SSH_PRIVATE_KEY"],
+        "vcs_token": p.internals["GIT_ACCESS_TOKEN"],
+        "cd_webhook_secret": p.parameters["<CD_PUSH_EVENT_WEBHOOK_SECRET>"],
+        "atlantis_repo_webhook_secret": p.parameters["<IAC_PR_AUTOMATION_WEBHOOK_SECRET>"],
+        "atlantis_repo_webhook_url": p.parameters["<IAC_PR_AUTOMATION_WEBHOOK_URL>"],
+        "vault_token": p.internals["VAULT_ROOT_TOKEN"],
+        "cluster_endpoint": p.internals["CC_CLUSTER_ENDPOINT"],
+        "vcs_runner_token": p.internals["VCS_RUNNER_TOKEN"],
+    }
+    if "<CC_CLUSTER_SSH_PUBLIC_KEY>" in p.parameters:
+        sec_man_tf_params["cluster_ssh_public_key"] = p.parameters["<CC_CLUSTER_SSH_PUBLIC_KEY>"]
 
-        p.set_checkpoint("users-tf")
-        p.save_checkpoint()
-        click.echo("11/12: Users provisioning. Done!")
-    else:
-        click.echo("11/12: Skipped provisioning Users.")
+    if "TF_BACKEND_STORAGE_ACCESS_KEY" in p.internals:
+        sec_man_tf_params["tf_backend_storage_access_key"] = p.internals["TF_BACKEND_STORAGE_ACCESS_KEY"]
 
-    if not p.has_checkpoint("core-services-tf"):
-        click.echo("12/12: Configuring core services...")
+    if "CLOUD_BINARY_ARTIFACTS_STORE_ACCESS_KEY" in p.internals:
+        sec_man_tf_params["cloud_binary_artifacts_store_access_key"] = p.internals[
+            "CLOUD_BINARY_ARTIFACTS_STORE_ACCESS_KEY"]
 
-        with alive_bar(9, title='Core Services Pre-Deployment Readiness') as bar:
-            # default AWS EKS auth token life-time is 14m
-            # to be safe should refresh token before proceeding
-            kube_client = init_k8s_client(cloud_man, p)
-            bar()
+    if "IMAGE_REGISTRY_AUTH" in p.internals:
+        sec_man_tf_params["image_registry_auth"] = p.internals["IMAGE_REGISTRY_AUTH"]
 
-            # wait for harbor readiness
-            harbor_dep = kube_client.get_deployment(HARBOR_NAMESPACE, "harbor-core")
-            kube_client.wait_for_deployment(harbor_dep)
-            bar()
+    tf_wrapper.apply(sec_man_tf_params)
 
-            harbor_ingress = kube_client.get_ingress(HARBOR_NAMESPACE, "harbor-ingress")
-            kube_client.wait_for_ingress(harbor_ingress)
-            bar()
+    sec_man_out = tf_wrapper.output()
+    p.internals["REGISTRY_OIDC_CLIENT_ID"] = sec_man_out["registry_oidc_client_id"]
+    p.internals["REGISTRY_OIDC_CLIENT_SECRET"] = sec_man_out["registry_oidc_client_secret"]
+    p.internals["REGISTRY_ROBO_USER_PASSWORD"] = sec_man_out["registry_main_robot_user_password"]
+    p.internals["REGISTRY_PASSWORD"] = sec_man_out["registry_admin_user_password"]
+    p.internals["CODE_QUALITY_OIDC_CLIENT_ID"] = sec_man_out["code_quality_oidc_client_id"]
+    p.internals["CODE_QUALITY_OIDC_CLIENT_SECRET"] = sec_man_out["code_quality_oidc_client_secret"]
+    p.internals["CODE_QUALITY_PASSWORD"] = sec_man_out["code_quality_admin_user_password"]
 
-            # We do NOT use cert-manager in this platform. TLS is terminated at ALB/ACM.
-            bar()
+    # prepare registry machine user
+    robo_user_name = "robot@main-robot"
+    p.internals["REGISTRY_ROBO_USER"] = robo_user_name
 
-            # wait for sonarqube readiness
-            sonar_ss = kube_client.get_stateful_set_objects(SONARQUBE_NAMESPACE, "sonarqube-sonarqube")
-            kube_client.wait_for_stateful_set(sonar_ss)
-            bar()
+    kube_client.create_configmap(VAULT_NAMESPACE, "vault-init", {})
+    kube_client.close()
 
-            sonar_pod = kube_client.get_pod(SONARQUBE_NAMESPACE, "sonarqube-sonarqube-0")
-            kube_client.wait_for_pod(sonar_pod)
+    click.echo("10/12: Secrets set. Done!")
 
-            sonar_ingress = kube_client.get_ingress(SONARQUBE_NAMESPACE, "sonarqube-sonarqube")
-            kube_client.wait_for_ingress(sonar_ingress)
-            bar()
 
-            # We do NOT use cert-manager in this platform. TLS is terminated at ALB/ACM.
-            bar()
+@trace()
+def users_tf_stage(p: StateStore):
+    click.echo("11/12: Provisioning Users...")
 
-            # wait for registry API endpoint readiness
-            wait_http_endpoint_readiness(f'https://{p.parameters["<REGISTRY_INGRESS_URL>"]}')
-            bar()
+    # run security manager tf to create secrets and roles
+    user_man_tf_env_vars = {
+        **{
+            "VAULT_TOKEN": p.internals["VAULT_ROOT_TOKEN"],
+            "VAULT_ADDR": f'https://{p.parameters["<SECRET_MANAGER_INGRESS_URL>"]}',
+        },
+        **prepare_cloud_provider_auth_env_vars(p),
+        **prepare_git_provider_env_vars(p)}
 
-            p.internals["REGISTRY_USERNAME"] = "admin"
-            # run security manager tf to create secrets and roles
-            core_services_tf_env_vars = {
-                **{
-                    "HARBOR_URL": f'https://{p.parameters["<REGISTRY_INGRESS_URL>"]}',
-                    "HARBOR_USERNAME": p.internals["REGISTRY_USERNAME"],
-                    "HARBOR_PASSWORD": p.internals["REGISTRY_PASSWORD"],
-                    "VAULT_TOKEN": p.internals["VAULT_ROOT_TOKEN"],
-                    "VAULT_ADDR": f'https://{p.parameters["<SECRET_MANAGER_INGRESS_URL>"]}',
-                },
-                **cloud_provider_auth_env_vars}
-            # set envs as required by tf
-            set_envs(core_services_tf_env_vars)
-            bar()
+    tf_wrapper = TfWrapper(LOCAL_TF_FOLDER_USERS, env=user_man_tf_env_vars, profile=TF_PROFILE_SETUP)
+    tf_wrapper.init()
+    tf_wrapper.apply()
+    user_man_out = tf_wrapper.output()
 
-        tf_wrapper = TfWrapper(LOCAL_TF_FOLDER_CORE_SERVICES)
-        tf_wrapper.init()
-        tf_wrapper.apply({
-            "registry_oidc_client_id": p.internals["REGISTRY_OIDC_CLIENT_ID"],
-            "registry_oidc_client_secret": p.internals["REGISTRY_OIDC_CLIENT_SECRET"],
-            "registry_main_robot_password": p.internals["REGISTRY_ROBO_USER_PASSWORD"],
-            "code_quality_oidc_client_id": p.internals["CODE_QUALITY_OIDC_CLIENT_ID"],
-            "code_quality_oidc_client_secret": p.internals["CODE_QUALITY_OIDC_CLIENT_SECRET"],
-            "code_quality_admin_password": p.internals["CODE_QUALITY_PASSWORD"]
-        })
-        core_services_out = tf_wrapper.output()
-        p.parameters[
-            "<REGISTRY_DOCKERHUB_PROXY>"] = f'{p.parameters["<REGISTRY_REGISTRY_URL>"]}/{core_services_out["dockerhub_proxy_name"]}'
-        p.parameters[
-            "<REGISTRY_GCR_PROXY>"] = f'{p.parameters["<REGISTRY_REGISTRY_URL>"]}/{core_services_out["gcr_proxy_name"]}'
-        p.parameters[
-            "<REGISTRY_K8S_GCR_PROXY>"] = f'{p.parameters["<REGISTRY_REGISTRY_URL>"]}/{core_services_out["k8s_gcr_proxy_name"]}'
-        p.parameters[
-            "<REGISTRY_QUAY_PROXY>"] = f'{p.parameters["<REGISTRY_REGISTRY_URL>"]}/{core_services_out["quay_proxy_name"]}'
-
-        # unset envs as no longer needed
-        unset_envs(core_services_tf_env_vars)
-
-        p.set_checkpoint("core-services-tf")
-        p.save_checkpoint()
-        click.echo("12/12: Configuring core services. Done!")
+    click.echo("11/12: Users provisioning. Done!")
 
-    else:
-        click.echo("12/12: Skipped core services configuration.")
 
-    if not p.has_checkpoint("tf-store-hardening"):
-        # restrict access to IaC remote state store
-        cloud_man.protect_iac_state_storage(p.internals["TF_BACKEND_STORAGE_NAME"],
-                                            p.parameters["<IAC_PR_AUTOMATION_IAM_ROLE_RN>"])
-        p.set_checkpoint("tf-store-hardening")
-        p.save_checkpoint()
+@trace()
+def core_services_tf_stage(p: StateStore, cloud_man: CloudProviderManager):
+    click.echo("12/12: Configuring core services...")
+
+    with exclusive_progress_bar(10, title='Core Services Pre-Deployment Readiness') as bar:
+        # default AWS EKS auth token life-time is 14m
+        # to be safe should refresh token before proceeding
+        kube_client = init_k8s_client(cloud_man, p)
+        bar()
+
+        # wait for harbor and sonarqube readiness
+        kube_client.wait_for_all([
+            ReadinessTarget(DEPLOYMENT, HARBOR_NAMESPACE, "harbor-core"),
+            ReadinessTarget(INGRESS, HARBOR_NAMESPACE, "harbor-ingress"),
+            ReadinessTarget(STATEFUL_SET, SONARQUBE_NAMESPACE, "sonarqube-sonarqube"),
+            ReadinessTarget(POD, SONARQUBE_NAMESPACE, "sonarqube-sonarqube-0"),
+            ReadinessTarget(INGRESS, SONARQUBE_NAMESPACE, "sonarqube-sonarqube"),
+        ], timeout=600, on_ready=lambda target: bar())
+        kube_client.close()
+
+        # We do NOT use cert-manager in this platform. TLS is terminated at ALB/ACM.
+        bar()
+
+        # wait for registry API endpoint readiness
+        wait_http_endpoint_readiness(f'https://{p.parameters["<REGISTRY_INGRESS_URL>"]}')
+        bar()
+
+        p.internals["REGISTRY_USERNAME"] = "admin"
+        # run security manager tf to create secrets and roles
+        core_services_tf_env_vars = {
+            **{
+                "HARBOR_URL": f'https://{p.parameters["<REGISTRY_INGRESS_URL>"]}',
+                "HARBOR_USERNAME": p.internals["REGISTRY_USERNAME"],
+                "HARBOR_PASSWORD": p.internals["REGISTRY_PASSWORD"],
+                "VAULT_TOKEN": p.internals["VAULT_ROOT_TOKEN"],
+                "VAULT_ADDR": f'https://{p.parameters["<SECRET_MANAGER_INGRESS_URL>"]}',
+            },
+            **prepare_cloud_provider_auth_env_vars(p)}
+        bar()
+
+    tf_wrapper = TfWrapper(LOCAL_TF_FOLDER_CORE_SERVICES, env=core_services_tf_env_vars, profile=TF_PROFILE_SETUP)
+    tf_wrapper.init()
+    tf_wrapper.apply({
+        "registry_oidc_client_id": p.internals["REGISTRY_OIDC_CLIENT_ID"],
+        "registry_oidc_client_secret": p.internals["REGISTRY_OIDC_CLIENT_SECRET"],
+        "registry_main_robot_password": p.internals["REGISTRY_ROBO_USER_PASSWORD"],
+        "code_quality_oidc_client_id": p.internals["CODE_QUALITY_OIDC_CLIENT_ID"],
+        "code_quality_oidc_client_secret": p.internals["CODE_QUALITY_OIDC_CLIENT_SECRET"],
+        "code_quality_admin_password": p.internals["CODE_QUALITY_PASSWORD"]
+    })
+    core_services_out = tf_wrapper.output()
+    p.parameters[
+        "<REGISTRY_DOCKERHUB_PROXY>"] = f'{p.parameters["<REGISTRY_REGISTRY_URL>"]}/{core_services_out["dockerhub_proxy_name"]}'
+    p.parameters[
+        "<REGISTRY_GCR_PROXY>"] = f'{p.parameters["<REGISTRY_REGISTRY_URL>"]}/{core_services_out["gcr_proxy_name"]}'
+    p.parameters[
+        "<REGISTRY_K8S_GCR_PROXY>"] = f'{p.parameters["<REGISTRY_REGISTRY_URL>"]}/{core_services_out["k8s_gcr_proxy_name"]}'
+    p.parameters[
+        "<REGISTRY_QUAY_PROXY>"] = f'{p.parameters["<REGISTRY_REGISTRY_URL>"]}/{core_services_out["quay_proxy_name"]}'
 
-    show_credentials(p)
+    click.echo("12/12: Configuring core services. Done!")
 
-    # Calculate the total seconds elapsed
-    total_seconds = time.time() - func_start_time
 
-    # Use divmod to separate the total seconds into minutes and seconds
-    minutes, seconds = divmod(total_seconds, 60)
+@trace()
+def tf_store_hardening_stage(p: StateStore, cloud_man: CloudProviderManager):
+    # restrict access to IaC remote state store
+    cloud_man.protect_iac_state_storage(p.internals["TF_BACKEND_STORAGE_NAME"],
+                                        p.parameters["<IAC_PR_AUTOMATION_IAM_ROLE_RN>"])
 
-    # Display the result with minutes as integers and seconds with two decimal places
-    click.echo(f"Platform setup completed in {int(minutes)} minutes, {int(seconds)} seconds")
 
-    return True
+def warn_unresolved_placeholders(unresolved: Dict[str, List[str]], scope: str) -> None:
+    """
+    Report placeholders left in rendered files, before Terraform or ArgoCD fail on them.
+
+    Args:
+        unresolved: Placeholder to files using it
+        scope: Rendered files description
+    """
+    if not unresolved:
+        return
+    details = "\n".join(f"  - {token}: {len(files)} file(s), e.g. {files[0]}" for token, files in unresolved.items())
+    click.secho(f"Warning: {scope} code contains placeholders with no value:\n{details}", fg="yellow")
 
 
 @trace()
-def init_k8s_client(cloud_man, p):
+def init_k8s_client(cloud_man, p, informers: List[Tuple[str, str]] = None):
     if p.cloud_provider == CloudProviders.AWS:
         k8s_token = cloud_man.get_k8s_token(p.parameters["<PRIMARY_CLUSTER_NAME>"])
         kube_client = KubeClient(ca_cert_path=p.internals["CC_CLUSTER_CA_CERT_PATH"],
@@ -1200,6 +1196,8 @@ def init_k8s_client(cloud_man, p):
         )
     else:
         kube_client = KubeClient(config_file=p.internals["KCTL_CONFIG_PATH"])
+    if K8S_INFORMERS and informers:
+        kube_client.start_informers(informers)
     return kube_client
 
 
@@ -0,0 +1,34 @@
+import click
+
+from common.logging_config import configure_logging
+from common.versions import TF_MIRROR_PROVIDERS
+from services.dependency_manager import DependencyManager
+from services.tf_wrapper import TfWrapper
+
+
+@click.group()
+def tools():
+    """Manage local tools and caches used by CG DevX CLI."""
+    pass
+
+
+@tools.command(name="mirror-providers")
+@click.option('--exclude', '-e', 'exclude', multiple=True, type=click.Choice(sorted(TF_MIRROR_PROVIDERS)),
+              help='Provider source not to download, e.g. hashicorp/azurerm when not using Azure. Could be repeated')
+@click.option('--force', is_flag=True, default=False, help='Download providers even if the mirror is populated')
+@click.option('--verbosity', type=click.Choice(
+    ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'],
+    case_sensitive=False
+), default='CRITICAL', help='Set the verbosity level (DEBUG, INFO, WARNING, ERROR, CRITICAL)')
+def mirror_providers(exclude: tuple, force: bool, verbosity: str):
+    """Pre-populate the local Terraform provider mirror with the provider versions from versions.yaml."""
+    configure_logging(verbosity)
+
+    dep_man: DependencyManager = DependencyManager()
+    if not dep_man.check_tf():
+        click.echo("Downloading and installing tf...")
+        dep_man.install_tf()
+
+    click.echo("Populating Terraform provider mirror...")
+    path = TfWrapper().mirror_providers(force=force, exclude=list(exclude))
+    click.echo(f"Terraform provider mirror is ready at {path}")
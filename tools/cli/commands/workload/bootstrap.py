@@ -13,7 +13,7 @@ from common.enums.cloud_providers import CloudProviders
 from common.logging_config import configure_logging, logger
 from common.state_store import StateStore
 from common.utils.command_utils import init_cloud_provider, preprocess_workload_names, \
-    init_git_provider, construct_wl_iam_role
+    init_git_provider, construct_wl_iam_role, record_timings
 from services.wl_template_manager import WorkloadManager
 
 
@@ -90,6 +90,7 @@ from services.wl_template_manager import WorkloadManager
     default='CRITICAL',
     help='Set the verbosity level (DEBUG, INFO, WARNING, ERROR, CRITICAL)'
 )
+@record_timings("workload-bootstrap")
 def bootstrap(
     wl_name: str, wl_repo_name: str, wl_gitops_repo_name: str, wl_template_url: str, wl_template_branch: str,
     wl_gitops_template_url: str, wl_gitops_template_branch: str, wl_svc_name: str, wl_svc_port: int, verbosity: str
@@ -3,12 +3,13 @@ import time
 import click
 from git import InvalidGitRepositoryError
 
-from common.const.const import WL_PR_BRANCH_NAME_PREFIX
+from common.const.const import WL_PR_BRANCH_NAME_PREFIX, TF_WL_STATE_SHARDING
 from common.custom_excpetions import GitBranchAlreadyExists, PullRequestCreationError
 from common.logging_config import configure_logging, logger
 from common.state_store import StateStore
-from common.utils.command_utils import check_installation_presence, \
-    initialize_gitops_repository, create_and_setup_branch, create_and_open_pull_request, preprocess_workload_names
+from common.utils.command_utils import check_installation_presence, prepare_cloud_provider_auth_env_vars, \
+    initialize_gitops_repository, create_and_setup_branch, create_and_open_pull_request, preprocess_workload_names, \
+    record_timings
 from services.platform_gitops import PlatformGitOpsRepo
 
 
@@ -27,13 +28,20 @@ from services.platform_gitops import PlatformGitOpsRepo
     'wl_gitops_repo_name',
     help='Workload GitOps repository name', type=click.STRING
 )
+@click.option(
+    '--sharded-state/--shared-state',
+    'sharded_state',
+    help='Keep workload VCS, secrets and core services resources in Terraform states of their own',
+    default=TF_WL_STATE_SHARDING
+)
 @click.option(
     '--verbosity',
     type=click.Choice(['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'], case_sensitive=False),
     default='CRITICAL',
     help='Set the verbosity level (DEBUG, INFO, WARNING, ERROR, CRITICAL)'
 )
-def create(wl_name: str, wl_repo_name: str, wl_gitops_repo_name: str, verbosity: str) -> None:
+@record_timings("workload-create")
+def create(wl_name: str, wl_repo_name: str, wl_gitops_repo_name: str, sharded_state: bool, verbosity: str) -> None:
     """
     Create workload boilerplate for GitOps.
 
@@ -41,6 +49,7 @@ def create(wl_name: str, wl_repo_name: str, wl_gitops_repo_name: str, verbosity:
         wl_name (str): Name of the workload.
         wl_repo_name (str): Name of the workload repository.
         wl_gitops_repo_name (str): Name of the workload GitOps repository.
+        sharded_state (bool): Keep the workload in Terraform states of its own.
         verbosity (str): Logging level.
     """
     func_start_time = time.time()
@@ -78,7 +87,9 @@ def create(wl_name: str, wl_repo_name: str, wl_gitops_repo_name: str, verbosity:
         gor=gor,
         wl_name=wl_name,
         wl_repo_name=wl_repo_name,
-        wl_gitops_repo_name=wl_gitops_repo_name
+        wl_gitops_repo_name=wl_gitops_repo_name,
+        sharded_state=sharded_state,
+        tf_env=prepare_cloud_provider_auth_env_vars(state_store)
     )
     click.echo("5/7: Workload added and changes committed.")
 
@@ -104,7 +115,8 @@ def create(wl_name: str, wl_repo_name: str, wl_gitops_repo_name: str, verbosity:
 
 
 def add_workload_and_commit(
-        gor: PlatformGitOpsRepo, wl_name: str, wl_repo_name: str, wl_gitops_repo_name: str
+        gor: PlatformGitOpsRepo, wl_name: str, wl_repo_name: str, wl_gitops_repo_name: str,
+        sharded_state: bool = TF_WL_STATE_SHARDING, tf_env: dict = None
 ) -> None:
     """
     Add the workload to the GitOps repository and commit changes.
@@ -114,7 +126,11 @@ def add_workload_and_commit(
         wl_name (str): Name of the workload.
         wl_repo_name (str): Name of the workload repository.
         wl_gitops_repo_name (str): Name of the workload GitOps repository.
+        sharded_state (bool): Keep the workload in Terraform states of its own.
+        tf_env (dict): Cloud provider credentials to read Terraform states of workload shards with.
     """
-    gor.add_workload(wl_name, wl_repo_name, wl_gitops_repo_name)
+    # shards of workloads deleted by merged PRs are no longer needed
+    gor.prune_workload_shards(env=tf_env)
+    gor.add_workload(wl_name, wl_repo_name, wl_gitops_repo_name, sharded_state=sharded_state)
     gor.upload_changes()
     logger.info("Workload added and committed to the repository.")
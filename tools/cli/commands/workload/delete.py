@@ -2,7 +2,7 @@ import os
 import shutil
 import time
 from datetime import datetime
-from typing import List
+from typing import Dict, List
 
 import click
 from git import InvalidGitRepositoryError
@@ -13,11 +13,12 @@ from common.const.parameter_names import GIT_ACCESS_TOKEN, GIT_ORGANIZATION_NAME
 from common.custom_excpetions import GitBranchAlreadyExists, PullRequestCreationError
 from common.logging_config import configure_logging, logger
 from common.state_store import StateStore
-from common.utils.command_utils import prepare_cloud_provider_auth_env_vars, set_envs, \
+from common.utils.command_utils import prepare_cloud_provider_auth_env_vars, \
     check_installation_presence, initialize_gitops_repository, create_and_setup_branch, \
-    create_and_open_pull_request, preprocess_workload_names
+    create_and_open_pull_request, preprocess_workload_names, record_timings
 from services.platform_gitops import PlatformGitOpsRepo
-from services.tf_wrapper import TfWrapper
+from services.tf_module_runner import TerraformJob, TerraformJobResult, TerraformModuleRunner
+from services.tf_wrapper import TF_PROFILE_DESTROY
 from services.wl_template_manager import WorkloadManager
 
 
@@ -58,6 +59,7 @@ from services.wl_template_manager import WorkloadManager
     default='CRITICAL',
     help='Set the verbosity level (DEBUG, INFO, WARNING, ERROR, CRITICAL)'
 )
+@record_timings("workload-delete")
 def delete(
         wl_names: List[str],
         delete_all: bool,
@@ -119,36 +121,41 @@ def delete(
     except GitBranchAlreadyExists as e:
         raise click.ClickException(str(e))
 
-    for index, wl_name in enumerate(wl_names):
-        wl_name, wl_repo_name, wl_gitops_repo_name = preprocess_workload_names(
-            logger=logger,
-            wl_name=wl_name,
-            wl_gitops_repo_name=wl_gitops_repo_name,
-        )
-        click.echo(f"3.{index}/{logging_total_steps}: Workload names processed.")
-
-        # Optionally destroy resources
-        if destroy_resources:
-            # to destroy workload resources, we need to clone workload gitops repo
-            # and call tf destroy while pointing to remote state
+    # shards of workloads deleted by merged PRs are no longer needed
+    gor.prune_workload_shards(env=prepare_cloud_provider_auth_env_vars(state_store))
+
+    workloads = [
+        preprocess_workload_names(logger=logger, wl_name=wl_name, wl_gitops_repo_name=wl_gitops_repo_name)
+        for wl_name in wl_names
+    ]
+    click.echo(f"3/{logging_total_steps}: Workload names processed.")
+
+    # Optionally destroy resources
+    if destroy_resources:
+        # to destroy workload resources, we need to clone workload gitops repos
+        # and call tf destroy while pointing to remote state.
+        # Repos are cloned first, so that resources of all workloads are destroyed concurrently
+        tf_env_vars = _prepare_tf_env_vars(state_store=state_store)
+        jobs = []
+        for wl_name, _, wl_gitops_repo_name in workloads:
             wl_gitops_manager = WorkloadManager(
                 org_name=state_store.parameters["<GIT_ORGANIZATION_NAME>"],
                 wl_repo_name=wl_gitops_repo_name,
                 ssh_pkey_path=state_store.internals["DEFAULT_SSH_PRIVATE_KEY_PATH"],
                 repo_manager=git_man
             )
-
             wl_gitops_repo_folder = wl_gitops_manager.clone_wl()
+            jobs.extend(destroy_tf_resources_jobs(wl_name, repo_folder=wl_gitops_repo_folder, env=tf_env_vars))
 
-            _set_tf_env_vars_for_tf(state_store=state_store)
-
-            destroy_all_tf_resources(repo_folder=wl_gitops_repo_folder)
+        results = TerraformModuleRunner(jobs).run()
 
-            # remove temp folder
-            shutil.rmtree(LOCAL_WORKLOAD_TEMP_FOLDER)
+        # remove temp folder
+        shutil.rmtree(LOCAL_WORKLOAD_TEMP_FOLDER)
 
-            click.echo(f"4.{index}/{logging_total_steps}: Workload \"{wl_name}\" resources destroyed.")
+        _check_tf_results(results)
+        click.echo(f"4/{logging_total_steps}: Workload resources destroyed.")
 
+    for index, (wl_name, _, _) in enumerate(workloads):
         commit_message = f"Remove secrets, groups, repository structure for workload \"{wl_name}\""
         _remove_workload_and_commit(wl_name=wl_name, gor=gor, commit_message=commit_message)
         click.echo(
@@ -193,15 +200,18 @@ def _remove_workload_and_commit(gor: PlatformGitOpsRepo, wl_name: str, commit_me
     logger.info(f"Workload removed and committed to the repository with message: {commit_message}")
 
 
-def _set_tf_env_vars_for_tf(state_store: StateStore) -> None:
+def _prepare_tf_env_vars(state_store: StateStore) -> dict:
     """
-    Set environment variables required for Terraform operations.
+    Prepare environment variables required for Terraform operations.
 
     Args:
         state_store (StateStore): State store instance for accessing configuration.
+
+    Returns:
+        dict: Environment variables passed to Terraform processes.
     """
     cloud_provider_auth_env_vars = prepare_cloud_provider_auth_env_vars(state_store)
-    tf_env_vars = {
+    return {
         **cloud_provider_auth_env_vars,
         **{
             "GITHUB_TOKEN": state_store.get_input_param(GIT_ACCESS_TOKEN),
@@ -210,40 +220,56 @@ def _set_tf_env_vars_for_tf(state_store: StateStore) -> None:
             "VAULT_ADDR": f'https://{state_store.parameters.get("<SECRET_MANAGER_INGRESS_URL>", None)}',
         }
     }
-    set_envs(tf_env_vars)
 
 
-def _destroy_tf_resources(tf_directory: str, resource_description: str) -> None:
+def destroy_tf_resources_jobs(wl_name: str, repo_folder: str, env: dict) -> List[TerraformJob]:
     """
-    Destroy Terraform resources in the specified directory.
+    Build Terraform jobs destroying all resources related to the workload in the specified repository folder.
+    Secrets are destroyed before cloud resources, jobs of different workloads are independent.
 
     Args:
-        tf_directory (str): Path to the Terraform directory containing configurations to be destroyed.
-        resource_description (str): Description of the resources being destroyed (e.g., 'WL secrets', 'WL cloud resources').
-    """
-    if os.path.exists(tf_directory):
-        logger.debug(f"Destroying {resource_description}...")
-        tf_wrapper = TfWrapper(tf_directory)
-        tf_wrapper.init()
-        tf_wrapper.destroy()
-        logger.info(f"Destroying {resource_description}. Done!")
-
+        wl_name (str): Name of the workload.
+        repo_folder (str): Path to the repository folder containing Terraform configurations.
+        env (dict): Environment variables passed to Terraform.
 
-def destroy_all_tf_resources(repo_folder: str) -> None:
+    Returns:
+        List[TerraformJob]: Destroy jobs of the existing Terraform modules.
     """
-    Destroy all Terraform resources related to the workload in the specified repository folder.
+    jobs = []
+    for module in ("secrets", "infrastructure"):
+        tf_directory = os.path.join(repo_folder, "terraform", module)
+        if os.path.exists(tf_directory):
+            jobs.append(TerraformJob(
+                name=f"{wl_name}-{module}",
+                working_dir=tf_directory,
+                command="destroy",
+                env=env,
+                profile=TF_PROFILE_DESTROY,
+                depends_on=[job.name for job in jobs],
+            ))
+    return jobs
+
+
+def _check_tf_results(results: Dict[str, TerraformJobResult]) -> None:
+    """
+    Report results of Terraform jobs per module.
 
     Args:
-        repo_folder (str): Path to the repository folder containing Terraform configurations.
+        results (Dict[str, TerraformJobResult]): Job name to its result.
+
+    Raises:
+        click.ClickException: If any of the jobs did not succeed.
     """
-    _destroy_tf_resources(
-        tf_directory=os.path.join(repo_folder, "terraform", "secrets"),
-        resource_description="WL secrets"
-    )
-    _destroy_tf_resources(
-        tf_directory=os.path.join(repo_folder, "terraform", "infrastructure"),
-        resource_description="WL cloud resources"
-    )
+    failed = []
+    for name, result in results.items():
+        message = f"Terraform {name}: {result.status} in {result.duration:.2f} seconds"
+        if result.status == TerraformJobResult.SUCCEEDED:
+            logger.info(message)
+            continue
+        failed.append(name)
+        click.secho(f"{message}{f', see {result.log_file}' if result.log_file else ''}", fg="red")
+    if failed:
+        raise click.ClickException(f"Could not destroy workload resources: {', '.join(failed)}")
 
 
 def _generate_destroy_branch_name(
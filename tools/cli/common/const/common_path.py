@@ -4,15 +4,31 @@ from pathlib import Path
 # todo: add override using env var
 LOCAL_FOLDER = Path().home() / os.environ.get("CGDEVX_LOCAL_FOLDER", ".cgdevx")
 LOCAL_GITOPS_FOLDER = LOCAL_FOLDER / "gitops"
+# pristine GitOps repo layout built from the template, rendered into LOCAL_GITOPS_FOLDER
+LOCAL_GITOPS_TEMPLATE_FOLDER = LOCAL_FOLDER / "gitops_template"
+LOCAL_GITOPS_TEMPLATE_INDEX = LOCAL_FOLDER / "gitops_template_index.json"
+LOCAL_GITOPS_RENDER_MANIFEST = LOCAL_FOLDER / "gitops_render_manifest.json"
 LOCAL_TF_FOLDER = LOCAL_GITOPS_FOLDER / "terraform"
 LOCAL_TF_FOLDER_HOSTING_PROVIDER = LOCAL_TF_FOLDER / "hosting_provider"
 LOCAL_TF_FOLDER_SECRETS_MANAGER = LOCAL_TF_FOLDER / "secrets"
 LOCAL_TF_FOLDER_USERS = LOCAL_TF_FOLDER / "users"
 LOCAL_TF_FOLDER_VCS = LOCAL_TF_FOLDER / "vcs"
 LOCAL_TF_FOLDER_CORE_SERVICES = LOCAL_TF_FOLDER / "core_services"
+# per workload Terraform states, and templates of their root modules
+LOCAL_TF_FOLDER_WORKLOADS = LOCAL_TF_FOLDER / "workloads"
+LOCAL_TF_FOLDER_WORKLOAD_SHARDS = LOCAL_TF_FOLDER / "workload_shards"
+LOCAL_ATLANTIS_CONFIG_FILE = LOCAL_GITOPS_FOLDER / "atlantis.yaml"
 LOCAL_TOOLS_FOLDER = LOCAL_FOLDER / "tools"
 LOCAL_TF_TOOL = LOCAL_TOOLS_FOLDER / "terraform"
 LOCAL_KCTL_TOOL = LOCAL_TOOLS_FOLDER / "kubectl"
 LOCAL_STATE_FILE = LOCAL_FOLDER / "state.yaml"
+LOCAL_TF_OUTPUT_CACHE_FILE = LOCAL_FOLDER / "tf_outputs.json"
+LOCAL_TIMINGS_FOLDER = LOCAL_FOLDER / "timings"
+LOCAL_TF_LOGS_FOLDER = LOCAL_FOLDER / "logs"
 LOCAL_CC_CLUSTER_WORKLOAD_FOLDER = LOCAL_GITOPS_FOLDER / "gitops-pipelines/delivery/clusters/cc-cluster/workloads"
 LOCAL_WORKLOAD_TEMP_FOLDER = LOCAL_FOLDER / ".wl_tmp"
+# caches shared by installations, kept on destroy
+LOCAL_CACHE_FOLDER = Path().home() / os.environ.get("CGDEVX_CACHE_FOLDER", ".cache/cgdevx")
+LOCAL_GIT_MIRROR_FOLDER = LOCAL_CACHE_FOLDER / "git_mirrors"
+LOCAL_TF_PLUGIN_CACHE_FOLDER = LOCAL_CACHE_FOLDER / "tf_plugin_cache"
+LOCAL_TF_PROVIDER_MIRROR_FOLDER = LOCAL_CACHE_FOLDER / "tf_provider_mirror"
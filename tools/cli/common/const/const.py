@@ -1,3 +1,5 @@
+import os
+
 # Import versions from centralized versions module
 from common.versions import (
     KUBECTL_VERSION,
@@ -26,3 +28,48 @@ WL_PR_BRANCH_NAME_PREFIX = "feature/"
 WL_GITOPS_REPOSITORY_URL = "https://github.com/wearevolt/devops-wl-gitops-template.git"
 WL_GITOPS_REPOSITORY_BRANCH = "main"
 WL_SERVICE_NAME = "default-service"
+PREFLIGHT_CHECK_TIMEOUT = 300  # in seconds
+# domain ownership check waits for the liveness TXT record propagation
+PREFLIGHT_DNS_CHECK_TIMEOUT = 1200  # in seconds
+# paths passed to a single git command, keeps command lines below OS limits
+GIT_PATHS_PER_COMMAND = 500
+# template rendering fans out over a "thread" or "process" pool
+TEMPLATE_RENDER_POOL = os.environ.get("CGDEVX_CLI_RENDER_POOL", "thread")
+TEMPLATE_RENDER_WORKERS = int(os.environ.get("CGDEVX_CLI_RENDER_WORKERS", min(32, (os.cpu_count() or 1) + 4)))
+# remote template and GitOps repositories are cloned through local bare mirrors
+GIT_MIRROR_ENABLED = os.environ.get("CGDEVX_CLI_GIT_MIRROR", "1") != "0"
+GIT_MIRROR_FETCH_INTERVAL = int(os.environ.get("CGDEVX_CLI_GIT_MIRROR_FETCH_INTERVAL", 300))  # in seconds
+GIT_MIRROR_MAX_AGE = 30 * 24 * 3600  # in seconds
+GIT_MIRROR_MAX_SIZE = 2 * 1024 ** 3  # in bytes
+# run terraform init even if the module configuration did not change since the last init
+TF_FORCE_INIT = os.environ.get("CGDEVX_CLI_TF_FORCE_INIT", "0") == "1"
+# plan before apply and skip apply of modules without changes
+TF_PLAN_BEFORE_APPLY = os.environ.get("CGDEVX_CLI_TF_PLAN_APPLY", "1") != "0"
+# last lines of Terraform output kept in memory, the whole output goes to the module log
+TF_OUTPUT_BUFFER_LINES = 1000
+TF_LOG_MAX_BYTES = 10 * 1024 ** 2
+TF_LOG_BACKUP_COUNT = 3
+# cached Terraform outputs are valid for, in seconds, 0 disables the cache
+TF_OUTPUT_CACHE_TTL = int(os.environ.get("CGDEVX_CLI_TF_OUTPUT_CACHE_TTL", 24 * 3600))
+# read Terraform outputs from the remote state backend with the cloud SDKs instead of running Terraform
+TF_REMOTE_STATE_READ = os.environ.get("CGDEVX_CLI_TF_REMOTE_STATE", "1") != "0"
+# Terraform modules run concurrently by TerraformModuleRunner
+TF_MODULE_WORKERS = int(os.environ.get("CGDEVX_CLI_TF_MODULE_WORKERS", 4))
+# concurrent resource operations of Terraform runs, overrides execution profiles when set
+TF_PARALLELISM = int(os.environ.get("CGDEVX_CLI_TF_PARALLELISM", 0)) or None
+TF_IAM_HEAVY_PARALLELISM = 30
+TF_DESTROY_PARALLELISM = 20
+# modules applied successfully within this time are re-applied without refresh by the auto refresh mode, in seconds
+TF_REFRESH_SKIP_WINDOW = int(os.environ.get("CGDEVX_CLI_TF_REFRESH_SKIP_WINDOW", 15 * 60))
+# give each new workload a Terraform state of its own for vcs, secrets and core_services modules
+TF_WL_STATE_SHARDING = os.environ.get("CGDEVX_CLI_TF_WL_SHARDED_STATE", "0") == "1"
+# connections to the Kubernetes API server kept open by a KubeClient for concurrent requests
+K8S_CONNECTION_POOL_SIZE = int(os.environ.get("CGDEVX_CLI_K8S_POOL_SIZE", 8))
+# idle time before TCP keep-alive probes of Kubernetes API connections, in seconds, 0 disables probes
+K8S_TCP_KEEPALIVE_IDLE = int(os.environ.get("CGDEVX_CLI_K8S_KEEPALIVE", 30))
+# server side timeout of a single Kubernetes watch request, longer waits restart the watch, in seconds
+K8S_WATCH_TIMEOUT = 60
+# serve KubeClient reads of the resources setup watches from watch-backed local caches instead of the API server
+K8S_INFORMERS = os.environ.get("CGDEVX_CLI_K8S_INFORMERS", "0") == "1"
+# max wait time for the initial list of an informer, reads go to the API server until it completes, in seconds
+K8S_INFORMER_SYNC_TIMEOUT = 30
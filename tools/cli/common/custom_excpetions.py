@@ -30,3 +30,19 @@ class WorkloadManagerError(Exception):
 
     def __init__(self, message: str):
         super().__init__(message)
+
+
+class StageGraphError(Exception):
+    """Exception raised when a stage graph is malformed (unknown dependency, duplicate stage or cycle)."""
+
+    def __init__(self, message: str):
+        super().__init__(message)
+
+
+class TemplateRenderError(Exception):
+    """Exception raised when one or more template files fail to render."""
+
+    def __init__(self, failures: dict):
+        self.failures = failures
+        details = "\n".join(f"  - {path}: {error}" for path, error in sorted(failures.items()))
+        super().__init__(f"Error while parametrizing {len(failures)} file(s):\n{details}")
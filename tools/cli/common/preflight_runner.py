@@ -0,0 +1,89 @@
+"""Concurrent execution of independent pre-flight checks."""
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import click
+
+from common.const.const import PREFLIGHT_CHECK_TIMEOUT
+from common.logging_config import logger
+from common.timing_recorder import TimingRecorder
+
+PREFLIGHT_CATEGORY = "preflight"
+
+
+@dataclass
+class PreflightCheck:
+    """
+    Single pre-flight check.
+
+    :param name: Unique check name, used in error reporting
+    :param func: Callable executing the check, raises on failure, its return value is collected
+    :param timeout: Maximum time to wait for the check, seconds
+    :param done_message: Message printed when the check succeeds
+    """
+    name: str
+    func: Callable[[], Any]
+    timeout: float = PREFLIGHT_CHECK_TIMEOUT
+    done_message: Optional[str] = None
+
+
+def run_preflight_checks(checks: List[PreflightCheck]) -> Dict[str, Any]:
+    """
+    Run pre-flight checks concurrently, one worker per check.
+    All checks are awaited, so that every failure is reported at once instead of one per run.
+    Checks are executed in daemon threads, a check exceeding its timeout is abandoned and does not block the exit.
+    :param checks: Checks to execute
+    :return: Check name to the value returned by the check
+    :raises click.ClickException: When any of the checks fails or times out
+    """
+    outcomes: queue.Queue = queue.Queue()
+    recorder = TimingRecorder()
+
+    def worker(check: PreflightCheck):
+        try:
+            with recorder.span(check.name, PREFLIGHT_CATEGORY):
+                result = check.func()
+            outcomes.put((check.name, result, None))
+        except Exception as e:
+            outcomes.put((check.name, None, e))
+
+    started_at = time.monotonic()
+    deadlines = {}
+    for check in checks:
+        deadlines[check.name] = started_at + check.timeout
+        threading.Thread(target=worker, args=(check,), name=f"preflight-{check.name}", daemon=True).start()
+
+    by_name = {check.name: check for check in checks}
+    results: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+    while deadlines:
+        try:
+            name, result, error = outcomes.get(timeout=max(0.0, min(deadlines.values()) - time.monotonic()))
+        except queue.Empty:
+            now = time.monotonic()
+            for name in [n for n, deadline in deadlines.items() if deadline <= now]:
+                logger.error(f"Pre-flight check {name} timed out")
+                errors[name] = f"timed out after {by_name[name].timeout:.0f}s"
+                del deadlines[name]
+            continue
+
+        if name not in deadlines:
+            # already reported as timed out
+            continue
+        del deadlines[name]
+        if error is not None:
+            logger.error(f"Pre-flight check {name} failed: {error}")
+            errors[name] = error.message if isinstance(error, click.ClickException) else str(error)
+            continue
+        results[name] = result
+        if by_name[name].done_message:
+            click.echo(by_name[name].done_message)
+
+    if errors:
+        details = "\n".join(f"  - {name}: {errors[name]}" for name in by_name if name in errors)
+        raise click.ClickException(f"Pre-flight checks failed:\n{details}")
+
+    return results
@@ -0,0 +1,155 @@
+"""Dependency-aware runner for checkpointed CLI stages."""
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import click
+
+from common.custom_excpetions import StageGraphError
+from common.logging_config import logger
+from common.state_store import StateStore
+from common.timing_recorder import TimingRecorder, STAGE_CATEGORY
+
+
+@dataclass
+class Stage:
+    """
+    Single node of a stage graph.
+
+    :param name: Unique stage name, also used as the StateStore checkpoint name
+    :param func: Callable executing the stage
+    :param depends_on: Names of the stages that must be completed before this one starts
+    :param always_run: Execute the stage even when its checkpoint is already set
+    :param checkpoint: Record a checkpoint once the stage is completed
+    :param skip_message: Message printed when the stage is skipped because of an existing checkpoint
+    """
+    name: str
+    func: Callable[[], None]
+    depends_on: List[str] = field(default_factory=list)
+    always_run: bool = False
+    checkpoint: bool = True
+    skip_message: Optional[str] = None
+
+
+class StageScheduler:
+    """
+    Executes a graph of stages with bounded concurrency.
+
+    A stage is started as soon as all of its dependencies are completed (or skipped because of an existing
+    checkpoint). Checkpoints are recorded and persisted as soon as each stage finishes. On the first failure
+    no new stages are started, the stages already running are allowed to finish and the first error is re-raised.
+    """
+
+    def __init__(self, stages: List[Stage], max_workers: int = 1):
+        self._stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self._stages:
+                raise StageGraphError(f"Duplicate stage '{stage.name}'")
+            self._stages[stage.name] = stage
+
+        for stage in stages:
+            for dependency in stage.depends_on:
+                if dependency not in self._stages:
+                    raise StageGraphError(f"Stage '{stage.name}' depends on unknown stage '{dependency}'")
+
+        self._order = self._topological_order()
+        self._max_workers = max(1, max_workers)
+
+    @property
+    def order(self) -> List[str]:
+        """Stage names in execution order for a single worker"""
+        return list(self._order)
+
+    @property
+    def checkpoints(self) -> List[str]:
+        """Names of the stages recording a checkpoint, in execution order"""
+        return [name for name in self._order if self._stages[name].checkpoint]
+
+    @staticmethod
+    def _is_completed(stage: Stage, state: StateStore) -> bool:
+        return stage.checkpoint and not stage.always_run and state.has_checkpoint(stage.name)
+
+    @staticmethod
+    def _run_stage(stage: Stage) -> None:
+        with TimingRecorder().span(stage.name, STAGE_CATEGORY):
+            stage.func()
+
+    def downstream(self, name: str) -> List[str]:
+        """
+        Get a stage and all stages transitively depending on it
+        :param name: Stage name
+        :return: Stage names in execution order
+        """
+        affected = {name}
+        for stage_name in self._order:
+            if affected.intersection(self._stages[stage_name].depends_on):
+                affected.add(stage_name)
+        return [stage_name for stage_name in self._order if stage_name in affected]
+
+    def run(self, state: StateStore) -> None:
+        """
+        Execute all stages of the graph
+        :param state: State store holding checkpoints
+        :return: None, re-raises the first stage error
+        """
+        pending = list(self._order)
+        completed = set()
+        running: Dict[Future, Stage] = {}
+        failures: List[BaseException] = []
+        TimingRecorder().set_stage_graph({name: stage.depends_on for name, stage in self._stages.items()})
+
+        with ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="stage") as executor:
+            while running or (pending and not failures):
+                if not failures:
+                    # pending is topologically ordered, so a single pass also propagates skipped stages
+                    for name in list(pending):
+                        stage = self._stages[name]
+                        if not completed.issuperset(stage.depends_on):
+                            continue
+                        if self._is_completed(stage, state):
+                            pending.remove(name)
+                            completed.add(name)
+                            if stage.skip_message:
+                                click.echo(stage.skip_message)
+                            continue
+                        if len(running) < self._max_workers:
+                            pending.remove(name)
+                            logger.info(f"Starting stage {name}")
+                            running[executor.submit(self._run_stage, stage)] = stage
+
+                if not running:
+                    if pending and not failures:
+                        raise StageGraphError(f"Could not schedule stages: {', '.join(pending)}")
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        logger.error(f"Stage {stage.name} failed: {error}")
+                        failures.append(error)
+                        continue
+
+                    logger.info(f"Stage {stage.name} completed")
+                    completed.add(stage.name)
+                    if stage.checkpoint:
+                        state.set_checkpoint(stage.name)
+                        state.save_checkpoint()
+
+        if failures:
+            raise failures[0]
+
+    def _topological_order(self) -> List[str]:
+        # keeps the declaration order wherever dependencies allow it
+        order = []
+        placed = set()
+        remaining = list(self._stages)
+        while remaining:
+            ready = next((n for n in remaining if placed.issuperset(self._stages[n].depends_on)), None)
+            if ready is None:
+                raise StageGraphError(f"Dependency cycle between stages: {', '.join(remaining)}")
+            order.append(ready)
+            placed.add(ready)
+            remaining.remove(ready)
+        return order
@@ -1,5 +1,7 @@
 """Global parameter store."""
 import os
+import threading
+from typing import Iterable
 
 import yaml
 
@@ -15,6 +17,8 @@ from common.tracing_decorator import trace
 
 class StateStore:
     _store: dict = {}
+    # guards checkpoint updates and state file writes issued by concurrently running stages
+    _lock = threading.RLock()
 
     def __init__(self, input_params: None | dict = None):
         if input_params is None:
@@ -94,8 +98,9 @@ class StateStore:
     @classmethod
     def set_checkpoint(cls, name: str):
         # Make checkpoint setting idempotent
-        if name not in cls._store[STATE_CHECKPOINTS]:
-            cls._store[STATE_CHECKPOINTS].append(name)
+        with cls._lock:
+            if name not in cls._store[STATE_CHECKPOINTS]:
+                cls._store[STATE_CHECKPOINTS].append(name)
 
     @classmethod
     def has_checkpoint(cls, name: str):
@@ -121,11 +126,24 @@ class StateStore:
         idx = cps.index(checkpoint)
         cls._store[STATE_CHECKPOINTS] = cps[: idx if inclusive else idx + 1]
 
+    @classmethod
+    def remove_checkpoints(cls, checkpoints: Iterable[str]):
+        """
+        Remove the given checkpoints from the stored list, keeping the order of the remaining ones.
+        """
+        with cls._lock:
+            to_remove = set(checkpoints)
+            cls._store[STATE_CHECKPOINTS] = [c for c in cls._store.get(STATE_CHECKPOINTS, []) if c not in to_remove]
+
     @classmethod
     def save_checkpoint(cls):
-        os.makedirs(os.path.dirname(LOCAL_STATE_FILE), exist_ok=True)
-        with open(LOCAL_STATE_FILE, "w+") as outfile:
-            yaml.dump(cls._store, outfile, default_flow_style=False)
+        with cls._lock:
+            # stages running in parallel keep writing parameters while the state is dumped,
+            # serialize a shallow snapshot of every section instead of the live dictionaries
+            snapshot = {k: v.copy() if isinstance(v, (dict, list)) else v for k, v in cls._store.items()}
+            os.makedirs(os.path.dirname(LOCAL_STATE_FILE), exist_ok=True)
+            with open(LOCAL_STATE_FILE, "w+") as outfile:
+                yaml.dump(snapshot, outfile, default_flow_style=False)
 
 
 def param_validator(paras: StateStore) -> bool:
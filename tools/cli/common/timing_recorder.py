@@ -0,0 +1,248 @@
+"""Wall-clock timing profile of CLI commands."""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from common.const.common_path import LOCAL_TIMINGS_FOLDER
+from common.logging_config import logger
+from common.singleton_metaclass import SingletonMeta
+
+STAGE_CATEGORY = "stage"
+
+
+@dataclass
+class TimingSpan:
+    """
+    Single timed operation.
+
+    :param name: Operation name
+    :param category: Operation category, e.g. stage, terraform, k8s, cloud, vcs, dns
+    :param start: Start offset from the beginning of the command, seconds
+    :param duration: Wall-clock duration, seconds
+    :param status: "ok" or "error"
+    :param thread: Name of the thread executing the operation
+    :param details: Settings the operation ran with and their effect, e.g. Terraform execution profile
+    """
+    name: str
+    category: str
+    start: float
+    duration: float
+    status: str
+    thread: str
+    details: Dict[str, Any] = field(default_factory=dict)
+
+
+class TimingRecorder(metaclass=SingletonMeta):
+    """
+    Collects timing spans of a single CLI command run and persists them next to the local state file.
+    Thread-safe, spans could be recorded from concurrently running stages.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._command: Optional[str] = None
+        self._started_at: float = time.time()
+        self._origin: float = time.perf_counter()
+        self._spans: List[TimingSpan] = []
+        self._stage_graph: Dict[str, List[str]] = {}
+
+    @property
+    def spans(self) -> List[TimingSpan]:
+        with self._lock:
+            return list(self._spans)
+
+    @property
+    def total_duration(self) -> float:
+        return time.perf_counter() - self._origin
+
+    @staticmethod
+    def format_duration(seconds: float) -> str:
+        minutes, seconds = divmod(seconds, 60)
+        if minutes >= 1:
+            return f"{int(minutes)}m {seconds:04.1f}s"
+        return f"{seconds:.1f}s"
+
+    def start(self, command: str) -> None:
+        """
+        Reset the recorder for a new command run
+        :param command: Command name, used in the persisted file name
+        """
+        with self._lock:
+            self._command = command
+            self._started_at = time.time()
+            self._origin = time.perf_counter()
+            self._spans = []
+            self._stage_graph = {}
+
+    def set_stage_graph(self, graph: Dict[str, List[str]]) -> None:
+        """
+        Register stage dependencies used to compute the critical path
+        :param graph: Stage name to the list of stage names it depends on
+        """
+        with self._lock:
+            self._stage_graph = {k: list(v) for k, v in graph.items()}
+
+    @contextmanager
+    def span(self, name: str, category: str, details: Optional[Dict[str, Any]] = None):
+        """
+        Time the enclosed block. A span nested in a span of the same category in the same thread is not recorded,
+        so that a traced call made by another traced call of the same service is not counted twice.
+        :param name: Operation name
+        :param category: Operation category
+        :param details: Settings of the operation, the block could add its effect to the yielded dictionary
+        """
+        details = {} if details is None else details
+        stack = self._local.__dict__.setdefault("categories", [])
+        if stack and stack[-1] == category:
+            yield details
+            return
+
+        stack.append(category)
+        status = "ok"
+        start = time.perf_counter()
+        try:
+            yield details
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            end = time.perf_counter()
+            stack.pop()
+            with self._lock:
+                self._spans.append(TimingSpan(
+                    name=name,
+                    category=category,
+                    start=round(start - self._origin, 3),
+                    duration=round(end - start, 3),
+                    status=status,
+                    thread=threading.current_thread().name,
+                    details=details
+                ))
+
+    def add_span(self, name: str, category: str, duration: float, status: str = "ok") -> None:
+        """
+        Record an operation timed elsewhere, e.g. by an external tool, which has just finished
+        :param name: Operation name
+        :param category: Operation category
+        :param duration: Wall-clock duration, seconds
+        :param status: "ok" or "error"
+        """
+        end = time.perf_counter()
+        with self._lock:
+            self._spans.append(TimingSpan(
+                name=name,
+                category=category,
+                start=round(max(end - duration - self._origin, 0.0), 3),
+                duration=round(duration, 3),
+                status=status,
+                thread=threading.current_thread().name
+            ))
+
+    def save(self) -> Optional[Path]:
+        """
+        Persist collected spans as JSON into the local timings folder
+        :return: Path to the written file or None when nothing was recorded
+        """
+        if self._command is None:
+            return None
+        payload = {
+            "command": self._command,
+            "started_at": datetime.fromtimestamp(self._started_at).isoformat(timespec="seconds"),
+            "total_duration": round(self.total_duration, 3),
+            "stage_graph": self._stage_graph,
+            "spans": [asdict(s) for s in self.spans],
+        }
+        file_name = f'{self._command}-{datetime.fromtimestamp(self._started_at).strftime("%Y%m%d-%H%M%S")}.json'
+        try:
+            os.makedirs(LOCAL_TIMINGS_FOLDER, exist_ok=True)
+            path = LOCAL_TIMINGS_FOLDER / file_name
+            with open(path, "w") as outfile:
+                json.dump(payload, outfile, indent=2)
+        except OSError as e:
+            logger.warning(f"Could not persist timings: {e}")
+            return None
+        return path
+
+    def critical_path(self) -> List[Tuple[str, float]]:
+        """
+        Longest chain of dependent stages by accumulated wall-clock.
+        Without a registered stage graph stages are treated as a sequential chain in start order.
+        :return: List of (stage name, duration) along the critical path
+        """
+        stage_spans = sorted((s for s in self.spans if s.category == STAGE_CATEGORY), key=lambda s: s.start)
+        durations = {s.name: s.duration for s in stage_spans}
+
+        graph = self._stage_graph
+        if not graph:
+            names = [s.name for s in stage_spans]
+            graph = {name: names[i - 1:i] for i, name in enumerate(names)}
+
+        finish: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+        remaining = list(graph)
+        while remaining:
+            ready = [n for n in remaining if all(d in finish for d in graph[n])]
+            if not ready:
+                break
+            for name in ready:
+                slowest = max(graph[name], key=lambda d: finish[d], default=None)
+                finish[name] = durations.get(name, 0.0) + (finish[slowest] if slowest else 0.0)
+                previous[name] = slowest
+                remaining.remove(name)
+
+        if not finish:
+            return []
+        path = []
+        name = max(finish, key=lambda n: finish[n])
+        while name is not None:
+            if name in durations:
+                path.append((name, durations[name]))
+            name = previous[name]
+        return list(reversed(path))
+
+    def slowest(self, top_n: int = 10) -> List[TimingSpan]:
+        """
+        Slowest operations excluding whole stages
+        :param top_n: Number of operations to return
+        :return: Spans sorted by duration, descending
+        """
+        operations = [s for s in self.spans if s.category != STAGE_CATEGORY]
+        return sorted(operations, key=lambda s: s.duration, reverse=True)[:top_n]
+
+    def report(self, top_n: int = 10) -> str:
+        """
+        Human-readable timing report
+        :param top_n: Number of slowest operations to show
+        :return: Report text
+        """
+        lines = [f"Timings for {self._command} (total {self.format_duration(self.total_duration)}):"]
+
+        critical_path = self.critical_path()
+        if critical_path:
+            lines.append("Critical path:")
+            for name, duration in critical_path:
+                lines.append(f"  {name:<40} {self.format_duration(duration):>10}")
+
+        profiled = [s for s in self.spans if "profile" in s.details]
+        if profiled:
+            lines.append("Execution profiles:")
+            for s in profiled:
+                settings = ", ".join(f"{k} {v}" for k, v in s.details.items() if k != "profile")
+                lines.append(f"  {s.name:<40} {s.details['profile']:<12} {self.format_duration(s.duration):>10}"
+                             f"  {settings}")
+
+        slowest = self.slowest(top_n)
+        if slowest:
+            lines.append(f"Top {len(slowest)} slowest operations:")
+            for s in slowest:
+                failed = " (failed)" if s.status != "ok" else ""
+                lines.append(f"  {s.name:<60} {s.category:<10} {self.format_duration(s.duration):>10}{failed}")
+
+        return "\n".join(lines)
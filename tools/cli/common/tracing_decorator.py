@@ -1,11 +1,41 @@
 import functools
 import logging
+import time
 
 from common.logging_config import logger
+from common.timing_recorder import TimingRecorder
+
+# service packages whose traced calls are recorded as timing spans, module prefix to timing category
+TIMED_SERVICE_MODULES = {
+    "services.cloud.": "cloud",
+    "services.vcs.": "vcs",
+    "services.dns.": "dns",
+    "services.k8s.": "k8s",
+}
+
+
+def _timing_category(func) -> str | None:
+    module = getattr(func, "__module__", "") or ""
+    for prefix, category in TIMED_SERVICE_MODULES.items():
+        if module.startswith(prefix):
+            return category
+    return None
+
+
+def _span_name(func, args) -> str:
+    # k8s waits receive the watched object, add its name to tell the waits apart
+    if len(args) > 1:
+        metadata = getattr(args[1], "metadata", None)
+        name = getattr(metadata, "name", None)
+        if isinstance(name, str):
+            return f"{func.__qualname__}({name})"
+    return func.__qualname__
 
 
 def trace():
     def decorator(func):
+        category = _timing_category(func)
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             level = logger.getEffectiveLevel()
@@ -30,14 +60,21 @@ def trace():
             except Exception:
                 pass
 
+            start = time.perf_counter()
             try:
-                result = func(*args, **kwargs)
-                logger.debug(f"function {func.__qualname__}.{func.__name__} returned {str(result)}")
+                if category is None:
+                    result = func(*args, **kwargs)
+                else:
+                    with TimingRecorder().span(_span_name(func, args), category):
+                        result = func(*args, **kwargs)
+                elapsed = time.perf_counter() - start
+                logger.debug(f"function {func.__qualname__}.{func.__name__} returned {str(result)} in {elapsed:.2f}s")
                 if level is not logging.DEBUG:
-                    logger.info(f"function {func.__qualname__}.{func.__name__} exited")
+                    logger.info(f"function {func.__qualname__}.{func.__name__} exited in {elapsed:.2f}s")
                 return result
             except Exception as e:
-                logger.exception(f"Exception raised in {func.__name__}. exception: {str(e)}")
+                elapsed = time.perf_counter() - start
+                logger.exception(f"Exception raised in {func.__name__} after {elapsed:.2f}s. exception: {str(e)}")
                 raise e
 
         return wrapper
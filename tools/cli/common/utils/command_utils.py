@@ -1,3 +1,4 @@
+import functools
 import os
 import time
 import webbrowser
@@ -19,6 +20,7 @@ from common.enums.dns_registrars import DnsRegistrars
 from common.enums.git_providers import GitProviders
 from common.retry_decorator import exponential_backoff
 from common.state_store import StateStore
+from common.timing_recorder import TimingRecorder
 from services.cloud.aws.aws_manager import AWSManager
 from services.cloud.azure.azure_manager import AzureManager
 from services.cloud.cloud_provider_manager import CloudProviderManager
@@ -155,11 +157,18 @@ def unset_envs(env_vars):
 
 
 def wait(seconds: float = 15):
-    time.sleep(seconds)
+    with TimingRecorder().span(f"wait {seconds}s", "wait"):
+        time.sleep(seconds)
 
 
-@exponential_backoff()
 def wait_http_endpoint_readiness(endpoint: str):
+    # readiness usually means DNS propagation and certificate issuance, time the whole retry loop
+    with TimingRecorder().span(f"endpoint readiness {endpoint}", "http"):
+        _probe_http_endpoint(endpoint)
+
+
+@exponential_backoff()
+def _probe_http_endpoint(endpoint: str):
     try:
         response = requests.get(endpoint,
                                 verify=False,
@@ -329,3 +338,35 @@ def construct_wl_iam_role(
         return f"arn:aws:iam::{cloud_account}:role/{cluster_name}-{wl_name}-{wl_svc_name}-role"
     else:
         return "<set workload role mapping here>"
+
+
+def record_timings(command_name: str):
+    """
+    Decorator for click commands adding `--timings` and `--timings-top` options.
+    Timings of the command run are always persisted to the local timings folder,
+    the report (critical path and slowest operations) is printed when requested.
+
+    Args:
+        command_name (str): Command name used in the persisted timings file name.
+    """
+    def decorator(func):
+        @click.option('--timings', 'show_timings', is_flag=True, default=False,
+                      help='Print timing report (critical path and slowest operations) when the command finishes')
+        @click.option('--timings-top', 'timings_top', type=click.IntRange(min=1), default=10,
+                      help='Number of slowest operations shown in the timing report')
+        @functools.wraps(func)
+        def wrapper(*args, show_timings: bool = False, timings_top: int = 10, **kwargs):
+            recorder = TimingRecorder()
+            recorder.start(command_name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timings_path = recorder.save()
+                if show_timings:
+                    click.echo(recorder.report(timings_top))
+                    if timings_path:
+                        click.echo(f"Timings saved to {timings_path}")
+
+        return wrapper
+
+    return decorator
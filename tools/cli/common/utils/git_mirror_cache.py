@@ -0,0 +1,190 @@
+"""Local cache of remote git repositories kept as bare mirrors."""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from git import GitError, Repo
+
+from common.const.common_path import LOCAL_GIT_MIRROR_FOLDER
+from common.const.const import GIT_MIRROR_ENABLED, GIT_MIRROR_FETCH_INTERVAL, GIT_MIRROR_MAX_AGE, \
+    GIT_MIRROR_MAX_SIZE
+from common.logging_config import logger
+
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(key: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(key, threading.Lock())
+
+
+def _folder_size(folder: Path) -> int:
+    size = 0
+    for root, dirs, files in os.walk(folder):
+        for name in files:
+            try:
+                size += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return size
+
+
+class GitMirrorCache:
+    """
+    Bare mirrors of remote repositories keyed by the remote URL digest.
+    A mirror is cloned once and then updated with incremental fetches. Working copies are cloned from the mirror
+    as a local clone, so that git hardlinks its object files instead of copying or downloading them, and the
+    origin remote is pointed back to the original URL afterwards. Unlike --reference, a hardlinked clone does not
+    depend on the mirror, so that evicting or repacking a mirror never breaks existing working copies.
+    Mirrors not used for longer than the max age are evicted, then the least recently used ones until the cache
+    fits the max size.
+    """
+
+    def __init__(self, root: Union[str, Path] = LOCAL_GIT_MIRROR_FOLDER, max_size: int = GIT_MIRROR_MAX_SIZE,
+                 max_age: int = GIT_MIRROR_MAX_AGE, fetch_interval: int = GIT_MIRROR_FETCH_INTERVAL):
+        """
+        :param root: Cache folder
+        :param max_size: Max total size of mirrors, in bytes
+        :param max_age: Max time since the last use of a mirror, in seconds
+        :param fetch_interval: Time since the last fetch within which a mirror is considered up to date, in seconds
+        """
+        self.root = Path(root)
+        self.max_size = max_size
+        self.max_age = max_age
+        self.fetch_interval = fetch_interval
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.strip().rstrip("/").encode()).hexdigest()[:32]
+
+    def mirror_path(self, url: str) -> Path:
+        return self.root / f"{self.key(url)}.git"
+
+    def _meta_path(self, url: str) -> Path:
+        return self.root / f"{self.key(url)}.json"
+
+    def _read_meta(self, meta_path: Path) -> dict:
+        try:
+            with open(meta_path, "r") as infile:
+                return json.load(infile)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self, meta_path: Path, meta: dict) -> None:
+        tmp_path = meta_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w") as outfile:
+            json.dump(meta, outfile)
+        os.replace(tmp_path, meta_path)
+
+    def update(self, url: str, env: Optional[Dict[str, str]] = None, progress=None,
+               fetch_interval: Optional[int] = None) -> Path:
+        """
+        Create the mirror of a remote repository, or fetch new objects into an existing one
+        :param url: Remote repository URL
+        :param env: Environment of git commands, e.g. GIT_SSH_COMMAND
+        :param progress: GitPython progress handler
+        :param fetch_interval: Override of the cache fetch interval, 0 always fetches
+        :return: Mirror path
+        """
+        key = self.key(url)
+        mirror = self.mirror_path(url)
+        meta_path = self._meta_path(url)
+        fetch_interval = self.fetch_interval if fetch_interval is None else fetch_interval
+
+        with _lock_for(key):
+            meta = self._read_meta(meta_path)
+            now = time.time()
+            if mirror.exists() and meta:
+                if now - meta.get("fetched", 0) >= fetch_interval:
+                    logger.debug(f"Fetching {url} into mirror {mirror}")
+                    repo = Repo(mirror)
+                    with repo.git.custom_environment(**(env or {})):
+                        repo.remotes.origin.fetch(prune=True, progress=progress)
+                    meta["fetched"] = now
+            else:
+                logger.debug(f"Creating mirror {mirror} of {url}")
+                os.makedirs(self.root, exist_ok=True)
+                tmp_mirror = self.root / f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+                shutil.rmtree(tmp_mirror, ignore_errors=True)
+                try:
+                    repo = Repo.clone_from(url, tmp_mirror, bare=True, env=env, progress=progress)
+                    # bare clones do not track remote branches, keep branches in sync on fetch
+                    with repo.config_writer() as config:
+                        config.set_value('remote "origin"', "fetch", "+refs/heads/*:refs/heads/*")
+                    shutil.rmtree(mirror, ignore_errors=True)
+                    os.replace(tmp_mirror, mirror)
+                finally:
+                    shutil.rmtree(tmp_mirror, ignore_errors=True)
+                meta = {"url": url, "fetched": now}
+            meta["used"] = now
+            self._write_meta(meta_path, meta)
+
+        self.evict(keep=[key])
+        return mirror
+
+    def clone(self, url: str, to_path: Union[str, Path], branch: Optional[str] = None,
+              env: Optional[Dict[str, str]] = None, progress=None, fetch_interval: Optional[int] = None) -> Repo:
+        """
+        Clone a remote repository through its mirror. Falls back to a direct clone when the mirror could not be
+        updated, or when the cache is disabled with CGDEVX_CLI_GIT_MIRROR=0.
+        :param url: Remote repository URL
+        :param to_path: Destination folder
+        :param branch: Branch to check out, remote default branch when None
+        :param env: Environment of git commands, e.g. GIT_SSH_COMMAND
+        :param progress: GitPython progress handler
+        :param fetch_interval: Override of the cache fetch interval, 0 always fetches
+        :return: Cloned repository with origin pointing to the URL
+        """
+        kwargs = {"branch": branch} if branch else {}
+        if not GIT_MIRROR_ENABLED:
+            return Repo.clone_from(url, to_path, env=env, progress=progress, **kwargs)
+
+        try:
+            mirror = self.update(url, env=env, progress=progress, fetch_interval=fetch_interval)
+        except GitError as e:
+            logger.warning(f"Could not update the mirror of {url}, cloning directly: {e}")
+            return Repo.clone_from(url, to_path, env=env, progress=progress, **kwargs)
+
+        repo = Repo.clone_from(str(mirror), to_path, env=env, **kwargs)
+        repo.remotes.origin.set_url(url)
+        return repo
+
+    def evict(self, keep: Optional[List[str]] = None) -> List[str]:
+        """
+        Remove mirrors over the max age, then least recently used ones over the max size
+        :param keep: Keys of mirrors to retain regardless of the limits
+        :return: Removed mirror keys
+        """
+        keep = set(keep or [])
+        if not self.root.exists():
+            return []
+
+        now = time.time()
+        mirrors = []
+        for meta_path in self.root.glob("*.json"):
+            key = meta_path.stem
+            mirror = self.root / f"{key}.git"
+            used = self._read_meta(meta_path).get("used", 0)
+            mirrors.append((used, key, mirror, meta_path, _folder_size(mirror)))
+        mirrors.sort()
+
+        total = sum(mirror[-1] for mirror in mirrors)
+        removed = []
+        for used, key, mirror, meta_path, size in mirrors:
+            if key in keep:
+                continue
+            if now - used <= self.max_age and total <= self.max_size:
+                continue
+            with _lock_for(key):
+                shutil.rmtree(mirror, ignore_errors=True)
+                meta_path.unlink(missing_ok=True)
+            total -= size
+            removed.append(key)
+            logger.debug(f"Evicted git mirror {mirror}")
+        return removed
@@ -1,3 +1,5 @@
+import json
+from types import SimpleNamespace
 from typing import Optional
 
 import kr8s
@@ -8,6 +10,8 @@ from kubernetes.client.rest import ApiException
 
 from common.logging_config import logger
 from services.k8s.config_builder import repair_kubeconfig_file
+from services.k8s.projection import project
+from services.k8s.resumable_watch import list_raw
 
 
 def find_pod_by_name_fragment(
@@ -48,12 +52,14 @@ def find_pod_by_name_fragment(
 
         v1_api = k8s_client.CoreV1Api()
         logger.info(f"Searching for pods containing '{name_fragment}' in their name in namespace {namespace}")
-        pods = v1_api.list_namespaced_pod(namespace, watch=False)
+        # pods are scanned as raw JSON, only the matching one is deserialized into a model
+        pods = list_raw(v1_api.list_namespaced_pod, namespace=namespace)
 
-        for pod in pods.items:
-            if name_fragment in pod.metadata.name and pod.status.phase == 'Running':
-                logger.info(f"Found pod: {pod.metadata.name}")
-                return pod
+        for item in pods["items"]:
+            pod = project(item)
+            if name_fragment in pod.name and pod.phase == 'Running':
+                logger.info(f"Found pod: {pod.name}")
+                return v1_api.api_client.deserialize(SimpleNamespace(data=json.dumps(item)), "V1Pod")
         logger.warning(f"No pod matching the name fragment '{name_fragment}' found in namespace {namespace}")
         return None
     except FileNotFoundError as e:
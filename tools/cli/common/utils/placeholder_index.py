@@ -0,0 +1,113 @@
+"""Index of placeholders used in a template tree."""
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+from common.logging_config import logger
+
+# parameter placeholders, e.g. <PLATFORM_NAME>, and fragment placeholders, e.g. # <TF_VCS_REMOTE_BACKEND>
+PLACEHOLDER_TOKEN_RE = re.compile(r"(?:# )?<[A-Z0-9_]+>")
+PLACEHOLDER_INDEX_VERSION = 1
+
+
+class PlaceholderIndex:
+    """
+    Placeholder tokens of a template tree: token to files using it, and file to tokens it uses.
+    Files are keyed by their POSIX path relative to the tree root.
+    """
+
+    def __init__(self, files: Dict[str, List[str]] = None):
+        """
+        :param files: File to sorted unique tokens
+        """
+        self.files: Dict[str, List[str]] = files or {}
+        self.tokens: Dict[str, List[str]] = {}
+        for file, tokens in sorted(self.files.items()):
+            for token in tokens:
+                self.tokens.setdefault(token, []).append(file)
+
+    @classmethod
+    def build(cls, files: Dict[str, Union[str, Path]], is_template: callable) -> "PlaceholderIndex":
+        """
+        Scan template files once
+        :param files: File key, e.g. its path in the rendered tree, to the template file
+        :param is_template: Predicate selecting template files by name
+        :return: Index of the files
+        """
+        index = {}
+        for key, file_path in files.items():
+            if not is_template(str(file_path)):
+                continue
+            with open(file_path, "r") as file:
+                index[key] = sorted(set(PLACEHOLDER_TOKEN_RE.findall(file.read())))
+        return cls(index)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> Optional["PlaceholderIndex"]:
+        """
+        :param path: Index file
+        :return: Index, or None when the file is missing or unreadable
+        """
+        try:
+            with open(path, "r") as infile:
+                content = json.load(infile)
+            if content.get("version") != PLACEHOLDER_INDEX_VERSION:
+                return None
+            return cls(content["files"])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable placeholder index {path}: {e}")
+            return None
+
+    def save(self, path: Union[str, Path]) -> None:
+        os.makedirs(Path(path).parent, exist_ok=True)
+        with open(path, "w") as outfile:
+            json.dump({"version": PLACEHOLDER_INDEX_VERSION, "files": self.files}, outfile, indent=1)
+
+    @staticmethod
+    def covers(keys: Iterable[str]) -> bool:
+        """
+        Check if the index could be used instead of scanning files for the placeholders,
+        which holds when every placeholder has the form of an indexed token.
+        :param keys: Placeholders to substitute
+        """
+        return all(PLACEHOLDER_TOKEN_RE.fullmatch(key) for key in keys)
+
+    @staticmethod
+    def resolve(tokens: Iterable[str], keys: Iterable[str]) -> List[str]:
+        """
+        Map indexed tokens to the placeholders they contain
+        :param tokens: Tokens of a file
+        :param keys: Placeholders to substitute
+        :return: Sorted placeholders present in the file
+        """
+        keys = set(keys)
+        found = set()
+        for token in tokens:
+            if token in keys:
+                found.add(token)
+            # a parameter placeholder could follow "# " in a comment
+            if token.startswith("# ") and token[2:] in keys:
+                found.add(token[2:])
+        return sorted(found)
+
+    def unresolved(self, keys: Iterable[str], prefix: str = "") -> Dict[str, List[str]]:
+        """
+        Find tokens that would be left in the rendered files
+        :param keys: Placeholders to substitute
+        :param prefix: Limit the check to files within this folder of the tree
+        :return: Unresolved token to files using it
+        """
+        keys = set(keys)
+        prefix = prefix.rstrip("/") + "/" if prefix else ""
+        result = {}
+        for token, files in sorted(self.tokens.items()):
+            if self.resolve([token], keys):
+                continue
+            files = [file for file in files if file.startswith(prefix)]
+            if files:
+                result[token] = files
+        return result
@@ -0,0 +1,31 @@
+import threading
+from contextlib import contextmanager
+
+from alive_progress import alive_bar
+
+_progress_bar_lock = threading.Lock()
+
+
+def _silent_bar(*args, **kwargs) -> None:
+    pass
+
+
+@contextmanager
+def exclusive_progress_bar(*args, **kwargs):
+    """
+    alive_bar wrapper that renders at most one progress bar at a time.
+    alive_bar hooks stdout while it is active, so bars opened from concurrently running setup stages
+    would corrupt each other. The first caller gets a real bar, concurrent callers get a silent
+    callable with the same interface.
+    :param args: Positional arguments passed to alive_bar
+    :param kwargs: Named arguments passed to alive_bar
+    :return: Progress bar callable
+    """
+    if not _progress_bar_lock.acquire(blocking=False):
+        yield _silent_bar
+        return
+    try:
+        with alive_bar(*args, **kwargs) as bar:
+            yield bar
+    finally:
+        _progress_bar_lock.release()
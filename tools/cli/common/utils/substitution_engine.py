@@ -0,0 +1,154 @@
+"""Single-pass placeholder substitution for GitOps templates."""
+import hashlib
+import re
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+
+
+class SubstitutionEngine:
+    """
+    Compiled placeholder substitution.
+
+    Output is identical to calling str.replace once per placeholder, in the order of the replacement
+    mappings and of their keys, but each text is rewritten in a single regex scan:
+    - all placeholders are combined into one alternation ordered by processing order, so where two
+      placeholders start at the same position the one processed first wins, like in the sequential version;
+    - values are pre-resolved against the placeholders processed after them, as the sequential version
+      would substitute placeholders introduced by an earlier replacement (e.g. parameters used in fragments);
+    - placeholders overlapping each other make the result order-dependent, such mappings are always
+      processed sequentially;
+    - a placeholder formed across a replacement boundary (e.g. by an empty value joining the surrounding text)
+      is left in the single-pass output, when values make this possible texts are re-checked and
+      re-processed sequentially if needed.
+    """
+
+    def __init__(self, *replacements: Dict[str, str]):
+        """
+        :param replacements: Placeholder to value mappings, in processing order
+        """
+        self._pairs: List[Tuple[str, str]] = [(k, v) for mapping in replacements for k, v in mapping.items()]
+        self._values: Dict[str, str] = {}
+        for i, (key, value) in enumerate(self._pairs):
+            if key not in self._values:
+                self._values[key] = self._replace_sequentially(value, self._pairs[i + 1:])
+
+        self._keys_digest = hashlib.sha256("\0".join(sorted(self._values)).encode()).hexdigest()
+
+        self._pattern: Optional[Pattern] = None
+        self._recheck = True
+        keys = list(self._values)
+        if keys and not self._has_overlapping_keys(keys):
+            self._pattern = re.compile(self._trie_regex(keys))
+            self._recheck = self._values_may_form_keys(keys, list(self._values.values()))
+
+    @property
+    def keys(self) -> List[str]:
+        """Placeholders replaced by the engine"""
+        return list(self._values)
+
+    @property
+    def keys_digest(self) -> str:
+        """Hash of the placeholder set, placeholders found in a text stay valid while it does not change"""
+        return self._keys_digest
+
+    @property
+    def is_compiled(self) -> bool:
+        """True when texts are processed in a single pass"""
+        return self._pattern is not None
+
+    @staticmethod
+    def _replace_sequentially(text: str, pairs: List[Tuple[str, str]]) -> str:
+        for key, value in pairs:
+            text = text.replace(key, value)
+        return text
+
+    @staticmethod
+    def _trie_regex(keys: List[str]) -> str:
+        """
+        Build a regex matching any of the keys with common prefixes factored out, so that the regex engine
+        rejects most positions on the first character instead of trying every placeholder in turn.
+        Keys must not be prefixes of each other, which holds for keys without overlaps.
+        """
+        trie: Dict = {}
+        for key in keys:
+            node = trie
+            for char in key:
+                node = node.setdefault(char, {})
+            node[""] = {}
+
+        def to_regex(node: Dict) -> str:
+            branches = [re.escape(char) + to_regex(child) for char, child in node.items() if char]
+            if not branches:
+                return ""
+            if len(branches) == 1:
+                return branches[0]
+            return "(?:" + "|".join(branches) + ")"
+
+        return to_regex(trie)
+
+    @staticmethod
+    def _has_overlapping_keys(keys: List[str]) -> bool:
+        if not all(keys):
+            return True
+        joined = "\0".join(keys)
+        if "\0" in "".join(keys) or any(joined.count(key) > 1 for key in keys):
+            # a placeholder contains another one
+            return True
+        # suffix of a placeholder is the prefix of the same or another one
+        prefixes = {key[:size] for key in keys for size in range(1, len(key))}
+        return any(key[-size:] in prefixes for key in keys for size in range(1, len(key)))
+
+    def _values_may_form_keys(self, keys: List[str], values: List[str]) -> bool:
+        """Check if a value could leave a placeholder in the output, on its own or together with adjacent text"""
+        prefixes = {key[:size] for key in keys for size in range(1, len(key))}
+        suffixes = {key[-size:] for key in keys for size in range(1, len(key))}
+        for value in values:
+            if not value or self._pattern.search(value) is not None or value in "\0".join(keys):
+                return True
+            for size in range(1, len(value)):
+                if value[:size] in suffixes or value[-size:] in prefixes:
+                    return True
+        return False
+
+    def placeholders_in(self, text: str) -> List[str]:
+        """
+        Find placeholders present in a text
+        :param text: Text to scan
+        :return: Sorted unique placeholders
+        """
+        if self._pattern is None:
+            return sorted(key for key in self._values if key in text)
+        return sorted(set(self._pattern.findall(text)))
+
+    def fingerprint(self, placeholders: Iterable[str]) -> str:
+        """
+        Hash of the values a text containing the given placeholders is rendered with.
+        When the output could depend on other placeholders too (not a single-pass substitution),
+        all the replacements are hashed.
+        :param placeholders: Placeholders present in the text
+        :return: Hex digest
+        """
+        digest = hashlib.sha256()
+        if self._pattern is None or self._recheck:
+            items = self._pairs
+        else:
+            items = [(key, self._values[key]) for key in sorted(placeholders)]
+        for key, value in items:
+            digest.update(key.encode())
+            digest.update(b"\0")
+            digest.update(value.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def substitute(self, text: str) -> str:
+        """
+        Replace all placeholders in a text
+        :param text: Text to process
+        :return: Text with placeholders replaced
+        """
+        if self._pattern is None:
+            return self._replace_sequentially(text, self._pairs)
+
+        result = self._pattern.sub(lambda m: self._values[m.group(0)], text)
+        if self._recheck and self._pattern.search(result) is not None:
+            return self._replace_sequentially(text, self._pairs)
+        return result
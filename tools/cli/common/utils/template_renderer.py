@@ -0,0 +1,364 @@
+"""Parallel rendering of template trees."""
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from common.const.const import TEMPLATE_RENDER_POOL, TEMPLATE_RENDER_WORKERS
+from common.custom_excpetions import TemplateRenderError
+from common.logging_config import logger
+from common.utils.placeholder_index import PlaceholderIndex
+from common.utils.substitution_engine import SubstitutionEngine
+
+TEMPLATE_FILE_SUFFIXES = (".tf", ".yaml", ".yml", ".md")
+# files are sent to workers in batches, so that the engine is not transferred to a process worker per file
+BATCHES_PER_WORKER = 4
+RENDER_MANIFEST_VERSION = 2
+
+# (source file, destination file, manifest entry of the destination file, placeholders known from the index)
+RenderTask = Tuple[str, str, Optional[dict], Optional[List[str]]]
+# (destination file, changed, new manifest entry, error)
+RenderOutcome = Tuple[str, bool, Optional[dict], Optional[str]]
+
+
+@dataclass
+class RenderResult:
+    """
+    Outcome of a template tree rendering.
+
+    :param changed: Files rewritten with rendered content
+    :param unchanged: Files left untouched as rendering did not change them
+    :param removed: Previously rendered files removed as their templates no longer exist
+    :param failures: File to error message, for files failed to render
+    """
+    changed: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    failures: Dict[str, str] = field(default_factory=dict)
+
+
+class RenderManifest:
+    """
+    Record of files rendered into a destination tree, used to re-render only files whose inputs changed.
+
+    Entry per destination file, keyed by its path relative to the manifest root:
+    template hash, placeholders present in the template and the placeholder set they were searched for,
+    hash of their values, output hash and git blob id, size and mtime.
+    A file is skipped when the template and values hashes match, and the output file was not modified since.
+    """
+
+    def __init__(self, path: Union[str, Path], root: Union[str, Path]):
+        """
+        :param path: Manifest file, must be outside the destination tree
+        :param root: Destination tree root
+        """
+        self._path = Path(path)
+        self.root = Path(root)
+        self._entries: Dict[str, dict] = {}
+        # False when there is no manifest of this version and root, i.e. files of the tree are not known
+        self.loaded = False
+        if self._path.exists():
+            try:
+                with open(self._path, "r") as infile:
+                    content = json.load(infile)
+                if content.get("version") == RENDER_MANIFEST_VERSION and content.get("root") == str(self.root):
+                    self._entries = content["files"]
+                    self.loaded = True
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Ignoring unreadable render manifest {self._path}: {e}")
+
+    def key(self, file_path: Union[str, Path]) -> str:
+        return Path(os.path.relpath(file_path, self.root)).as_posix()
+
+    def get(self, file_path: Union[str, Path]) -> Optional[dict]:
+        return self._entries.get(self.key(file_path))
+
+    def set(self, file_path: Union[str, Path], entry: dict) -> None:
+        self._entries[self.key(file_path)] = entry
+
+    def pop(self, file_path: Union[str, Path]) -> None:
+        self._entries.pop(self.key(file_path), None)
+
+    def files_under(self, folder: Union[str, Path]) -> List[str]:
+        """
+        :param folder: Folder within the destination tree
+        :return: Recorded files within the folder
+        """
+        prefix = self.key(folder)
+        prefix = "" if prefix == "." else prefix + "/"
+        return [str(self.root / key) for key in self._entries if key.startswith(prefix)]
+
+    def refresh(self, folder: Union[str, Path]) -> None:
+        """
+        Accept the current content of recorded files within a folder as rendered output,
+        used after rendered files were post-processed, so that post-processing does not invalidate them.
+        :param folder: Folder within the destination tree
+        """
+        for file_path in self.files_under(folder):
+            entry = self.get(file_path)
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                self.pop(file_path)
+                continue
+            if (stat.st_size, stat.st_mtime_ns) != (entry["size"], entry["mtime_ns"]):
+                with open(file_path, "rb") as file:
+                    data = file.read()
+                entry["output"], entry["blob"] = hashlib.sha256(data).hexdigest(), git_blob_id(data)
+                entry["size"], entry["mtime_ns"] = stat.st_size, stat.st_mtime_ns
+
+    def blob_id(self, file_path: Union[str, Path]) -> Optional[str]:
+        """
+        :param file_path: Destination file
+        :return: Git blob id of the file when it is recorded and was not modified since
+        """
+        entry = self.get(file_path)
+        if entry is None:
+            return None
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            return None
+        if (stat.st_size, stat.st_mtime_ns) != (entry["size"], entry["mtime_ns"]):
+            return None
+        return entry["blob"]
+
+    def save(self) -> None:
+        os.makedirs(self._path.parent, exist_ok=True)
+        with open(self._path, "w") as outfile:
+            json.dump({"version": RENDER_MANIFEST_VERSION, "root": str(self.root), "files": self._entries}, outfile)
+
+
+def git_blob_id(data: bytes) -> str:
+    """
+    :param data: File content
+    :return: Id of the git blob object storing the content
+    """
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def is_template_file(name: str) -> bool:
+    """
+    Check if a file is eligible for parametrisation based on its extension
+    :param name: File name
+    :return: True if the file is a template
+    """
+    return name.endswith(TEMPLATE_FILE_SUFFIXES)
+
+
+def render_file(file_path: str, engine: SubstitutionEngine, placeholders: Optional[List[str]] = None) -> bool:
+    """
+    Render a single template file in place
+    :param file_path: File to render
+    :param engine: Compiled placeholder substitution
+    :param placeholders: Placeholders present in the file when known, a file without placeholders is not read
+    :return: True when the file content was changed
+    """
+    if placeholders == []:
+        return False
+    with open(file_path, "r") as file:
+        data = file.read()
+    rendered = engine.substitute(data)
+    if rendered == data:
+        return False
+    with open(file_path, "w") as file:
+        file.write(rendered)
+    return True
+
+
+def _render_to(source: str, destination: str, entry: Optional[dict], placeholders: Optional[List[str]],
+               engine: SubstitutionEngine) -> Tuple[bool, dict]:
+    """
+    Render a template file, or copy a non-template one, into a destination file.
+    The destination is written only when the output differs from its current content.
+    :return: Whether the destination was written, and the new manifest entry
+    """
+    if is_template_file(source):
+        with open(source, "r") as file:
+            text = file.read()
+        source_data = text.encode()
+    else:
+        text = None
+        with open(source, "rb") as file:
+            source_data = file.read()
+    template_hash = hashlib.sha256(source_data).hexdigest()
+
+    if text is None:
+        placeholders = []
+    elif placeholders is not None:
+        pass
+    elif entry is not None and (entry["template"], entry["keys"]) == (template_hash, engine.keys_digest):
+        placeholders = entry["placeholders"]
+    else:
+        placeholders = engine.placeholders_in(text)
+    values_hash = engine.fingerprint(placeholders) if text is not None else ""
+
+    try:
+        stat = os.stat(destination)
+    except FileNotFoundError:
+        stat = None
+
+    if entry is not None and stat is not None \
+            and (entry["template"], entry["values"]) == (template_hash, values_hash) \
+            and (entry["size"], entry["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+        return False, entry
+
+    output = engine.substitute(text).encode() if text is not None and placeholders else source_data
+    changed = True
+    if stat is not None and stat.st_size == len(output):
+        with open(destination, "rb") as file:
+            changed = file.read() != output
+    if changed:
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        with open(destination, "wb") as file:
+            file.write(output)
+        shutil.copymode(source, destination)
+        stat = os.stat(destination)
+
+    return changed, {
+        "template": template_hash,
+        "keys": engine.keys_digest,
+        "placeholders": placeholders,
+        "values": values_hash,
+        "output": hashlib.sha256(output).hexdigest(),
+        "blob": git_blob_id(output),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def _render_batch(tasks: List[RenderTask], engine: SubstitutionEngine) -> List[RenderOutcome]:
+    outcomes = []
+    for source, destination, entry, placeholders in tasks:
+        try:
+            if source == destination:
+                outcomes.append((destination, render_file(destination, engine, placeholders), None, None))
+            else:
+                changed, new_entry = _render_to(source, destination, entry, placeholders, engine)
+                outcomes.append((destination, changed, new_entry, None))
+        except Exception as e:
+            outcomes.append((destination, False, None, f"{type(e).__name__}: {e}"))
+    return outcomes
+
+
+def _create_pool(pool: str, max_workers: int) -> Executor:
+    if pool == "process":
+        return ProcessPoolExecutor(max_workers=max_workers)
+    if pool == "thread":
+        return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="render")
+    raise ValueError(f"Unknown template render pool '{pool}', expected 'thread' or 'process'")
+
+
+def render_files(files: Dict[str, Union[str, Path]], engine: SubstitutionEngine, destination: Union[str, Path],
+                 manifest: RenderManifest = None, index: PlaceholderIndex = None, scope: str = "",
+                 pool: str = TEMPLATE_RENDER_POOL, max_workers: int = TEMPLATE_RENDER_WORKERS) -> RenderResult:
+    """
+    Render template files into a destination tree, reading, substituting and writing files in parallel.
+    Every file is attempted, failures are collected per file and reported together.
+
+    Template files are rendered, other files are copied. Each source file is read once and rendered in memory,
+    a destination file is written only when its content changes, so that unchanged files keep their mtime.
+    A file mapped onto itself is rendered in place.
+    With a manifest, files whose template and placeholder values did not change since the previous rendering
+    are skipped without being rendered, and previously rendered files within the scope whose templates
+    no longer exist are removed from the destination.
+    With a placeholder index, files are not scanned for placeholders, and files without placeholders are copied
+    without substitution.
+    :param files: Destination file path, POSIX and relative to the destination, to its source file
+    :param engine: Compiled placeholder substitution
+    :param destination: Destination tree root
+    :param manifest: Manifest of the destination tree, saved when rendering completes
+    :param index: Placeholder index keyed by destination paths, ignored when placeholders could not be indexed
+    :param scope: Destination folder, POSIX and relative to the destination, the files are rendered within
+    :param pool: Worker pool kind, "thread" or "process"
+    :param max_workers: Maximum number of workers, 1 renders files sequentially in the calling thread
+    :return: Rendering outcome
+    :raises TemplateRenderError: When any of the files fails to render
+    """
+    if index is not None and not PlaceholderIndex.covers(engine.keys):
+        logger.debug("Placeholders could not be looked up in the placeholder index, scanning files")
+        index = None
+    keys = set(engine.keys)
+
+    tasks: List[RenderTask] = []
+    for rel_path, source in files.items():
+        source = str(source)
+        target = os.path.join(destination, rel_path)
+        placeholders = None
+        if index is not None and is_template_file(source):
+            tokens = index.files.get(rel_path)
+            if tokens is not None:
+                placeholders = PlaceholderIndex.resolve(tokens, keys)
+        if os.path.abspath(source) == os.path.abspath(target):
+            if is_template_file(source):
+                tasks.append((source, target, None, placeholders))
+            continue
+        tasks.append((source, target, manifest.get(target) if manifest is not None else None, placeholders))
+
+    workers = max(1, min(max_workers, len(tasks)))
+    if workers == 1:
+        outcomes = _render_batch(tasks, engine)
+    else:
+        batch_count = workers * BATCHES_PER_WORKER
+        batches = [tasks[i::batch_count] for i in range(batch_count)]
+        outcomes = []
+        with _create_pool(pool, workers) as executor:
+            for batch_outcomes in executor.map(_render_batch, batches, [engine] * len(batches)):
+                outcomes.extend(batch_outcomes)
+
+    result = RenderResult()
+    for file_path, changed, entry, error in outcomes:
+        if error is not None:
+            result.failures[file_path] = error
+            continue
+        if changed:
+            result.changed.append(file_path)
+        else:
+            result.unchanged.append(file_path)
+        if manifest is not None and entry is not None:
+            manifest.set(file_path, entry)
+
+    if manifest is not None:
+        rendered = {manifest.key(target) for source, target, entry, placeholders in tasks}
+        for file_path in manifest.files_under(os.path.join(destination, scope)):
+            if manifest.key(file_path) not in rendered:
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+                manifest.pop(file_path)
+                result.removed.append(file_path)
+        manifest.save()
+
+    logger.debug(f"Rendered {os.path.join(destination, scope)}: {len(result.changed)} changed, "
+                 f"{len(result.unchanged)} unchanged, {len(result.removed)} removed, {len(result.failures)} failed, "
+                 f"{workers} {pool} worker(s)")
+    if result.failures:
+        raise TemplateRenderError(result.failures)
+    return result
+
+
+def render_tree(folder: Union[str, Path], engine: SubstitutionEngine, destination: Union[str, Path] = None,
+                manifest: RenderManifest = None, pool: str = TEMPLATE_RENDER_POOL,
+                max_workers: int = TEMPLATE_RENDER_WORKERS) -> RenderResult:
+    """
+    Render all files of a folder, see render_files
+    :param folder: Folder to render
+    :param engine: Compiled placeholder substitution
+    :param destination: Folder to render into, template files are rendered in place when omitted
+    :param manifest: Manifest of the destination tree
+    :param pool: Worker pool kind, "thread" or "process"
+    :param max_workers: Maximum number of workers
+    :return: Rendering outcome
+    :raises TemplateRenderError: When any of the files fails to render
+    """
+    destination = folder if destination is None else destination
+    files = {}
+    for root, dirs, names in os.walk(folder):
+        dirs[:] = [d for d in dirs if d != ".git"]
+        for name in names:
+            source = os.path.join(root, name)
+            files[Path(os.path.relpath(source, folder)).as_posix()] = source
+    return render_files(files, engine, destination, manifest, pool=pool, max_workers=max_workers)
@@ -29,6 +29,12 @@ TERRAFORM_VERSION = _versions.get("terraform", "1.11.4")
 # Terraform providers
 GITLAB_TF_REQUIRED_PROVIDER_VERSION = _versions.get("gitlab_provider", "18.2.0")
 GITHUB_TF_REQUIRED_PROVIDER_VERSION = _versions.get("github_provider", "6.9.0")
+# Terraform providers of the local filesystem mirror, source to version constraint
+TF_MIRROR_PROVIDERS = {
+    **(_versions.get("terraform_providers") or {}),
+    "integrations/github": f"~> {GITHUB_TF_REQUIRED_PROVIDER_VERSION}",
+    "gitlabhq/gitlab": GITLAB_TF_REQUIRED_PROVIDER_VERSION,
+}
 
 # ArgoCD and GitOps
 ARGOCD_VERSION = _versions.get("argocd", "7.7.16")
@@ -0,0 +1,98 @@
+"""Long-lived Kubernetes API clients shared by the calls of a KubeClient."""
+import socket
+import threading
+from typing import Dict, Optional, Tuple, Type, TypeVar
+
+from kubernetes import client
+from urllib3.connection import HTTPConnection
+
+from common.const.const import K8S_CONNECTION_POOL_SIZE, K8S_TCP_KEEPALIVE_IDLE
+from common.logging_config import logger
+
+Api = TypeVar("Api")
+
+# probes sent before an idle connection is considered dead, and interval between them, in seconds
+TCP_KEEPALIVE_COUNT = 3
+TCP_KEEPALIVE_INTERVAL = 10
+
+
+def tcp_keepalive_socket_options(idle: int) -> list:
+    """
+    :param idle: Idle time before the first probe, in seconds
+    :return: urllib3 socket options enabling TCP keep-alive, on top of the urllib3 defaults
+    """
+    options = list(HTTPConnection.default_socket_options) + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    # option names differ between Linux and macOS, unsupported ones are skipped
+    for name, value in (("TCP_KEEPIDLE", idle), ("TCP_KEEPALIVE", idle),
+                        ("TCP_KEEPINTVL", TCP_KEEPALIVE_INTERVAL), ("TCP_KEEPCNT", TCP_KEEPALIVE_COUNT)):
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+    return options
+
+
+class ApiClientPool:
+    """
+    API clients created on first use and reused by all the calls, so that requests go over warm keep-alive
+    connections instead of a new connection pool, TLS handshake and, with exec credential plugins, a new token
+    per call. Requests needing a content type other than the generated one get a client of their own with the
+    header set once, so that the header never leaks into other requests. Safe to share between threads.
+    """
+
+    def __init__(self, configuration: client.Configuration, pool_size: int = K8S_CONNECTION_POOL_SIZE,
+                 keepalive_idle: int = K8S_TCP_KEEPALIVE_IDLE):
+        """
+        :param configuration: Cluster endpoint and credentials
+        :param pool_size: Connections kept open to the API server, i.e. max concurrent requests without waiting
+        :param keepalive_idle: Idle time before TCP keep-alive probes, in seconds, 0 disables probes
+        """
+        configuration.connection_pool_maxsize = pool_size
+        self._configuration = configuration
+        self._keepalive_idle = keepalive_idle
+        self._clients: Dict[Optional[str], client.ApiClient] = {}
+        self._apis: Dict[Tuple[type, Optional[str]], object] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def api(self, api_class: Type[Api], content_type: Optional[str] = None) -> Api:
+        """
+        :param api_class: Generated API class, e.g. client.CoreV1Api
+        :param content_type: Content-Type of all the requests of the API instance, generated one when None
+        :return: API instance bound to a pooled client
+        """
+        key = (api_class, content_type)
+        api = self._apis.get(key)
+        if api is not None:
+            return api
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Kubernetes API client pool is closed")
+            if key not in self._apis:
+                self._apis[key] = api_class(self._client(content_type))
+            return self._apis[key]
+
+    def _client(self, content_type: Optional[str]) -> client.ApiClient:
+        api_client = self._clients.get(content_type)
+        if api_client is None:
+            api_client = client.ApiClient(self._configuration)
+            if content_type:
+                api_client.set_default_header("Content-Type", content_type)
+            if self._keepalive_idle:
+                # applies to the connections opened by the pool manager from now on
+                api_client.rest_client.pool_manager.connection_pool_kw["socket_options"] = \
+                    tcp_keepalive_socket_options(self._keepalive_idle)
+            self._clients[content_type] = api_client
+        return api_client
+
+    def close(self) -> None:
+        """
+        Close the connections of all the clients, the pool could not be used afterwards
+        """
+        with self._lock:
+            self._closed = True
+            clients = list(self._clients.values())
+            self._clients.clear()
+            self._apis.clear()
+        for api_client in clients:
+            api_client.close()
+            api_client.rest_client.pool_manager.clear()
+        logger.debug(f"Closed {len(clients)} Kubernetes API client(s)")
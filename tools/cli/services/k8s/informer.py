@@ -0,0 +1,116 @@
+"""Watch-backed local cache of Kubernetes resources of a kind in a namespace."""
+import bisect
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from common.logging_config import logger
+from services.k8s.resumable_watch import resumable_watch, LISTED, WATCH_RETRY_DELAY, WatchStop
+
+
+class ResourceInformer:
+    """
+    Keeps resources of a kind in a namespace in memory, indexed by name. Resources are listed once, then
+    kept up to date by a resumable watch in a background thread, see resumable_watch.
+    """
+
+    def __init__(self, list_func: Callable, namespace: str, name: str = None):
+        """
+        :param list_func: Namespaced list method of a generated API, e.g. CoreV1Api.list_namespaced_pod
+        :param namespace: Namespace to cache
+        :param name: Informer name used in logs and as the thread name
+        """
+        self._list_func = list_func
+        self.namespace = namespace
+        self.name = name or f"{list_func.__name__}/{namespace}"
+
+        self._lock = threading.Lock()
+        self._items: Dict[str, Any] = {}
+        self._names: List[str] = []
+        self._synced = threading.Event()
+        self._stopped = WatchStop()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "ResourceInformer":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"informer-{self.name}", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stops the watch. The open watch response is closed, so that the watch thread exits at once.
+        """
+        self._stopped.set()
+
+    def join(self, timeout: float = None):
+        """
+        Waits for the watch thread to exit after stop.
+
+        :param timeout: Max wait time, in seconds, None waits until the thread exits
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def synced(self) -> bool:
+        return self._synced.is_set()
+
+    def wait_synced(self, timeout: float) -> bool:
+        """
+        :param timeout: Max wait time for the initial list, in seconds
+        :return: True when the cache is populated
+        """
+        return self._synced.wait(timeout)
+
+    def get(self, name: str) -> Optional[Any]:
+        """
+        :param name: Resource name
+        :return: Cached resource model, or None when there is no such resource
+        """
+        with self._lock:
+            return self._items.get(name)
+
+    def list(self, name_prefix: str = None) -> List[Any]:
+        """
+        :param name_prefix: Return resources with names starting with the prefix only
+        :return: Cached resource models sorted by name
+        """
+        with self._lock:
+            if name_prefix:
+                start = bisect.bisect_left(self._names, name_prefix)
+                end = bisect.bisect_left(self._names, name_prefix + "\uffff", start)
+                names = self._names[start:end]
+            else:
+                names = self._names
+            return [self._items[name] for name in names]
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                for event_type, obj in resumable_watch(self._list_func, stop=self._stopped, namespace=self.namespace):
+                    with self._lock:
+                        if event_type == LISTED:
+                            self._items = {}
+                            self._names = []
+                            for item in obj.items:
+                                self._store(item)
+                        else:
+                            self._remove(obj.metadata.name)
+                            if event_type != "DELETED":
+                                self._store(obj)
+                    self._synced.set()
+            except Exception as e:
+                if self._stopped.is_set():
+                    return
+                logger.warning(f"Informer {self.name} watch failed, re-listing: {e}")
+                self._stopped.wait(WATCH_RETRY_DELAY)
+
+    def _store(self, obj):
+        name = obj.metadata.name
+        self._items[name] = obj
+        bisect.insort(self._names, name)
+
+    def _remove(self, name: str):
+        if self._items.pop(name, None) is None:
+            return
+        del self._names[bisect.bisect_left(self._names, name)]
@@ -1,12 +1,25 @@
 import base64
-
-from kubernetes import client, watch, config
+import json
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Tuple
+
+from kubernetes import client, config
 from kubernetes.client import ApiException
 
 from common.const.common_path import LOCAL_FOLDER
+from common.const.const import K8S_CONNECTION_POOL_SIZE, K8S_INFORMER_SYNC_TIMEOUT
 from common.logging_config import logger
 from common.retry_decorator import exponential_backoff
 from common.tracing_decorator import trace
+from services.k8s.api_client_pool import ApiClientPool
+from services.k8s.informer import ResourceInformer
+from services.k8s.projection import ResourceView, project
+from services.k8s.readiness import ReadinessTarget, RESOURCE_KINDS, DEPLOYMENT, STATEFUL_SET, INGRESS, POD
+from services.k8s.resumable_watch import resumable_watch, list_raw, LISTED, WatchStop
 
 
 def write_ca_cert(ca_cert_data):
@@ -29,6 +42,76 @@ class KubeClient:
             self._configuration.api_key_prefix['authorization'] = 'Bearer'
         if "endpoint" in kwargs:
             self._configuration.host = kwargs["endpoint"]
+        self._api_pool = ApiClientPool(self._configuration, kwargs.get("pool_size", K8S_CONNECTION_POOL_SIZE))
+        self._informers: Dict[Tuple[str, str], ResourceInformer] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Stops the informers and closes the connections to the API server.
+        """
+        for informer in self._informers.values():
+            informer.stop()
+        # the informers stop reading before their connections are closed
+        for informer in self._informers.values():
+            informer.join()
+        self._informers.clear()
+        self._api_pool.close()
+
+    def start_informers(self, resources: List[Tuple[str, str]], timeout: int = K8S_INFORMER_SYNC_TIMEOUT):
+        """
+        Starts watch-backed local caches, so that reads of the resources are served without API server requests.
+        Reads of resources without an informer, or before its initial list completes, go to the API server.
+
+        :param resources: Kind and namespace pairs, e.g. (POD, ARGOCD_NAMESPACE)
+        :param timeout: Max wait time for the initial list of all the informers, in seconds
+        """
+        started = []
+        for kind, namespace in resources:
+            if (kind, namespace) in self._informers:
+                continue
+            resource_kind = RESOURCE_KINDS[kind]
+            list_func = getattr(self._api_pool.api(getattr(client, resource_kind.api)), resource_kind.list_method)
+            informer = ResourceInformer(list_func, namespace, f"{kind}/{namespace}").start()
+            self._informers[(kind, namespace)] = informer
+            started.append(informer)
+
+        deadline = time.monotonic() + timeout
+        for informer in started:
+            if not informer.wait_synced(max(0.0, deadline - time.monotonic())):
+                logger.warning(f"Informer {informer.name} not synced within {timeout} seconds, reading from API")
+
+    def _informer(self, kind: str, namespace: str) -> Optional[ResourceInformer]:
+        informer = self._informers.get((kind, namespace))
+        return informer if informer is not None and informer.synced else None
+
+    def _cached(self, kind: str, namespace: str, name: str):
+        """
+        :return: Cached resource, None when there is no synced informer for the kind and namespace
+        :raises ApiException: 404 when a synced informer does not have the resource
+        """
+        informer = self._informer(kind, namespace)
+        if informer is None:
+            return None
+        obj = informer.get(name)
+        if obj is None:
+            raise ApiException(status=404, reason=f"{kind} {namespace}/{name} not found")
+        return obj
+
+    def _model(self, obj: dict, model: str):
+        """
+        Deserializes raw resource JSON into a model, for the resources picked from a raw list only.
+
+        :param obj: Raw resource JSON
+        :param model: Model name, e.g. V1Pod
+        """
+        api_client = self._api_pool.api(client.CoreV1Api).api_client
+        return api_client.deserialize(SimpleNamespace(data=json.dumps(obj)), model)
 
     @trace()
     def create_namespace(self, name: str):
@@ -37,7 +120,7 @@ class KubeClient:
         """
         name = name.lower()
 
-        api_v1_instance = client.CoreV1Api(client.ApiClient(self._configuration))
+        api_v1_instance = self._api_pool.api(client.CoreV1Api)
         body = client.V1Namespace(metadata=client.V1ObjectMeta(name=name))
         try:
             res = api_v1_instance.read_namespace(name)
@@ -57,7 +140,7 @@ class KubeClient:
 
         sa_name = sa_name.lower()
 
-        api_v1_instance = client.CoreV1Api(client.ApiClient(self._configuration))
+        api_v1_instance = self._api_pool.api(client.CoreV1Api)
         body = client.V1ServiceAccount(metadata=client.V1ObjectMeta(name=sa_name, namespace=namespace))
         try:
             res = api_v1_instance.read_namespaced_service_account(name=sa_name, namespace=namespace)
@@ -75,7 +158,7 @@ class KubeClient:
         """
         name = name.lower()
 
-        rbac_v1_instance = client.RbacAuthorizationV1Api(client.ApiClient(self._configuration))
+        rbac_v1_instance = self._api_pool.api(client.RbacAuthorizationV1Api)
 
         body = client.V1ClusterRole(metadata=client.V1ObjectMeta(name=name, namespace=namespace),
                                     rules=[client.V1PolicyRule(verbs=["*"], api_groups=["*"], resources=["*"])])
@@ -96,7 +179,7 @@ class KubeClient:
         """
         name = name.lower()
 
-        rbac_v1_instance = client.RbacAuthorizationV1Api(client.ApiClient(self._configuration))
+        rbac_v1_instance = self._api_pool.api(client.RbacAuthorizationV1Api)
         body = client.V1ClusterRoleBinding(
             metadata=client.V1ObjectMeta(name=name, namespace=namespace),
             role_ref=client.V1RoleRef(name=role_name, api_group="rbac.authorization.k8s.io", kind="ClusterRole"),
@@ -118,7 +201,7 @@ class KubeClient:
         Creates a custom object.
         """
         try:
-            custom_v1_instance = client.CustomObjectsApi(client.ApiClient(self._configuration))
+            custom_v1_instance = self._api_pool.api(client.CustomObjectsApi)
 
             res = custom_v1_instance.create_namespaced_custom_object(group=group, version=version,
                                                                      namespace=namespace,
@@ -138,11 +221,9 @@ class KubeClient:
         Patch custom object.
         """
         try:
-            api_client = client.ApiClient(self._configuration)
-            # need to explicitly set headers
-            api_client.set_default_header('Content-Type',
-                                          api_client.select_header_content_type(['application/json-patch+json']))
-            custom_v1_instance = client.CustomObjectsApi(api_client)
+            # the generated client sends merge patches only, JSON patches go through a client of their own
+            custom_v1_instance = self._api_pool.api(client.CustomObjectsApi,
+                                                    content_type='application/json-patch+json')
             res = custom_v1_instance.patch_namespaced_custom_object(group=group, version=version,
                                                                     namespace=namespace,
                                                                     name=name,
@@ -158,7 +239,7 @@ class KubeClient:
         Remove custom object.
         """
         try:
-            custom_v1_instance = client.CustomObjectsApi(client.ApiClient(self._configuration))
+            custom_v1_instance = self._api_pool.api(client.CustomObjectsApi)
             res = custom_v1_instance.delete_namespaced_custom_object(group=group, version=version,
                                                                      namespace=namespace,
                                                                      name=name,
@@ -172,7 +253,7 @@ class KubeClient:
         """
         Creates Job.
         """
-        batch_v1_instance = client.BatchV1Api(client.ApiClient(self._configuration))
+        batch_v1_instance = self._api_pool.api(client.BatchV1Api)
 
         try:
             res = batch_v1_instance.read_namespaced_job(name=job_name, namespace=namespace)
@@ -180,15 +261,13 @@ class KubeClient:
                 # job exists, most likely a failed job from previous run, should delete as we are going to recreate it
                 batch_v1_instance.delete_namespaced_job(name=job_name, namespace=namespace)
 
-                # wait till job is deleted
-                w = watch.Watch()
-                for event in w.stream(func=batch_v1_instance.list_namespaced_job,
-                                      namespace=namespace,
-                                      field_selector=f'metadata.name={job_name}',
-                                      timeout_seconds=30):
+                # wait till job is deleted, it could be gone before the watch starts
+                for event_type, obj in resumable_watch(batch_v1_instance.list_namespaced_job,
+                                                       time.monotonic() + 30,
+                                                       namespace=namespace,
+                                                       field_selector=f'metadata.name={job_name}'):
                     # event.type: ADDED, MODIFIED, DELETED
-                    if event["type"] == "DELETED":
-                        w.stop()
+                    if event_type == "DELETED" or (event_type == LISTED and not obj.items):
                         break
 
         except ApiException as e:
@@ -204,7 +283,10 @@ class KubeClient:
         """
         Reads a Deployment.
         """
-        apps_v1_instance = client.AppsV1Api(client.ApiClient(self._configuration))
+        cached = self._cached(DEPLOYMENT, namespace, deployment_name)
+        if cached is not None:
+            return cached
+        apps_v1_instance = self._api_pool.api(client.AppsV1Api)
 
         try:
             res = apps_v1_instance.read_namespaced_deployment(name=deployment_name, namespace=namespace)
@@ -216,9 +298,12 @@ class KubeClient:
     @exponential_backoff()
     def get_pod(self, namespace: str, pod_name: str):
         """
-        Reads a Deployment.
+        Reads a Pod.
         """
-        api_v1_instance = client.CoreV1Api(client.ApiClient(self._configuration))
+        cached = self._cached(POD, namespace, pod_name)
+        if cached is not None:
+            return cached
+        api_v1_instance = self._api_pool.api(client.CoreV1Api)
 
         try:
             res = api_v1_instance.read_namespaced_pod(name=pod_name, namespace=namespace)
@@ -233,21 +318,62 @@ class KubeClient:
         Find the first Running pod in a namespace whose name contains name_fragment.
         Uses the already configured API client (endpoint/token/CA) so it does not depend on kubeconfig files.
         """
-        api_v1_instance = client.CoreV1Api(client.ApiClient(self._configuration))
-        res = api_v1_instance.list_namespaced_pod(namespace=namespace, watch=False)
-        for pod in res.items:
-            if pod.metadata and pod.metadata.name and name_fragment in pod.metadata.name:
-                if pod.status and pod.status.phase == "Running":
+        informer = self._informer(POD, namespace)
+        if informer is not None:
+            for pod in informer.list():
+                if name_fragment in pod.metadata.name and pod.status and pod.status.phase == "Running":
                     return pod
+            return None
+
+        # only the matching pod is deserialized into a model
+        api_v1_instance = self._api_pool.api(client.CoreV1Api)
+        for item in list_raw(api_v1_instance.list_namespaced_pod, namespace=namespace)["items"]:
+            pod = project(item)
+            if pod.name and name_fragment in pod.name and pod.phase == "Running":
+                return self._model(item, "V1Pod")
         return None
 
+    @trace()
+    @exponential_backoff()
+    def find_running_pod(self, namespace: str, name_prefix: str):
+        """
+        Find the first Running pod in a namespace whose name starts with name_prefix, e.g. a deployment name.
+        Served from the name index of the informer cache when there is one.
+        """
+        for pod in self.find_pods(namespace, name_prefix):
+            if pod.status and pod.status.phase == "Running":
+                return pod
+        return None
+
+    @trace()
+    def find_pods(self, namespace: str, name_prefix: str = None) -> list:
+        """
+        Lists pods in a namespace, from the informer cache when there is one.
+
+        :param namespace: Namespace
+        :param name_prefix: Return pods with names starting with the prefix only
+        :return: Pods sorted by name
+        """
+        informer = self._informer(POD, namespace)
+        if informer is not None:
+            return informer.list(name_prefix=name_prefix)
+
+        # only the matching pods are deserialized into models
+        api_v1_instance = self._api_pool.api(client.CoreV1Api)
+        res = list_raw(api_v1_instance.list_namespaced_pod, namespace=namespace)
+        items = [item for item in res["items"] if not name_prefix or item["metadata"]["name"].startswith(name_prefix)]
+        return [self._model(item, "V1Pod") for item in sorted(items, key=lambda item: item["metadata"]["name"])]
+
     @trace()
     @exponential_backoff()
     def get_stateful_set_objects(self, namespace: str, name: str):
         """
         Reads a StatefulSet.
         """
-        apps_v1_instance = client.AppsV1Api(client.ApiClient(self._configuration))
+        cached = self._cached(STATEFUL_SET, namespace, name)
+        if cached is not None:
+            return cached
+        apps_v1_instance = self._api_pool.api(client.AppsV1Api)
 
         try:
             res = apps_v1_instance.read_namespaced_stateful_set(name=name, namespace=namespace)
@@ -261,7 +387,10 @@ class KubeClient:
         """
         Reads an Ingress.
         """
-        network_v1_instance = client.NetworkingV1Api(client.ApiClient(self._configuration))
+        cached = self._cached(INGRESS, namespace, name)
+        if cached is not None:
+            return cached
+        network_v1_instance = self._api_pool.api(client.NetworkingV1Api)
 
         try:
             res = network_v1_instance.read_namespaced_ingress(name=name, namespace=namespace)
@@ -283,7 +412,7 @@ class KubeClient:
         Returns True if the given CustomResourceDefinition exists in the cluster.
         Useful to guard optional dependencies (e.g. cert-manager).
         """
-        api = client.ApiextensionsV1Api(client.ApiClient(self._configuration))
+        api = self._api_pool.api(client.ApiextensionsV1Api)
         try:
             api.read_custom_resource_definition(crd_name)
             return True
@@ -296,7 +425,7 @@ class KubeClient:
         """
         Reads a custom object.
         """
-        custom_v1_instance = client.CustomObjectsApi(client.ApiClient(self._configuration))
+        custom_v1_instance = self._api_pool.api(client.CustomObjectsApi)
 
         try:
             res = custom_v1_instance.get_namespaced_custom_object(name=name, namespace=namespace, group=group,
@@ -310,7 +439,7 @@ class KubeClient:
         """
         Removes a service account.
         """
-        api_v1_instance = client.CoreV1Api(client.ApiClient(self._configuration))
+        api_v1_instance = self._api_pool.api(client.CoreV1Api)
         try:
             api_v1_instance.delete_namespaced_service_account(name=sa_name, namespace=namespace)
             return True
@@ -323,7 +452,7 @@ class KubeClient:
         """
         Removes a cluster role.
         """
-        rbac_v1_instance = client.RbacAuthorizationV1Api(client.ApiClient(self._configuration))
+        rbac_v1_instance = self._api_pool.api(client.RbacAuthorizationV1Api)
         try:
             rbac_v1_instance.delete_cluster_role(name=r_name)
             return True
@@ -336,7 +465,7 @@ class KubeClient:
         """
         Removes a cluster role binding.
         """
-        rbac_v1_instance = client.RbacAuthorizationV1Api(client.ApiClient(self._configuration))
+        rbac_v1_instance = self._api_pool.api(client.RbacAuthorizationV1Api)
         try:
             rbac_v1_instance.delete_cluster_role_binding(name=rb_name)
             return True
@@ -346,158 +475,146 @@ class KubeClient:
 
     @trace()
     def wait_for_deployment(self, deployment, timeout: int = 300):
-        configured_replicas = deployment.spec.replicas
-        name = deployment.metadata.name
-        namespace = deployment.metadata.namespace
-
-        apps_v1_instance = client.AppsV1Api(client.ApiClient(self._configuration))
-        w = watch.Watch()
-
-        try:
-            for event in w.stream(func=apps_v1_instance.list_namespaced_deployment,
-                                  namespace=namespace,
-                                  field_selector=f'metadata.name={name}',
-                                  timeout_seconds=timeout):
-                if event["object"].status.ready_replicas == configured_replicas:
-                    w.stop()
-                    return True
-                # event.type: ADDED, MODIFIED, DELETED
-                if event["type"] == "DELETED":
-                    # Pod was deleted while waiting for it to start
-                    raise Exception("%s deleted before it started", name)
-
-        except ApiException as e:
-            raise e
+        return self.wait_for_all([ReadinessTarget.of(deployment)], timeout)
 
     @trace()
     def wait_for_job(self, job, timeout: int = 300):
-        job_name = job.metadata.name
-        namespace = job.metadata.namespace
-
-        batch_v1_instance = client.BatchV1Api(client.ApiClient(self._configuration))
-        w = watch.Watch()
-
-        try:
-            for event in w.stream(func=batch_v1_instance.list_namespaced_job,
-                                  namespace=namespace,
-                                  field_selector=f'metadata.name={job_name}',
-                                  timeout_seconds=timeout):
-                if bool(event["object"].status.succeeded):
-                    w.stop()
-                    return
-                # event.type: ADDED, MODIFIED, DELETED
-                if event["type"] == "DELETED":
-                    # Job was deleted while waiting for it to start
-                    raise Exception("%s deleted before it started", job_name)
-
-        except ApiException as e:
-            raise e
+        self.wait_for_all([ReadinessTarget.of(job)], timeout)
 
     @trace()
     def wait_for_pod(self, pod, timeout: int = 300):
-        name = pod.metadata.name
-        namespace = pod.metadata.namespace
-
-        api_v1_instance = client.CoreV1Api(client.ApiClient(self._configuration))
-        w = watch.Watch()
-
-        try:
-            for event in w.stream(func=api_v1_instance.list_namespaced_pod,
-                                  namespace=namespace,
-                                  field_selector=f'metadata.name={name}',
-                                  timeout_seconds=timeout):
-                if event["object"].status.phase == "Running":
-                    w.stop()
-                    return
-                # event.type: ADDED, MODIFIED, DELETED
-                if event["type"] == "DELETED":
-                    # Job was deleted while waiting for it to start
-                    raise Exception("%s deleted before it started", name)
-
-        except ApiException as e:
-            raise e
+        self.wait_for_all([ReadinessTarget.of(pod)], timeout)
 
     @trace()
     def wait_for_stateful_set(self, stateful_set, timeout: int = 300, wait_availability: bool = True):
-        replica_state = "available_replicas"
-        if not wait_availability:
-            replica_state = "current_replicas"
-
-        configured_replicas = stateful_set.spec.replicas
-        name = stateful_set.metadata.name
-        namespace = stateful_set.metadata.namespace
-
-        apps_v1_instance = client.AppsV1Api(client.ApiClient(self._configuration))
-        w = watch.Watch()
-        try:
-            for event in w.stream(func=apps_v1_instance.list_namespaced_stateful_set,
-                                  namespace=namespace,
-                                  field_selector=f'metadata.name={name}',
-                                  timeout_seconds=timeout):
-                if getattr(event["object"].status, replica_state) == configured_replicas:
-                    w.stop()
-                    return True
-                # event.type: ADDED, MODIFIED, DELETED
-                if event["type"] == "DELETED":
-                    # Set was deleted while waiting for it to start
-                    raise Exception("%s deleted before it started", name)
-
-        except ApiException as e:
-            raise e
+        return self.wait_for_all([ReadinessTarget.of(stateful_set, wait_availability)], timeout)
 
     @trace()
     def wait_for_ingress(self, ingress, timeout: int = 300):
-        name = ingress.metadata.name
-        namespace = ingress.metadata.namespace
+        return self.wait_for_all([ReadinessTarget.of(ingress)], timeout)
 
-        network_v1_instance = client.NetworkingV1Api(client.ApiClient(self._configuration))
-
-        w = watch.Watch()
+    @trace()
+    def wait_for_all(self, targets: List[ReadinessTarget], timeout: int = 300,
+                     on_ready: Optional[Callable[[ReadinessTarget], None]] = None) -> bool:
+        """
+        Waits for several resources at once, so that the wait takes as long as the slowest resource rather than
+        the sum of all of them. Resources of the same kind in a namespace share a single list and watch.
+        Resources that do not exist yet are waited for until created.
+
+        :param targets: Resources to wait for
+        :param timeout: Max wait time for all the resources, in seconds
+        :param on_ready: Called in the calling thread with each target once it is ready, e.g. to advance a progress bar
+        :return: True when all resources are ready, False when some of them are not ready within timeout
+        """
+        groups: Dict[Tuple[str, str], List[ReadinessTarget]] = {}
+        for target in targets:
+            groups.setdefault((target.namespace, target.kind), []).append(target)
+
+        deadline = time.monotonic() + timeout
+        events = queue.Queue()
+        stop = WatchStop()
+        pending = set(targets)
+        executor = ThreadPoolExecutor(max_workers=max(1, len(groups)), thread_name_prefix="k8s-wait")
         try:
-            for event in w.stream(func=network_v1_instance.list_namespaced_ingress,
-                                  namespace=namespace,
-                                  field_selector=f'metadata.name={name}',
-                                  timeout_seconds=timeout):
-                if event["object"].status.load_balancer.ingress:
-                    w.stop()
-                    return True
-                # event.type: ADDED, MODIFIED, DELETED
-                if event["type"] == "DELETED":
-                    # Ingress was deleted while waiting for it to start
-                    raise Exception("%s deleted before it started", name)
+            for (namespace, kind), group in groups.items():
+                executor.submit(self._watch_readiness, namespace, kind, group, deadline, events, stop)
+
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    target, error = events.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if error is not None:
+                    raise error
+                pending.discard(target)
+                if on_ready:
+                    on_ready(target)
+        finally:
+            # the stop closes the open watch responses, so that the watches exit before the caller closes the client
+            stop.set()
+            executor.shutdown(wait=True)
+
+        if pending:
+            logger.warning(f"Resources not ready within {timeout} seconds: {', '.join(sorted(map(str, pending)))}")
+            return False
+        return True
+
+    def _watch_readiness(self, namespace: str, kind: str, targets: List[ReadinessTarget], deadline: float,
+                         events: queue.Queue, stop: threading.Event):
+        """
+        Lists and then watches resources of a kind in a namespace, and reports targets to the events queue
+        as soon as they are ready. The watch survives API server restarts and dropped connections,
+        see resumable_watch. Resources are read as raw JSON and projected onto the fields readiness checks need.
+        """
+        resource_kind = RESOURCE_KINDS[kind]
+        list_func = getattr(self._api_pool.api(getattr(client, resource_kind.api)), resource_kind.list_method)
+        pending = {target.name: target for target in targets}
+        kwargs = {"namespace": namespace}
+        if len(pending) == 1:
+            kwargs["field_selector"] = f"metadata.name={targets[0].name}"
+
+        def observe(view: ResourceView, event_type: str):
+            target = pending.get(view.name)
+            if target is None:
+                return
+            # event.type: ADDED, MODIFIED, DELETED
+            if event_type == "DELETED":
+                # resource was deleted while waiting for it to start
+                raise Exception(f"{target} deleted before it started")
+            if resource_kind.is_ready(view, target):
+                del pending[target.name]
+                events.put((target, None))
 
-        except ApiException as e:
-            raise e
+        try:
+            for event_type, obj in resumable_watch(list_func, deadline, stop, raw=True, **kwargs):
+                if event_type == LISTED:
+                    for item in obj["items"]:
+                        observe(project(item), "ADDED")
+                else:
+                    observe(project(obj), event_type)
+                if not pending or stop.is_set():
+                    return
+        except Exception as e:
+            # errors of watches closed by the stop are not read by anyone
+            if not stop.is_set():
+                events.put((None, e))
 
     @trace()
     def wait_for_certificate(self, cert_obj, timeout: int = 300):
         return self.wait_for_custom_object(cert_obj, "cert-manager.io", "v1", "certificates", timeout=timeout)
 
     @trace()
-    def wait_for_custom_object(self, cust_object, group: str, version: str, plurals: str, timeout: int = 300):
+    def wait_for_custom_object(self, cust_object, group: str, version: str, plurals: str, timeout: int = 300) -> bool:
+        """
+        Waits for a custom object to report the Ready reason in its first status condition.
+
+        :return: True when the object is ready, False when it is not ready within timeout
+        """
         object_name = cust_object["metadata"]["name"]
         namespace = cust_object["metadata"]["namespace"]
 
-        custom_v1_instance = client.CustomObjectsApi(client.ApiClient(self._configuration))
-        w = watch.Watch()
-
-        try:
-            for event in w.stream(func=custom_v1_instance.list_namespaced_custom_object,
-                                  namespace=namespace,
-                                  group=group,
-                                  version=version,
-                                  plural=plurals,
-                                  timeout_seconds=timeout):
-                if event["object"]["status"]["conditions"][0]["reason"] == "Ready":
-                    w.stop()
-                    return
-                # event.type: ADDED, MODIFIED, DELETED
-                if event["type"] == "DELETED":
-                    # Custom Object was deleted while waiting for it to start
-                    raise Exception("%s deleted before it started", object_name)
+        custom_v1_instance = self._api_pool.api(client.CustomObjectsApi)
+        for event_type, obj in resumable_watch(custom_v1_instance.list_namespaced_custom_object,
+                                               time.monotonic() + timeout,
+                                               namespace=namespace,
+                                               group=group,
+                                               version=version,
+                                               plural=plurals,
+                                               field_selector=f"metadata.name={object_name}"):
+            for item in obj["items"] if event_type == LISTED else [obj]:
+                conditions = (item.get("status") or {}).get("conditions") or [{}]
+                if conditions[0].get("reason") == "Ready":
+                    return True
+            # event.type: ADDED, MODIFIED, DELETED
+            if event_type == "DELETED":
+                # Custom Object was deleted while waiting for it to start
+                raise Exception(f"{object_name} deleted before it started")
 
-        except ApiException as e:
-            raise e
+        logger.warning(f"{plurals} {namespace}/{object_name} not ready within {timeout} seconds")
+        return False
 
     @trace()
     def create_plain_secret(self, namespace: str, name: str, data: dict, annotations: dict = None,
@@ -507,7 +624,7 @@ class KubeClient:
         """
         name = name.lower()
 
-        api_v1_instance = client.CoreV1Api(client.ApiClient(self._configuration))
+        api_v1_instance = self._api_pool.api(client.CoreV1Api)
 
         body = client.V1Secret(metadata=client.V1ObjectMeta(name=name, namespace=namespace,
                                                             annotations=annotations,
@@ -528,7 +645,7 @@ class KubeClient:
         """
         Creates secret.
         """
-        api_v1_instance = client.CoreV1Api(client.ApiClient(self._configuration))
+        api_v1_instance = self._api_pool.api(client.CoreV1Api)
         body = client.V1Secret(metadata=client.V1ObjectMeta(name=name, namespace=namespace,
                                                             annotations=annotations,
                                                             labels=labels),
@@ -550,7 +667,7 @@ class KubeClient:
         """
         name = name.lower()
 
-        api_v1_instance = client.CoreV1Api(client.ApiClient(self._configuration))
+        api_v1_instance = self._api_pool.api(client.CoreV1Api)
 
         body = client.V1ConfigMap(metadata=client.V1ObjectMeta(name=name, namespace=namespace,
                                                                annotations=annotations,
@@ -573,7 +690,7 @@ class KubeClient:
         """
         Get secret.
         """
-        api_v1_instance = client.CoreV1Api(client.ApiClient(self._configuration))
+        api_v1_instance = self._api_pool.api(client.CoreV1Api)
 
         try:
             res = api_v1_instance.read_namespaced_secret(name=name, namespace=namespace)
@@ -591,7 +708,7 @@ class KubeClient:
         Useful for Secrets that store multiple values (e.g., vault-unseal-secret).
         Returns {} if the secret does not exist.
         """
-        api_v1_instance = client.CoreV1Api(client.ApiClient(self._configuration))
+        api_v1_instance = self._api_pool.api(client.CoreV1Api)
         try:
             res = api_v1_instance.read_namespaced_secret(name=name, namespace=namespace)
         except ApiException:
@@ -0,0 +1,71 @@
+"""Projection of raw Kubernetes resource JSON onto the few fields KubeClient reads."""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass(frozen=True)
+class ResourceView:
+    """
+    Fields of a resource read by readiness checks and pod searches, taken from the raw JSON of the resource
+    without deserializing it into a model. Fields the resource does not have are None.
+
+    :param name: metadata.name
+    :param namespace: metadata.namespace
+    :param resource_version: metadata.resourceVersion
+    :param labels: metadata.labels
+    :param phase: status.phase of pods
+    :param replicas: spec.replicas of deployments and stateful sets
+    :param ready_replicas: status.readyReplicas
+    :param available_replicas: status.availableReplicas
+    :param current_replicas: status.currentReplicas
+    :param succeeded: status.succeeded of jobs
+    :param load_balancer_ingress: Number of status.loadBalancer.ingress entries of ingresses and services
+    :param conditions: status.conditions type to status, e.g. Ready to True
+    """
+    name: str
+    namespace: Optional[str] = None
+    resource_version: Optional[str] = None
+    labels: Dict[str, str] = field(default_factory=dict)
+    phase: Optional[str] = None
+    replicas: Optional[int] = None
+    ready_replicas: Optional[int] = None
+    available_replicas: Optional[int] = None
+    current_replicas: Optional[int] = None
+    succeeded: Optional[int] = None
+    load_balancer_ingress: int = 0
+    conditions: Dict[str, str] = field(default_factory=dict)
+
+    def condition(self, condition_type: str) -> bool:
+        """
+        :param condition_type: Condition type, e.g. Ready
+        :return: True when the condition status is True
+        """
+        return self.conditions.get(condition_type) == "True"
+
+
+def project(obj: Dict[str, Any]) -> ResourceView:
+    """
+    :param obj: Raw resource JSON, e.g. an item of a list response or the object of a watch event
+    :return: View of the resource
+    """
+    metadata = obj.get("metadata") or {}
+    spec = obj.get("spec") or {}
+    status = obj.get("status") or {}
+    return ResourceView(
+        name=metadata.get("name"),
+        namespace=metadata.get("namespace"),
+        resource_version=metadata.get("resourceVersion"),
+        labels=metadata.get("labels") or {},
+        phase=status.get("phase"),
+        replicas=spec.get("replicas"),
+        ready_replicas=status.get("readyReplicas"),
+        available_replicas=status.get("availableReplicas"),
+        current_replicas=status.get("currentReplicas"),
+        succeeded=status.get("succeeded"),
+        load_balancer_ingress=len((status.get("loadBalancer") or {}).get("ingress") or ()),
+        conditions=_conditions(status.get("conditions")),
+    )
+
+
+def _conditions(conditions: Optional[List[dict]]) -> Dict[str, str]:
+    return {c.get("type"): c.get("status") for c in conditions or () if isinstance(c, dict)}
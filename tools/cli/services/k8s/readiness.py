@@ -0,0 +1,80 @@
+"""Readiness conditions of Kubernetes resources waited for by KubeClient.wait_for_all."""
+from dataclasses import dataclass
+from typing import Any, Callable, Dict
+
+from services.k8s.projection import ResourceView
+
+DEPLOYMENT = "deployment"
+STATEFUL_SET = "stateful_set"
+INGRESS = "ingress"
+POD = "pod"
+JOB = "job"
+
+
+@dataclass(frozen=True)
+class ReadinessTarget:
+    """
+    Resource to wait for.
+
+    :param kind: One of deployment, stateful_set, ingress, pod or job
+    :param namespace: Resource namespace
+    :param name: Resource name
+    :param wait_availability: Stateful sets only, wait for available rather than current replicas
+    """
+    kind: str
+    namespace: str
+    name: str
+    wait_availability: bool = True
+
+    @classmethod
+    def of(cls, obj: Any, wait_availability: bool = True) -> "ReadinessTarget":
+        """
+        :param obj: Resource model, e.g. V1Deployment returned by KubeClient.get_deployment
+        :param wait_availability: Stateful sets only, wait for available rather than current replicas
+        :return: Target of the resource
+        """
+        kind = MODEL_KINDS.get(type(obj).__name__)
+        if kind is None:
+            raise ValueError(f"Waiting for {type(obj).__name__} readiness is not supported")
+        return cls(kind, obj.metadata.namespace, obj.metadata.name, wait_availability)
+
+    def __str__(self):
+        return f"{self.kind} {self.namespace}/{self.name}"
+
+
+@dataclass(frozen=True)
+class ResourceKind:
+    """
+    :param api: Generated API class name, e.g. AppsV1Api
+    :param list_method: Namespaced list method of the API, also used to watch
+    :param is_ready: Readiness condition of a resource view
+    """
+    api: str
+    list_method: str
+    is_ready: Callable[[ResourceView, ReadinessTarget], bool]
+
+
+def _stateful_set_ready(view: ResourceView, target: ReadinessTarget) -> bool:
+    replicas = view.available_replicas if target.wait_availability else view.current_replicas
+    return replicas == view.replicas
+
+
+RESOURCE_KINDS: Dict[str, ResourceKind] = {
+    DEPLOYMENT: ResourceKind("AppsV1Api", "list_namespaced_deployment",
+                             lambda view, target: view.ready_replicas == view.replicas),
+    STATEFUL_SET: ResourceKind("AppsV1Api", "list_namespaced_stateful_set", _stateful_set_ready),
+    INGRESS: ResourceKind("NetworkingV1Api", "list_namespaced_ingress",
+                          lambda view, target: view.load_balancer_ingress > 0),
+    POD: ResourceKind("CoreV1Api", "list_namespaced_pod",
+                      lambda view, target: view.phase == "Running"),
+    JOB: ResourceKind("BatchV1Api", "list_namespaced_job",
+                      lambda view, target: bool(view.succeeded)),
+}
+
+MODEL_KINDS = {
+    "V1Deployment": DEPLOYMENT,
+    "V1StatefulSet": STATEFUL_SET,
+    "V1Ingress": INGRESS,
+    "V1Pod": POD,
+    "V1Job": JOB,
+}
@@ -0,0 +1,227 @@
+"""List and watch of Kubernetes resources that survives dropped connections and server side timeouts."""
+import functools
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, Set, Tuple
+
+import urllib3
+from kubernetes import watch
+from kubernetes.client import ApiException
+
+from common.const.const import K8S_WATCH_TIMEOUT
+from common.logging_config import logger
+
+# event type of the list responses yielded by resumable_watch
+LISTED = "LISTED"
+HTTP_STATUS_GONE = 410
+HTTP_STATUS_TOO_MANY_REQUESTS = 429
+# delay before resuming a watch after a dropped connection or a server error, in seconds
+WATCH_RETRY_DELAY = 2
+
+
+class WatchStop(threading.Event):
+    """
+    Stop signal of resumable watches that also closes their open watch responses, so that watch threads blocked
+    reading a response exit at once rather than on the next event or watch timeout.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._responses: Set[Any] = set()
+
+    def set(self):
+        with self._lock:
+            super().set()
+            responses = list(self._responses)
+        for resp in responses:
+            _abort(resp)
+
+    def track(self, resp) -> bool:
+        """
+        :param resp: Open watch response
+        :return: False when already stopped, the response is closed then
+        """
+        with self._lock:
+            if not self.is_set():
+                self._responses.add(resp)
+                return True
+        _abort(resp)
+        return False
+
+    def untrack(self, resp):
+        with self._lock:
+            self._responses.discard(resp)
+
+
+def _tracked(list_func: Callable, stop: WatchStop, responses: list) -> Callable:
+    """
+    :return: list_func that tracks the responses it returns on the stop and records them in responses
+    """
+    # Watch.stream reads the return type from the docstring of the list method
+    @functools.wraps(list_func)
+    def call(*args, **kwargs):
+        resp = list_func(*args, **kwargs)
+        responses.append(resp)
+        stop.track(resp)
+        return resp
+
+    return call
+
+
+def _abort(resp):
+    # shutdown unblocks a read in progress in another thread, close alone does not
+    try:
+        if hasattr(resp, "shutdown"):
+            resp.shutdown()
+        resp.close()
+    except Exception as e:
+        logger.debug(f"Closing watch response failed: {e}")
+
+
+def resource_version_of(obj: Any) -> str:
+    """
+    :param obj: Resource or list model, or a custom object dict
+    :return: resourceVersion of the resource or list
+    """
+    if isinstance(obj, dict):
+        return obj["metadata"]["resourceVersion"]
+    return obj.metadata.resource_version
+
+
+def list_raw(list_func: Callable, **kwargs) -> Dict[str, Any]:
+    """
+    List resources without deserializing them into models.
+
+    :param list_func: Namespaced list method of a generated API, e.g. CoreV1Api.list_namespaced_pod
+    :param kwargs: List method arguments, e.g. namespace and label_selector
+    :return: List response JSON
+    """
+    resp = list_func(_preload_content=False, **kwargs)
+    try:
+        return json.loads(resp.data)
+    finally:
+        resp.release_conn()
+
+
+def watch_raw(list_func: Callable, stop: Optional[threading.Event] = None, **kwargs) -> Iterator[Dict[str, Any]]:
+    """
+    Watch resources without deserializing them into models. Events are parsed one line at a time as they arrive,
+    so that the response is never buffered in full.
+
+    :param list_func: Namespaced list method of a generated API, e.g. CoreV1Api.list_namespaced_pod
+    :param stop: WatchStop to close the response on, other events are not checked here
+    :param kwargs: List method arguments, e.g. namespace, resource_version and timeout_seconds
+    :return: Watch events JSON, with type and object
+    :raises ApiException: On ERROR events, e.g. 410 Gone
+    """
+    resp = list_func(watch=True, _preload_content=False, **kwargs)
+    tracked = isinstance(stop, WatchStop)
+    try:
+        if tracked and not stop.track(resp):
+            return
+        for line in _iter_lines(resp):
+            event = json.loads(line)
+            if event["type"] == "ERROR":
+                status = event["object"]
+                raise ApiException(status=status.get("code"),
+                                   reason=f'{status.get("reason")}: {status.get("message")}')
+            yield event
+    finally:
+        if tracked:
+            stop.untrack(resp)
+        resp.close()
+        resp.release_conn()
+
+
+def _iter_lines(resp) -> Iterator[bytes]:
+    buffer = b""
+    for chunk in resp.stream(amt=None, decode_content=False):
+        lines = (buffer + chunk).split(b"\n")
+        buffer = lines.pop()
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+
+def _is_transient(e: ApiException) -> bool:
+    return not e.status or e.status == HTTP_STATUS_TOO_MANY_REQUESTS or e.status >= 500
+
+
+def resumable_watch(list_func: Callable, deadline: Optional[float] = None, stop: Optional[threading.Event] = None,
+                    raw: bool = False, **kwargs) -> Iterator[Tuple[str, Any]]:
+    """
+    Lists resources, then watches them from the resourceVersion of the list with bookmarks enabled. The watch is
+    resumed from the last seen resourceVersion after server side timeouts, dropped connections and API server
+    errors. Resources are listed again only when that resourceVersion is no longer available, i.e. on 410 Gone.
+
+    :param list_func: Namespaced list method of a generated API, e.g. CoreV1Api.list_namespaced_pod
+    :param deadline: time.monotonic() value to stop watching at, None watches until the caller stops iterating
+    :param stop: Stops watching once set, checked on each event and watch timeout. A WatchStop also closes the open
+        watch response, so that the watch stops at once
+    :param raw: Yield list responses and resources as JSON rather than models, see list_raw and watch_raw
+    :param kwargs: List method arguments, e.g. namespace and field_selector
+    :return: (LISTED, list response) after each list, (event type, resource) for ADDED, MODIFIED and DELETED events
+    """
+    resource_version = None
+    while (deadline is None or time.monotonic() < deadline) and not (stop and stop.is_set()):
+        try:
+            if resource_version is None:
+                res = list_raw(list_func, **kwargs) if raw else list_func(**kwargs)
+                resource_version = resource_version_of(res)
+                yield LISTED, res
+
+            timeout = K8S_WATCH_TIMEOUT
+            if deadline is not None:
+                timeout = min(timeout, int(deadline - time.monotonic()))
+                if timeout <= 0:
+                    return
+
+            watch_kwargs = dict(resource_version=resource_version, allow_watch_bookmarks=True,
+                                timeout_seconds=timeout, **kwargs)
+            responses = []
+            if raw:
+                events = watch_raw(list_func, stop, **watch_kwargs)
+            else:
+                stream_func = _tracked(list_func, stop, responses) if isinstance(stop, WatchStop) else list_func
+                # with timeout_seconds set, the model stream does not retry on its own and raises 410 Gone
+                # to the caller
+                events = watch.Watch().stream(stream_func, **watch_kwargs)
+            try:
+                for event in events:
+                    # bookmarks are not deserialized into models, the object is JSON on both paths
+                    resource_version = resource_version_of(event["object"])
+                    if event["type"] == "BOOKMARK":
+                        continue
+                    yield event["type"], event["object"]
+                    if stop and stop.is_set():
+                        return
+            finally:
+                for resp in responses:
+                    stop.untrack(resp)
+
+        except ApiException as e:
+            if e.status == HTTP_STATUS_GONE:
+                logger.debug(f"Watch of {list_func.__name__} {kwargs} expired at {resource_version}, re-listing")
+                resource_version = None
+                continue
+            if not _is_transient(e):
+                raise
+            logger.debug(f"Watch of {list_func.__name__} {kwargs} failed, resuming from {resource_version}: {e}")
+            _retry_delay(stop)
+        except (urllib3.exceptions.HTTPError, ConnectionError) as e:
+            if stop is not None and stop.is_set():
+                # the response was closed by the stop
+                return
+            logger.debug(f"Watch of {list_func.__name__} {kwargs} interrupted, resuming from {resource_version}: {e}")
+            _retry_delay(stop)
+
+
+def _retry_delay(stop: Optional[threading.Event]):
+    if stop is None:
+        time.sleep(WATCH_RETRY_DELAY)
+    else:
+        stop.wait(WATCH_RETRY_DELAY)
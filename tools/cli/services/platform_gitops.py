@@ -1,19 +1,33 @@
+import copy
 import json
 import os
 import re
 import shutil
-from typing import Optional, List
+from pathlib import Path
+from typing import Dict, Optional, List
+
+import yaml
 
 from ghrepo import GHRepo
 from git import InvalidGitRepositoryError, Repo, Actor, NoSuchPathError
 
 from common.const.common_path import LOCAL_GITOPS_FOLDER, LOCAL_TF_FOLDER_VCS, LOCAL_TF_FOLDER_SECRETS_MANAGER, \
-    LOCAL_TF_FOLDER_CORE_SERVICES, LOCAL_CC_CLUSTER_WORKLOAD_FOLDER, LOCAL_TF_FOLDER_HOSTING_PROVIDER
-from common.const.const import FALLBACK_AUTHOR_NAME, FALLBACK_AUTHOR_EMAIL
+    LOCAL_TF_FOLDER_CORE_SERVICES, LOCAL_CC_CLUSTER_WORKLOAD_FOLDER, LOCAL_TF_FOLDER_HOSTING_PROVIDER, \
+    LOCAL_TF_FOLDER, LOCAL_TF_FOLDER_WORKLOADS, LOCAL_TF_FOLDER_WORKLOAD_SHARDS, LOCAL_ATLANTIS_CONFIG_FILE
+from common.const.const import FALLBACK_AUTHOR_NAME, FALLBACK_AUTHOR_EMAIL, TF_WL_STATE_SHARDING, \
+    TF_REMOTE_STATE_READ
 from common.logging_config import logger
 from common.tracing_decorator import trace
+from services.tf_state_reader import TF_BACKEND_BLOCK_RE, TF_BACKEND_ATTRIBUTE_RE, TF_STATE_CHUNK_SIZE, \
+    TF_STATE_RESOURCES_KEY, TerraformBackend, TerraformRemoteStateReader, read_state_keys
 from services.vcs.git_provider_manager import GitProviderManager
 
+# modules that could keep each workload in a state of its own, hosting provider grants all workloads
+# access with a single CI role and always keeps them in one state
+WL_SHARDED_TF_MODULES = (LOCAL_TF_FOLDER_VCS, LOCAL_TF_FOLDER_SECRETS_MANAGER, LOCAL_TF_FOLDER_CORE_SERVICES)
+# backend attributes holding the state path, s3 and azurerm use key, gcs uses prefix
+TF_BACKEND_STATE_PATH_ATTRIBUTES = ("key", "prefix")
+
 
 class PlatformGitOpsRepo:
     def __init__(
@@ -160,16 +174,20 @@ class PlatformGitOpsRepo:
         return self._git_man.create_pr(repo_name, head_branch, base_branch, title, body)
 
     @trace()
-    def add_workload(self, wl_name: str, wl_repo_name: str, wl_gitops_repo_name: str):
+    def add_workload(self, wl_name: str, wl_repo_name: str, wl_gitops_repo_name: str,
+                     sharded_state: bool = TF_WL_STATE_SHARDING):
         """
         Create variable files and core services configuration for a workload
 
         :param wl_name: Workload name
         :param wl_repo_name: Workload source code repository name
         :param wl_gitops_repo_name: Workload GitOps repository name
+        :param sharded_state: Keep the workload in a Terraform state of its own for vcs, secrets and core services,
+                              instead of the workloads map of the platform modules
         """
+        add_vars = self._add_wl_shard if sharded_state else self._add_wl_vars
         # repos
-        self._add_wl_vars(LOCAL_TF_FOLDER_VCS, wl_name, {
+        add_vars(LOCAL_TF_FOLDER_VCS, wl_name, {
             "description": f"CG DevX {wl_name} workload definition",
             "repos": {
                 wl_repo_name: {},
@@ -179,17 +197,19 @@ class PlatformGitOpsRepo:
             }
         })
         # secrets
-        self._add_wl_vars(LOCAL_TF_FOLDER_SECRETS_MANAGER, wl_name, {
+        add_vars(LOCAL_TF_FOLDER_SECRETS_MANAGER, wl_name, {
             "description": f"CG DevX {wl_name} workload definition"
         })
         # core services
-        self._add_wl_vars(LOCAL_TF_FOLDER_CORE_SERVICES, wl_name, {
+        add_vars(LOCAL_TF_FOLDER_CORE_SERVICES, wl_name, {
             "description": f"CG DevX {wl_name} workload definition"
         })
         # hosting provider
         self._add_wl_vars(LOCAL_TF_FOLDER_HOSTING_PROVIDER, wl_name, {
             "description": f"CG DevX {wl_name} workload definition"
         })
+        if sharded_state:
+            self._update_atlantis_projects()
 
         # prepare ArgoCD manifest
         wl_gitops_repo_url = self._git_man.get_repository_url(self._git_man.organization, wl_gitops_repo_name)
@@ -215,12 +235,12 @@ class PlatformGitOpsRepo:
 
         :param wl_name: Workload name
         """
-        # repos
-        self._rm_wl_vars(LOCAL_TF_FOLDER_VCS, wl_name)
-        # secrets
-        self._rm_wl_vars(LOCAL_TF_FOLDER_SECRETS_MANAGER, wl_name)
-        # core services
-        self._rm_wl_vars(LOCAL_TF_FOLDER_CORE_SERVICES, wl_name)
+        for tf_module_path in WL_SHARDED_TF_MODULES:
+            self._rm_wl_vars(tf_module_path, wl_name)
+            # the shard is kept with an empty workloads map, so that Atlantis plans destroy of its resources
+            shard_path = LOCAL_TF_FOLDER_WORKLOADS / wl_name / tf_module_path.name
+            if os.path.exists(shard_path):
+                self._rm_wl_vars(shard_path, wl_name)
         # hosting provider
         self._rm_wl_vars(LOCAL_TF_FOLDER_HOSTING_PROVIDER, wl_name)
 
@@ -264,9 +284,173 @@ class PlatformGitOpsRepo:
         try:
             with open(os.path.join(LOCAL_TF_FOLDER_VCS, "terraform.tfvars.json"), "r") as file:
                 tf_vars = json.load(file)
-            workloads = tf_vars.get("workloads", {}).keys()
-            logger.info(f"Found {len(workloads)} workloads: {list(workloads)}")
-            return list(workloads)
+            workloads = list(tf_vars.get("workloads", {}).keys())
         except FileNotFoundError:
             logger.error(f"Could not find the Terraform variables file at {LOCAL_TF_FOLDER_VCS}")
             return []
+
+        for shard_vars_file in sorted(LOCAL_TF_FOLDER_WORKLOADS.glob(f"*/{LOCAL_TF_FOLDER_VCS.name}/terraform.tfvars.json")):
+            with open(shard_vars_file, "r") as file:
+                tf_vars = json.load(file)
+            workloads.extend(wl_name for wl_name in tf_vars.get("workloads", {}) if wl_name not in workloads)
+
+        logger.info(f"Found {len(workloads)} workloads: {workloads}")
+        return workloads
+
+    @trace()
+    def prune_workload_shards(self, env: Optional[Dict[str, str]] = None) -> List[str]:
+        """
+        Remove Terraform state shards of deleted workloads, once their empty workloads map is in the branch
+        and their states have no resources left, i.e. Atlantis has destroyed the shard resources. Shards whose
+        states still have resources, or could not be read, are kept, so that their resources can still be destroyed.
+        Should be called on a fresh branch only, as shards emptied by the branch itself still have to be applied.
+
+        :param env: Cloud provider credentials to read the shard states with, e.g. AWS_PROFILE
+        :return: Names of the pruned workloads
+        """
+        wl_folders = sorted(p for p in LOCAL_TF_FOLDER_WORKLOADS.glob("*") if p.is_dir())
+        if not TF_WL_STATE_SHARDING and not wl_folders:
+            return []
+
+        pruned = []
+        for wl_folder in wl_folders:
+            retired = True
+            for shard_vars_file in wl_folder.glob("*/terraform.tfvars.json"):
+                with open(shard_vars_file, "r") as file:
+                    if json.load(file).get("workloads"):
+                        retired = False
+                        break
+            if not retired:
+                continue
+            shards = sorted(p for p in wl_folder.glob("*") if p.is_dir())
+            if not all(self._wl_shard_destroyed(shard_path, env) for shard_path in shards):
+                logger.warning(f"Terraform state shards of deleted workload {wl_folder.name} are kept, "
+                               f"as their resources are not destroyed yet")
+                continue
+            shutil.rmtree(wl_folder)
+            pruned.append(wl_folder.name)
+            logger.info(f"Pruned Terraform state shards of deleted workload {wl_folder.name}")
+
+        if pruned:
+            self._update_atlantis_projects()
+        return pruned
+
+    @staticmethod
+    def _wl_shard_destroyed(shard_path: Path, env: Optional[Dict[str, str]] = None) -> bool:
+        """
+        :return: True when the state of the workload shard has no resources, False when it has some
+                 or could not be read
+        """
+        backend = TerraformBackend.from_module(shard_path)
+        try:
+            if backend is None:
+                state_file = shard_path / "terraform.tfstate"
+                if not state_file.exists():
+                    logger.debug(f"No local state of workload shard {shard_path}")
+                    return False
+                with open(state_file, "rb") as infile:
+                    state = read_state_keys(iter(lambda: infile.read(TF_STATE_CHUNK_SIZE), b""),
+                                            (TF_STATE_RESOURCES_KEY,))
+                resources = state.get(TF_STATE_RESOURCES_KEY)
+            else:
+                if not TF_REMOTE_STATE_READ:
+                    return False
+                resources = TerraformRemoteStateReader(env).resources(backend)
+        except Exception as e:
+            logger.warning(f"Could not read the state of workload shard {shard_path}: {e}")
+            return False
+        return resources == []
+
+    @staticmethod
+    def _add_wl_shard(tf_module_path: Path, wl_name: str, payload=None):
+        """
+        Create the root module of a workload with a state of its own from the module shard template.
+        The backend is the one of the platform module, with the workload added to the state path.
+        """
+        if payload is None:
+            payload = {}
+
+        module = tf_module_path.name
+        shard_template = LOCAL_TF_FOLDER_WORKLOAD_SHARDS / module
+        if not shard_template.exists():
+            raise FileNotFoundError(f"Workload shard template {shard_template} does not exist, "
+                                    f"the GitOps repository predates sharded workload states")
+
+        shard_path = LOCAL_TF_FOLDER_WORKLOADS / wl_name / module
+        shutil.copytree(shard_template, shard_path, dirs_exist_ok=True)
+
+        with open(shard_path / "terraform.tfvars.json", "w") as file:
+            file.write(json.dumps({"workloads": {wl_name: payload}}, indent=2))
+
+        backend = PlatformGitOpsRepo._wl_shard_backend(tf_module_path, wl_name)
+        if backend:
+            with open(shard_path / "backend.tf", "w") as file:
+                file.write(f"terraform {{\n  # Remote backend configuration\n  {backend}\n}}\n")
+
+    @staticmethod
+    def _wl_shard_backend(tf_module_path: Path, wl_name: str) -> Optional[str]:
+        """
+        :return: Backend block of the platform module with the state path of the workload shard,
+                 or None when the module uses local state
+        """
+        module = tf_module_path.name
+        for tf_file in sorted(tf_module_path.glob("*.tf")):
+            with open(tf_file, "r") as file:
+                match = TF_BACKEND_BLOCK_RE.search(file.read())
+            if match:
+                break
+        else:
+            return None
+
+        rewritten = 0
+
+        def rewrite(attribute: re.Match) -> str:
+            nonlocal rewritten
+            if attribute.group("name") not in TF_BACKEND_STATE_PATH_ATTRIBUTES:
+                return attribute.group(0)
+            # e.g. terraform/vcs/terraform.tfstate -> terraform/workloads/<wl>/vcs/terraform.tfstate
+            value, count = re.subn(rf"(^|/){re.escape(module)}(/|$)", rf"\g<1>workloads/{wl_name}/{module}\g<2>",
+                                   attribute.group("value"), count=1)
+            rewritten += count
+            return attribute.group(0).replace(attribute.group("value"), value)
+
+        backend = TF_BACKEND_ATTRIBUTE_RE.sub(rewrite, match.group(0))
+        if not rewritten:
+            # never let a shard share the state of the platform module
+            raise ValueError(f"Could not derive the state path of workload {wl_name} from {module} backend")
+        return backend
+
+    @staticmethod
+    def _update_atlantis_projects():
+        """
+        Regenerate Atlantis projects of workload shards. A shard project is a copy of its platform module project,
+        so that shards are planned and applied in the same execution order group as the module.
+        """
+        if not LOCAL_ATLANTIS_CONFIG_FILE.exists():
+            return
+
+        with open(LOCAL_ATLANTIS_CONFIG_FILE, "r") as file:
+            config = yaml.safe_load(file)
+
+        workloads_dir = LOCAL_TF_FOLDER_WORKLOADS.relative_to(LOCAL_GITOPS_FOLDER).as_posix()
+        projects = [p for p in config.get("projects", []) if not p["dir"].startswith(f"{workloads_dir}/")]
+        module_projects = {p["dir"]: p for p in projects}
+
+        for shard_path in sorted(LOCAL_TF_FOLDER_WORKLOADS.glob("*/*")):
+            module_dir = (LOCAL_TF_FOLDER / shard_path.name).relative_to(LOCAL_GITOPS_FOLDER).as_posix()
+            module_project = module_projects.get(module_dir)
+            if not shard_path.is_dir() or module_project is None:
+                continue
+            project = copy.deepcopy(module_project)
+            project["dir"] = shard_path.relative_to(LOCAL_GITOPS_FOLDER).as_posix()
+            # shards are two folders deeper than the module
+            autoplan = project.get("autoplan", {})
+            if "when_modified" in autoplan:
+                autoplan["when_modified"] = [
+                    p.replace("../modules/", "../../../modules/") for p in autoplan["when_modified"]
+                ]
+            projects.append(project)
+
+        config["projects"] = projects
+        with open(LOCAL_ATLANTIS_CONFIG_FILE, "w") as file:
+            yaml.safe_dump(config, file, sort_keys=False)
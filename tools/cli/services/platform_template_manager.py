@@ -2,19 +2,26 @@ import os
 import pathlib
 import shutil
 from pathlib import Path
+from typing import Dict, List, Tuple
 from urllib.error import HTTPError
 
 import requests
 from ghrepo import GHRepo
 from git import Repo, RemoteProgress, GitError, Actor
+from git.index.fun import stat_mode_to_index_mode
 from git.exc import GitCommandError
 
-from common.const.common_path import LOCAL_TF_FOLDER, LOCAL_GITOPS_FOLDER
-from common.const.const import GITOPS_REPOSITORY_URL, GITOPS_REPOSITORY_BRANCH
+from common.const.common_path import LOCAL_TF_FOLDER, LOCAL_GITOPS_FOLDER, LOCAL_GITOPS_TEMPLATE_FOLDER, \
+    LOCAL_GITOPS_RENDER_MANIFEST, LOCAL_GITOPS_TEMPLATE_INDEX
+from common.const.const import GITOPS_REPOSITORY_URL, GITOPS_REPOSITORY_BRANCH, GIT_PATHS_PER_COMMAND
 from common.enums.git_providers import GitProviders
 from common.logging_config import logger
 from common.state_store import StateStore
 from common.tracing_decorator import trace
+from common.utils.git_mirror_cache import GitMirrorCache
+from common.utils.placeholder_index import PlaceholderIndex
+from common.utils.substitution_engine import SubstitutionEngine
+from common.utils.template_renderer import render_files, RenderManifest, is_template_file, git_blob_id
 
 
 class GitOpsTemplateManager:
@@ -57,22 +64,47 @@ class GitOpsTemplateManager:
 
     @trace()
     def clone(self):
-        temp_folder = LOCAL_GITOPS_FOLDER / ".tmp"
+        # rendered LOCAL_GITOPS_FOLDER is kept, so that unchanged files are not rewritten on re-render,
+        # unless the render manifest does not tell which of its files were rendered
+        if not RenderManifest(LOCAL_GITOPS_RENDER_MANIFEST, LOCAL_GITOPS_FOLDER).loaded:
+            self.__clean_gitops_folder()
 
-        if os.path.exists(LOCAL_GITOPS_FOLDER):
-            shutil.rmtree(LOCAL_GITOPS_FOLDER)
+        if os.path.exists(LOCAL_GITOPS_TEMPLATE_FOLDER):
+            shutil.rmtree(LOCAL_GITOPS_TEMPLATE_FOLDER)
 
         if os.environ.get("CGDEVX_CLI_CLONE_LOCAL", False):
             source_dir = pathlib.Path().resolve().parent
-            shutil.copytree(source_dir, temp_folder)
+            shutil.copytree(source_dir, LOCAL_GITOPS_TEMPLATE_FOLDER)
             return
 
-        os.makedirs(temp_folder)
+        os.makedirs(LOCAL_GITOPS_TEMPLATE_FOLDER)
         try:
-            repo = Repo.clone_from(self._url, temp_folder, progress=ProgressPrinter(), branch=self._branch)
+            repo = GitMirrorCache().clone(self._url, LOCAL_GITOPS_TEMPLATE_FOLDER, progress=ProgressPrinter(),
+                                          branch=self._branch)
         except GitError as e:
             raise e
 
+    @staticmethod
+    def __clean_gitops_folder():
+        """
+        Remove all files of the GitOps folder except Terraform working directories (.terraform),
+        so that files left by runs made without the render manifest are never pushed or applied
+        """
+        if not os.path.exists(LOCAL_GITOPS_FOLDER):
+            return
+        logger.debug(f"No render manifest for {LOCAL_GITOPS_FOLDER}, removing previously rendered files")
+        for root, dirs, files in os.walk(LOCAL_GITOPS_FOLDER, topdown=False):
+            if ".terraform" in Path(root).relative_to(LOCAL_GITOPS_FOLDER).parts:
+                continue
+            for f in files:
+                os.remove(os.path.join(root, f))
+            for d in dirs:
+                dir_path = os.path.join(root, d)
+                if os.path.islink(dir_path):
+                    os.remove(dir_path)
+                elif d != ".terraform" and not os.listdir(dir_path):
+                    os.rmdir(dir_path)
+
     @staticmethod
     def _parse_github_repo_from_remote(remote_url: str):
         """
@@ -196,54 +228,22 @@ class GitOpsTemplateManager:
             if push_root.exists():
                 shutil.rmtree(push_root)
 
-            # Ensure we have a real git history to base changes on
-            prev_git_ssh = os.environ.get("GIT_SSH_COMMAND")
-            os.environ["GIT_SSH_COMMAND"] = ssh_cmd
-            try:
-                repo = Repo.clone_from(path, push_root, branch="main")
-            finally:
-                if prev_git_ssh is None:
-                    os.environ.pop("GIT_SSH_COMMAND", None)
-                else:
-                    os.environ["GIT_SSH_COMMAND"] = prev_git_ssh
-
-            def _wipe_worktree_except_git(dst: Path):
-                for name in os.listdir(dst):
-                    if name == ".git":
-                        continue
-                    p = dst / name
-                    if p.is_dir():
-                        shutil.rmtree(p)
-                    else:
-                        try:
-                            p.unlink()
-                        except Exception:
-                            pass
-
-            def _copy_tree(src: Path, dst: Path):
-                for root, dirs, files in os.walk(src):
-                    rel = os.path.relpath(root, src)
-                    if rel == ".git" or rel.startswith(".git" + os.sep):
-                        continue
-                    if rel.startswith(".push_tmp"):
-                        continue
-                    dst_root = dst if rel == "." else (dst / rel)
-                    os.makedirs(dst_root, exist_ok=True)
-                    for f in files:
-                        if f == ".DS_Store":
-                            continue
-                        src_file = Path(root) / f
-                        if ".git" in src_file.parts or ".push_tmp" in src_file.parts:
-                            continue
-                        shutil.copy2(src_file, dst_root / f)
+            # Ensure we have a real git history to base changes on,
+            # the mirror is always fetched as the clone is pushed to
+            repo = GitMirrorCache().clone(path, push_root, branch="main", env={"GIT_SSH_COMMAND": ssh_cmd},
+                                          fetch_interval=0)
 
             # Make the clone match the rendered output exactly (authoritative)
-            _wipe_worktree_except_git(push_root)
-            _copy_tree(rendered_root, push_root)
+            changed, removed = GitOpsTemplateManager.__overlay_sync(rendered_root, repo)
+            logger.debug(f"GitOps sync: {len(changed)} files added or updated, {len(removed)} removed")
 
             with repo.git.custom_environment(GIT_SSH_COMMAND=ssh_cmd):
-                repo.git.add(all=True)
-                if repo.is_dirty(untracked_files=True):
+                # stage exactly the synced paths, so that git does not rehash the whole tree
+                for i in range(0, len(changed), GIT_PATHS_PER_COMMAND):
+                    repo.git.add("--", *changed[i:i + GIT_PATHS_PER_COMMAND])
+                for i in range(0, len(removed), GIT_PATHS_PER_COMMAND):
+                    repo.git.rm("--cached", "--quiet", "--", *removed[i:i + GIT_PATHS_PER_COMMAND])
+                if (changed or removed) and repo.is_dirty(index=True, working_tree=False):
                     author = Actor(name=git_user_name, email=git_user_email)
                     repo.index.commit("chore: update generated gitops", author=author, committer=author)
 
@@ -295,83 +295,160 @@ class GitOpsTemplateManager:
         except GitError as e:
             raise e
 
+    @staticmethod
+    def __overlay_sync(rendered_root: Path, repo: Repo) -> Tuple[List[str], List[str]]:
+        """
+        Overlay the rendered tree onto a checkout, comparing files with the checkout index by size, mode and
+        git blob id. Only files that differ are written, and only tracked files missing in the rendered tree
+        are deleted, so that the cost is proportional to the change rather than to the repo size.
+        Git blob ids of rendered files are taken from the render manifest when the files were not modified since.
+        Files of the rendered tree not recorded in the render manifest, e.g. left by earlier runs or by files
+        dropped from the template, are not synced.
+        :param rendered_root: Rendered GitOps tree
+        :param repo: Checkout of the GitOps repository
+        :return: Added or updated paths, removed paths, POSIX and relative to the checkout
+        """
+        push_root = Path(repo.working_tree_dir)
+        manifest = RenderManifest(LOCAL_GITOPS_RENDER_MANIFEST, LOCAL_GITOPS_FOLDER)
+        tracked = {path: entry for (path, stage), entry in repo.index.entries.items()}
+
+        rendered = {}
+        for root, dirs, files in os.walk(rendered_root):
+            dirs[:] = [d for d in dirs if d not in (".git", push_root.name)]
+            for f in files:
+                if f == ".DS_Store":
+                    continue
+                src_file = Path(root) / f
+                if manifest.get(src_file) is None:
+                    continue
+                rendered[src_file.relative_to(rendered_root).as_posix()] = src_file
+
+        # untracked files ignored by the GitOps repo, e.g. local Terraform artifacts, are not synced
+        untracked = [path for path in rendered if path not in tracked]
+        ignored = set()
+        for i in range(0, len(untracked), GIT_PATHS_PER_COMMAND):
+            ignored.update(repo.ignored(*untracked[i:i + GIT_PATHS_PER_COMMAND]))
+
+        changed = []
+        for path, src_file in rendered.items():
+            if path in ignored:
+                continue
+            entry = tracked.get(path)
+            if entry is not None:
+                stat = src_file.stat()
+                if stat.st_size == entry.size and stat_mode_to_index_mode(stat.st_mode) == entry.mode:
+                    blob = manifest.blob_id(src_file) or git_blob_id(src_file.read_bytes())
+                    if blob == entry.hexsha:
+                        continue
+            dst_file = push_root / path
+            os.makedirs(dst_file.parent, exist_ok=True)
+            shutil.copy2(src_file, dst_file)
+            changed.append(path)
+
+        removed = [path for path in tracked if path not in rendered]
+        for path in removed:
+            try:
+                (push_root / path).unlink()
+            except FileNotFoundError:
+                pass
+        return changed, removed
+
     @staticmethod
     @trace()
     def build_repo_from_template(git_provider: GitProviders):
-        temp_folder = LOCAL_GITOPS_FOLDER / ".tmp"
-
-        os.makedirs(LOCAL_GITOPS_FOLDER, exist_ok=True)
-        # workaround for local development mode, this should not happen in prod
-        for root, dirs, files in os.walk(temp_folder):
-            for name in files:
-                if name.endswith(".DS_Store") or name.endswith(".terraform") \
-                        or name.endswith(".github") or name.endswith(".idea"):
-                    path = os.path.join(root, name)
-                    if os.path.isfile(path):
-                        os.remove(path)
-                    if os.path.isdir(path):
-                        os.rmdir(path)
-
-        shutil.copytree(temp_folder / "platform" / "terraform", LOCAL_GITOPS_FOLDER / "terraform")
-        shutil.copytree(temp_folder / "platform" / "gitops-pipelines", LOCAL_GITOPS_FOLDER / "gitops-pipelines")
-        for src_file in Path(temp_folder / "platform").glob('*.*'):
-            shutil.copy(src_file, LOCAL_GITOPS_FOLDER)
-
-        # drop all non template readme files
-        for root, dirs, files in os.walk(LOCAL_GITOPS_FOLDER):
-            for name in files:
-                if name.endswith(".md") and not name.startswith("tpl_"):
-                    os.remove(os.path.join(root, name))
-
-        # rename readme file templates
-        for root, dirs, files in os.walk(LOCAL_GITOPS_FOLDER):
-            for name in files:
-                if name.startswith("tpl_") and name.endswith(".md"):
-                    s = os.path.join(root, name)
-                    os.rename(s, s.replace("tpl_", ""))
-
-        shutil.rmtree(temp_folder)
+        """
+        Index placeholders of the GitOps repo files laid out from the cloned template.
+        Files are not copied, they are rendered straight from the clone by parametrise.
+        """
+        PlaceholderIndex.build(GitOpsTemplateManager.__template_layout(), is_template_file) \
+            .save(LOCAL_GITOPS_TEMPLATE_INDEX)
         return
 
+    @staticmethod
+    def __template_layout() -> Dict[str, Path]:
+        """
+        GitOps repo layout of the cloned template: terraform and gitops-pipelines folders and top level files
+        of the platform folder. Only readme templates are kept, with the "tpl_" prefix dropped.
+        :return: GitOps repo file path, POSIX and relative to the repo root, to the template file
+        """
+        platform = LOCAL_GITOPS_TEMPLATE_FOLDER / "platform"
+        sources = [p for p in platform.glob("*.*") if p.is_file()]
+        for folder in ("terraform", "gitops-pipelines"):
+            sources.extend(p for p in (platform / folder).rglob("*") if p.is_file())
+
+        layout = {}
+        for source in sources:
+            name = source.name
+            # workaround for local development mode, this should not happen in prod
+            if name.endswith((".DS_Store", ".terraform", ".github", ".idea")):
+                continue
+            if name.endswith(".md"):
+                # drop all non template readme files, rename readme file templates
+                if not name.startswith("tpl_"):
+                    continue
+                name = name.replace("tpl_", "")
+            layout[(source.parent / name).relative_to(platform).as_posix()] = source
+        return layout
+
     @trace()
-    def parametrise_tf(self, state: StateStore):
-        self.__file_replace(state, LOCAL_TF_FOLDER)
+    def parametrise_tf(self, state: StateStore) -> Dict[str, List[str]]:
+        """
+        Render Terraform templates
+        :return: Placeholders left unresolved to files using them
+        """
+        return self.__file_replace(state, "terraform")
+
+    @trace()
+    def parametrise(self, state: StateStore) -> Dict[str, List[str]]:
+        """
+        Render all GitOps templates
+        :return: Placeholders left unresolved to files using them
+        """
+        return self.__file_replace(state, "")
+
+    def __file_replace(self, state: StateStore, scope: str) -> Dict[str, List[str]]:
+        """
+        Render templates from the cloned template into the GitOps folder, each template is read once and
+        rendered in memory. Only files whose template or placeholder values changed since the previous rendering
+        are re-rendered, and only files whose content changed are rewritten.
+        :param scope: GitOps repo folder to render, all files when empty
+        """
+        layout = self.__template_layout()
+        index = PlaceholderIndex.load(LOCAL_GITOPS_TEMPLATE_INDEX)
+        if index is None:
+            index = PlaceholderIndex.build(layout, is_template_file)
+            index.save(LOCAL_GITOPS_TEMPLATE_INDEX)
+        if scope:
+            layout = {path: source for path, source in layout.items() if path.startswith(scope + "/")}
+
+        # fragments may contain parameter placeholders, so fragments are always substituted first
+        engine = SubstitutionEngine(state.fragments, state.parameters)
+        unresolved = index.unresolved(engine.keys, scope)
+        for token, files in unresolved.items():
+            logger.warning(f"Placeholder {token} has no value, used in: {', '.join(files)}")
+
+        manifest = RenderManifest(LOCAL_GITOPS_RENDER_MANIFEST, LOCAL_GITOPS_FOLDER)
+        render_files(layout, engine, LOCAL_GITOPS_FOLDER, manifest, index, scope)
+
         # Some generated repos may already contain hardcoded Terraform backends (no placeholders).
         # Make backend bucket selection idempotent by overwriting backend blocks based on current state.
-        self.__rewrite_tf_backend_bucket(state, LOCAL_TF_FOLDER)
+        self.__rewrite_tf_backend_bucket(state, LOCAL_TF_FOLDER, engine)
         # Some template revisions contain GitHub branch protection arguments not supported by the
         # pinned GitHub provider version. Patch generated Terraform to keep setup idempotent.
         self.__fix_github_branch_protection_schema(LOCAL_TF_FOLDER)
-
-    @trace()
-    def parametrise(self, state: StateStore):
-        self.__file_replace(state, LOCAL_GITOPS_FOLDER)
-
-    @staticmethod
-    def __file_replace(state: StateStore, folder):
-        try:
-            for root, dirs, files in os.walk(folder):
-                for name in files:
-                    if name.endswith(".tf") or name.endswith(".yaml") or name.endswith(".yml") or name.endswith(".md"):
-                        file_path = os.path.join(root, name)
-                        with open(file_path, "r") as file:
-                            data = file.read()
-                            for k, v in state.fragments.items():
-                                data = data.replace(k, v)
-                            for k, v in state.parameters.items():
-                                data = data.replace(k, v)
-                        with open(file_path, "w") as file:
-                            file.write(data)
-        except Exception as e:
-            raise Exception(f"Error while parametrizing file: {file_path}", e)
+        # post-processed files stay valid until their templates or values change
+        manifest.refresh(LOCAL_TF_FOLDER)
+        manifest.save()
+        return unresolved
 
     @staticmethod
-    def __rewrite_tf_backend_bucket(state: StateStore, tf_root: Path):
+    def __rewrite_tf_backend_bucket(state: StateStore, tf_root: Path, engine: SubstitutionEngine):
         """
         Ensure terraform backend blocks in terraform/*/*.tf always use the currently selected backend bucket.
 
         This is required because some repos may have backends hardcoded (no '# <TF_*_REMOTE_BACKEND>' placeholders),
         which would otherwise keep stale bucket names forever.
+        Backend fragments could reference parameters, bucket names are rendered with the same engine as templates.
         """
         # Map service folder -> fragment key in state.fragments
         fragment_by_service = {
@@ -382,7 +459,9 @@ class GitOpsTemplateManager:
             "core_services": "# <TF_CORE_SERVICES_REMOTE_BACKEND>",
         }
 
-        for service_dir in tf_root.iterdir():
+        # workload shards keep the backend of their platform module, see PlatformGitOpsRepo.add_workload
+        service_dirs = list(tf_root.iterdir()) + list(tf_root.glob("workloads/*/*"))
+        for service_dir in service_dirs:
             if not service_dir.is_dir():
                 continue
             service = service_dir.name
@@ -402,7 +481,7 @@ class GitOpsTemplateManager:
                     if len(parts) == 2:
                         val = parts[1].strip().strip('"')
                         if val:
-                            bucket = val
+                            bucket = engine.substitute(val)
                             break
             if not bucket:
                 continue
@@ -479,6 +558,7 @@ class GitOpsTemplateManager:
                 data = None
 
             if data and "push_restrictions" in data:
+                original = data
                 # Remove direct argument line if present
                 data = data.replace("  push_restrictions    = var.push_restrictions\n", "")
 
@@ -498,10 +578,12 @@ class GitOpsTemplateManager:
                     if anchor in data:
                         data = data.replace(anchor, block)
 
-                try:
-                    repo_tf.write_text(data)
-                except Exception:
-                    pass
+                # keep mtime of already patched files unchanged
+                if data != original:
+                    try:
+                        repo_tf.write_text(data)
+                    except Exception:
+                        pass
 
         if repo_vars.exists():
             try:
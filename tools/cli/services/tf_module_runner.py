@@ -0,0 +1,175 @@
+"""Concurrent runner of Terraform commands over several modules."""
+import json
+import os
+import shutil
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from common.const.const import TF_MODULE_WORKERS
+from common.custom_excpetions import StageGraphError
+from common.logging_config import logger
+from common.timing_recorder import TimingRecorder
+from services.tf_wrapper import TfWrapper, TerraformExecutionProfile, TF_PROFILE_DEFAULT
+
+# timing category of module commands run by TerraformModuleRunner
+TF_MODULE_CATEGORY = "tf_module"
+TF_JOB_COMMANDS = ("apply", "destroy", "plan", "output")
+
+
+@dataclass
+class TerraformJob:
+    """
+    Terraform command to run for a single module.
+
+    :param name: Unique job name, also used to name the module log file and timings
+    :param working_dir: Terraform module folder
+    :param command: One of apply, destroy, plan or output, run after init
+    :param variables: Module variables, written to a var-file of the job
+    :param env: Environment variables of the job on top of the current process environment
+    :param depends_on: Names of the jobs that must succeed before this one starts
+    :param data_dir: Terraform data folder of the job, relative to the module folder. Jobs of the same module
+                     get a folder each, unless set
+    :param profile: Parallelism, refresh mode and targets of the command
+    """
+    name: str
+    working_dir: str
+    command: str = "apply"
+    variables: Dict[str, Any] = field(default_factory=dict)
+    env: Dict[str, str] = field(default_factory=dict)
+    depends_on: List[str] = field(default_factory=list)
+    data_dir: Optional[str] = None
+    profile: TerraformExecutionProfile = TF_PROFILE_DEFAULT
+
+
+@dataclass
+class TerraformJobResult:
+    """
+    :param name: Job name
+    :param status: succeeded, failed, or skipped when a job it depends on did not succeed
+    :param duration: Wall-clock duration, seconds
+    :param result: Return value of the command, e.g. outputs
+    :param error: Error of a failed job
+    """
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+
+    name: str
+    status: str
+    duration: float = 0.0
+    result: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def log_file(self) -> Optional[str]:
+        """Full Terraform output of a failed job"""
+        return str(self.error.log_file) if getattr(self.error, "log_file", None) else None
+
+
+class TerraformModuleRunner:
+    """
+    Runs Terraform jobs with bounded concurrency. A job is started as soon as all of its dependencies succeeded.
+    Each job has its own TfWrapper environment, data folder and var-file, so that jobs never share process
+    state. A failed job does not stop independent jobs, only the jobs depending on it are skipped.
+    """
+
+    def __init__(self, jobs: List[TerraformJob], max_workers: int = TF_MODULE_WORKERS):
+        self._jobs: Dict[str, TerraformJob] = {}
+        for job in jobs:
+            if job.name in self._jobs:
+                raise StageGraphError(f"Duplicate Terraform job '{job.name}'")
+            if job.command not in TF_JOB_COMMANDS:
+                raise ValueError(f"Unsupported Terraform job command '{job.command}'")
+            self._jobs[job.name] = job
+
+        for job in jobs:
+            for dependency in job.depends_on:
+                if dependency not in self._jobs:
+                    raise StageGraphError(f"Terraform job '{job.name}' depends on unknown job '{dependency}'")
+        self._check_cycles()
+
+        # jobs of the same module would otherwise share .terraform and overwrite each other's backend state
+        modules = Counter(os.path.abspath(job.working_dir) for job in jobs)
+        for job in jobs:
+            if job.data_dir is None and modules[os.path.abspath(job.working_dir)] > 1:
+                job.data_dir = f".terraform-{job.name}"
+
+        self._max_workers = max(1, max_workers)
+
+    def run(self) -> Dict[str, TerraformJobResult]:
+        """
+        Execute all jobs
+        :return: Job name to its result, in the order jobs were given
+        """
+        results: Dict[str, TerraformJobResult] = {}
+        pending = list(self._jobs)
+        running: Dict[Future, TerraformJob] = {}
+
+        with ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="tf") as executor:
+            while pending or running:
+                for name in list(pending):
+                    job = self._jobs[name]
+                    statuses = [results[d].status if d in results else None for d in job.depends_on]
+                    if any(status in (TerraformJobResult.FAILED, TerraformJobResult.SKIPPED) for status in statuses):
+                        pending.remove(name)
+                        results[name] = TerraformJobResult(name, TerraformJobResult.SKIPPED)
+                        logger.warning(f"Skipping Terraform job {name}, as a job it depends on did not succeed")
+                        continue
+                    if all(status == TerraformJobResult.SUCCEEDED for status in statuses) \
+                            and len(running) < self._max_workers:
+                        pending.remove(name)
+                        logger.info(f"Starting Terraform job {name}: {job.command} {job.working_dir}")
+                        running[executor.submit(self._run_job, job)] = job
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = running.pop(future)
+                    results[job.name] = future.result()
+                    logger.info(f"Terraform job {job.name} {results[job.name].status}")
+
+        return {name: results[name] for name in self._jobs}
+
+    @staticmethod
+    def _run_job(job: TerraformJob) -> TerraformJobResult:
+        env = dict(job.env)
+        if job.data_dir:
+            env["TF_DATA_DIR"] = job.data_dir
+        # the var-file holds variable values, secrets included, so that it is removed right after the job
+        job_dir = tempfile.mkdtemp(prefix=f"cgdevx-{job.name}-")
+        start = time.perf_counter()
+        try:
+            with TimingRecorder().span(job.name, TF_MODULE_CATEGORY):
+                args = []
+                if job.variables and job.command != "output":
+                    var_file = os.path.join(job_dir, "job.tfvars.json")
+                    with open(var_file, "w") as outfile:
+                        json.dump(job.variables, outfile)
+                    args.append(f"-var-file={var_file}")
+
+                tf_wrapper = TfWrapper(job.working_dir, env=env, name=job.name, profile=job.profile)
+                tf_wrapper.init()
+                command = getattr(tf_wrapper, job.command)
+                result = command() if job.command == "output" else command(None, *args)
+            return TerraformJobResult(job.name, TerraformJobResult.SUCCEEDED, time.perf_counter() - start, result)
+        except Exception as e:
+            logger.error(f"Terraform job {job.name} failed: {e}")
+            return TerraformJobResult(job.name, TerraformJobResult.FAILED, time.perf_counter() - start, error=e)
+        finally:
+            shutil.rmtree(job_dir, ignore_errors=True)
+
+    def _check_cycles(self) -> None:
+        placed = set()
+        remaining = list(self._jobs)
+        while remaining:
+            ready = [name for name in remaining if placed.issuperset(self._jobs[name].depends_on)]
+            if not ready:
+                raise StageGraphError(f"Dependency cycle between Terraform jobs: {', '.join(remaining)}")
+            placed.update(ready)
+            remaining = [name for name in remaining if name not in placed]
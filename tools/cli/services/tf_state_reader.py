@@ -0,0 +1,249 @@
+"""Reader of Terraform outputs straight from the remote state backend, without a Terraform binary."""
+import codecs
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from common.logging_config import logger
+
+TF_BACKEND_BLOCK_RE = re.compile(r'backend\s+"(?P<type>[a-z0-9_]+)"\s*\{(?P<body>[^}]*)}')
+TF_BACKEND_ATTRIBUTE_RE = re.compile(r'^\s*(?P<name>[a-z0-9_]+)\s*=\s*"(?P<value>[^"]*)"', re.MULTILINE)
+# top level keys of the state needed to read and cache outputs, Terraform writes them before resources
+TF_STATE_OUTPUT_KEYS = ("lineage", "serial", "outputs")
+# top level keys identifying a state version, Terraform writes them before outputs
+TF_STATE_VERSION_KEYS = ("lineage", "serial")
+# top level key of the state listing its resources, empty once everything was destroyed
+TF_STATE_RESOURCES_KEY = "resources"
+TF_STATE_CHUNK_SIZE = 64 * 1024
+# state object name of the default workspace in a gcs backend prefix
+TF_GCS_DEFAULT_STATE = "default.tfstate"
+
+
+class TerraformStateReadError(Exception):
+    pass
+
+
+@dataclass
+class TerraformBackend:
+    """
+    Remote state backend of a Terraform module, as generated by create_iac_backend_snippet.
+
+    :param type: Backend type, s3, gcs or azurerm
+    :param config: String attributes of the backend block
+    """
+    type: str
+    config: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def parse(cls, text: str) -> Optional["TerraformBackend"]:
+        """
+        :param text: Backend fragment, or a Terraform file containing it
+        :return: Backend, or None when the text has no backend block
+        """
+        match = TF_BACKEND_BLOCK_RE.search(text)
+        if not match:
+            return None
+        config = {m.group("name"): m.group("value") for m in TF_BACKEND_ATTRIBUTE_RE.finditer(match.group("body"))}
+        return cls(match.group("type"), config)
+
+    @classmethod
+    def from_module(cls, working_dir: Union[str, Path]) -> Optional["TerraformBackend"]:
+        """
+        :param working_dir: Terraform module folder with rendered backend fragment
+        :return: Backend, or None when the module uses local state
+        """
+        for tf_file in sorted(Path(working_dir).glob("*.tf")):
+            with open(tf_file, "r") as file:
+                backend = cls.parse(file.read())
+            if backend:
+                return backend
+        return None
+
+    @property
+    def object_name(self) -> str:
+        """State object of the default workspace"""
+        if self.type == "gcs":
+            return f'{self.config["prefix"].rstrip("/")}/{TF_GCS_DEFAULT_STATE}'
+        return self.config["key"]
+
+
+def read_state_outputs(chunks: Iterable[bytes]) -> Dict[str, Any]:
+    """
+    Parse a state document incrementally and stop as soon as the outputs are read, so that resources,
+    which make up most of the state, are neither downloaded in full nor decoded.
+
+    :param chunks: State document chunks
+    :return: State with lineage, serial and outputs only
+    """
+    return read_state_keys(chunks, TF_STATE_OUTPUT_KEYS)
+
+
+def read_state_keys(chunks: Iterable[bytes], keys: Tuple[str, ...]) -> Dict[str, Any]:
+    """
+    :param chunks: State document chunks
+    :param keys: Top level keys to read, parsing stops as soon as all of them are read
+    :return: State with the keys only
+    """
+    state = {}
+    for key, value in _iter_object_items(chunks):
+        if key in keys:
+            state[key] = value
+            if len(state) == len(keys):
+                break
+    return state
+
+
+def _iter_object_items(chunks: Iterable[bytes]) -> Iterator[Tuple[str, Any]]:
+    """
+    Yield key and value pairs of a top level JSON object, reading only as many chunks as the next value needs.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buffer, pos, eof
+        if eof:
+            return False
+        chunk = next(chunks, None)
+        if chunk is None:
+            eof = True
+            buffer = buffer[pos:] + utf8.decode(b"", final=True)
+        else:
+            buffer = buffer[pos:] + utf8.decode(chunk)
+        pos = 0
+        return True
+
+    def skip(expected: str = None) -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer):
+                char = buffer[pos]
+                if expected and char not in expected:
+                    raise TerraformStateReadError(f"Unexpected '{char}' in state, expected one of '{expected}'")
+                pos += 1
+                return char
+            if not fill():
+                raise TerraformStateReadError("Unexpected end of state")
+
+    def decode() -> Any:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+                # a number at the end of the buffer could continue in the next chunk
+                if end < len(buffer) or eof:
+                    pos = end
+                    return value
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            fill()
+
+    skip("{")
+    while True:
+        if skip('"}') == "}":
+            return
+        pos -= 1
+        key = decode()
+        skip(":")
+        yield key, decode()
+        if skip(",}") == "}":
+            return
+
+
+class TerraformRemoteStateReader:
+    """
+    Downloads Terraform state objects with the cloud SDKs. Each SDK is imported on use, so that reading
+    an S3 backend does not load the Google and Azure SDKs.
+    """
+
+    backends = ("s3", "gcs", "azurerm")
+
+    def __init__(self, env: Optional[Dict[str, str]] = None, chunk_size: int = TF_STATE_CHUNK_SIZE):
+        """
+        :param env: Cloud provider credentials, e.g. AWS_PROFILE, on top of the current process environment
+        :param chunk_size: Download chunk size, in bytes
+        """
+        self.env = {**os.environ, **{k: v for k, v in (env or {}).items() if v}}
+        self.chunk_size = chunk_size
+
+    def outputs(self, backend: TerraformBackend) -> Dict[str, Any]:
+        """
+        :param backend: Module backend
+        :return: State with lineage, serial and outputs only
+        """
+        if backend.type not in self.backends:
+            raise TerraformStateReadError(f"Backend \"{backend.type}\" is not supported")
+        logger.info(f"Reading Terraform outputs from {backend.type} state {backend.object_name}")
+        return read_state_outputs(getattr(self, f"_{backend.type}_chunks")(backend))
+
+    def version(self, backend: TerraformBackend) -> Tuple[Optional[str], Optional[int]]:
+        """
+        Read the state header only, which is the first chunk of the state object in practice.
+
+        :param backend: Module backend
+        :return: State lineage and serial
+        """
+        if backend.type not in self.backends:
+            raise TerraformStateReadError(f"Backend \"{backend.type}\" is not supported")
+        state = read_state_keys(getattr(self, f"_{backend.type}_chunks")(backend), TF_STATE_VERSION_KEYS)
+        return state.get("lineage"), state.get("serial")
+
+    def resources(self, backend: TerraformBackend) -> Optional[list]:
+        """
+        :param backend: Module backend
+        :return: Resources of the state, None when the state has no resources key
+        """
+        if backend.type not in self.backends:
+            raise TerraformStateReadError(f"Backend \"{backend.type}\" is not supported")
+        state = read_state_keys(getattr(self, f"_{backend.type}_chunks")(backend), (TF_STATE_RESOURCES_KEY,))
+        return state.get(TF_STATE_RESOURCES_KEY)
+
+    def _s3_chunks(self, backend: TerraformBackend) -> Iterator[bytes]:
+        import boto3
+
+        session = boto3.Session(
+            aws_access_key_id=self.env.get("AWS_ACCESS_KEY_ID"),
+            aws_secret_access_key=self.env.get("AWS_SECRET_ACCESS_KEY"),
+            aws_session_token=self.env.get("AWS_SESSION_TOKEN"),
+            profile_name=None if "AWS_ACCESS_KEY_ID" in self.env else self.env.get("AWS_PROFILE"),
+            region_name=backend.config.get("region") or self.env.get("AWS_REGION"),
+        )
+        body = session.client("s3").get_object(Bucket=backend.config["bucket"], Key=backend.object_name)["Body"]
+        try:
+            yield from body.iter_chunks(self.chunk_size)
+        finally:
+            body.close()
+
+    def _gcs_chunks(self, backend: TerraformBackend) -> Iterator[bytes]:
+        from google.auth import default
+        from google.cloud import storage
+
+        credentials, project = default()
+        client = storage.Client(project=project, credentials=credentials)
+        blob = client.bucket(backend.config["bucket"]).blob(backend.object_name)
+        with blob.open("rb", chunk_size=max(self.chunk_size, 256 * 1024)) as stream:
+            yield from iter(lambda: stream.read(self.chunk_size), b"")
+
+    def _azurerm_chunks(self, backend: TerraformBackend) -> Iterator[bytes]:
+        from azure.identity import AzureCliCredential
+        from azure.storage.blob import BlobClient
+
+        blob = BlobClient(
+            account_url=f'https://{backend.config["storage_account_name"]}.blob.core.windows.net',
+            container_name=backend.config["container_name"],
+            blob_name=backend.object_name,
+            credential=AzureCliCredential(),
+        )
+        yield from blob.download_blob(max_concurrency=1).chunks()
@@ -1,29 +1,426 @@
+import hashlib
 import json
+import logging
 import os
+import platform
+import re
+import shutil
 import subprocess
 import tempfile
-from typing import Tuple, Dict, Any, Optional, List, Generator
-
-from alive_progress import alive_bar
-
-from common.const.common_path import LOCAL_TF_TOOL
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Tuple, Dict, Any, Optional, List, Generator, Iterable, Deque, Callable
+
+from common.const.common_path import LOCAL_TF_TOOL, LOCAL_TF_PLUGIN_CACHE_FOLDER, LOCAL_TF_PROVIDER_MIRROR_FOLDER, \
+    LOCAL_TF_LOGS_FOLDER, LOCAL_TF_OUTPUT_CACHE_FILE
+from common.const.const import TF_FORCE_INIT, TF_PLAN_BEFORE_APPLY, TF_OUTPUT_BUFFER_LINES, TF_LOG_MAX_BYTES, \
+    TF_LOG_BACKUP_COUNT, TF_OUTPUT_CACHE_TTL, TF_REMOTE_STATE_READ, TF_PARALLELISM, TF_IAM_HEAVY_PARALLELISM, \
+    TF_DESTROY_PARALLELISM, TF_REFRESH_SKIP_WINDOW
 from common.logging_config import logger
+from common.timing_recorder import TimingRecorder
+from common.utils.progress import exclusive_progress_bar
+from common.versions import TF_MIRROR_PROVIDERS
+from services.tf_state_reader import TerraformBackend, TerraformRemoteStateReader, read_state_keys, \
+    TF_STATE_CHUNK_SIZE, TF_STATE_VERSION_KEYS
+
+
+# marker of the last successful init, kept in the module data folder, .terraform by default
+TF_INIT_FINGERPRINT_FILE = "cgdevx_init.json"
+# marker of the last successful apply, kept in the module data folder
+TF_APPLY_MARKER_FILE = "cgdevx_apply.json"
+# Terraform default of concurrent resource operations
+TF_DEFAULT_PARALLELISM = 10
+# environment variables changing how init installs providers
+TF_INIT_ENV_VARS = ("TF_CLI_CONFIG_FILE", "TF_PLUGIN_CACHE_DIR", "TF_PLUGIN_CACHE_MAY_BREAK_DEPENDENCY_LOCK_FILE")
+# timing category of resource operations reported by Terraform
+TF_RESOURCE_CATEGORY = "tf_resource"
+TF_LOCAL_MODULE_SOURCE_RE = re.compile(r'^\s*source\s*=\s*"(\.\.?/[^"]*)"', re.MULTILINE)
 
 
 class TerraformExecutionError(Exception):
-    def __init__(self, return_code: int, stdout: str, stderr: str):
-        super().__init__(f"Terraform command failed with return code {return_code} and error: \"{stderr}\"")
+    def __init__(self, return_code: int, stdout: str, stderr: str, log_file: Optional[Path] = None):
+        message = f"Terraform command failed with return code {return_code} and error: \"{stderr}\""
+        if log_file:
+            message += f", full output is in {log_file}"
+        super().__init__(message)
         self.return_code = return_code
         self.stdout = stdout
         self.stderr = stderr
+        self.log_file = log_file
+
+
+@dataclass
+class TerraformEvent:
+    """
+    Event of the Terraform machine-readable UI, produced by plan, apply and destroy run with -json.
+
+    :param kind: One of the event kinds below, or the raw event type for other events
+    :param message: Human-readable message
+    :param address: Resource address of resource events
+    :param action: Resource action, e.g. create, update, delete
+    :param elapsed: Seconds the resource operation took, for complete and error events
+    :param severity: Severity of diagnostic events
+    :param operation: Operation of summary events, plan, apply or destroy
+    :param changes: Counts of summary events: add, change, remove
+    """
+    START = "start"
+    COMPLETE = "complete"
+    ERROR = "error"
+    SUMMARY = "summary"
+    DIAGNOSTIC = "diagnostic"
+    _KINDS = {
+        "apply_start": START,
+        "apply_complete": COMPLETE,
+        "apply_errored": ERROR,
+        "change_summary": SUMMARY,
+        "diagnostic": DIAGNOSTIC,
+    }
+
+    kind: str
+    message: str = ""
+    address: str = ""
+    action: str = ""
+    elapsed: float = 0.0
+    severity: str = ""
+    operation: str = ""
+    changes: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        return sum(self.changes.get(key, 0) for key in ("add", "change", "remove"))
+
+    @classmethod
+    def parse(cls, line: str) -> Optional["TerraformEvent"]:
+        """
+        :param line: A single line of Terraform -json output
+        :return: Event, or None when the line is not a JSON event
+        """
+        line = line.strip()
+        if not line.startswith("{"):
+            return None
+        try:
+            data = json.loads(line)
+        except ValueError:
+            return None
+        if not isinstance(data, dict) or "type" not in data:
+            return None
+
+        hook = data.get("hook") or {}
+        diagnostic = data.get("diagnostic") or {}
+        changes = data.get("changes") or {}
+        message = data.get("@message", "")
+        if diagnostic:
+            message = ": ".join(filter(None, [diagnostic.get("summary"), diagnostic.get("detail")])) or message
+        return cls(
+            kind=cls._KINDS.get(data["type"], data["type"]),
+            message=message,
+            address=(hook.get("resource") or {}).get("addr", ""),
+            action=hook.get("action", ""),
+            elapsed=float(hook.get("elapsed_seconds", 0) or 0),
+            severity=diagnostic.get("severity", ""),
+            operation=changes.get("operation", ""),
+            changes={k: v for k, v in changes.items() if isinstance(v, int)},
+        )
+
+
+@dataclass
+class TerraformExecutionProfile:
+    """
+    Settings of plan, apply and destroy runs of a module, chosen by the command running the module.
+
+    :param name: Profile name, shown in the timing report
+    :param parallelism: Concurrent resource operations, Terraform default when None
+    :param refresh: Refresh mode, one of the modes below
+    :param targets: Resource addresses to limit runs to
+    """
+    # always refresh the state, Terraform default
+    REFRESH_FULL = "full"
+    # never refresh the state
+    REFRESH_SKIP = "skip"
+    # skip refresh when the module was applied successfully within the refresh skip window, e.g. on a re-run
+    # of setup right after a failure in a later stage, as nothing but the CLI is expected to change it meanwhile
+    REFRESH_AUTO = "auto"
+
+    name: str = "default"
+    parallelism: Optional[int] = None
+    refresh: str = REFRESH_FULL
+    targets: List[str] = field(default_factory=list)
+
+
+TF_PROFILE_DEFAULT = TerraformExecutionProfile()
+# modules applied by setup, re-applied on every setup re-run
+TF_PROFILE_SETUP = TerraformExecutionProfile("setup", refresh=TerraformExecutionProfile.REFRESH_AUTO)
+# modules creating many IAM roles and policies, which are slow to create and do not depend on each other
+TF_PROFILE_IAM_HEAVY = TerraformExecutionProfile("iam_heavy", parallelism=TF_IAM_HEAVY_PARALLELISM,
+                                                 refresh=TerraformExecutionProfile.REFRESH_AUTO)
+TF_PROFILE_DESTROY = TerraformExecutionProfile("destroy", parallelism=TF_DESTROY_PARALLELISM)
+
+
+@dataclass
+class TerraformPlanSummary:
+    has_changes: bool = False
+    add: int = 0
+    change: int = 0
+    destroy: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.add + self.change + self.destroy
+
+
+class TerraformOutputCache:
+    """
+    Outputs of Terraform modules with the lineage and serial of the state they were read from, persisted next to
+    the CLI state file. An entry is valid only while the current state has the same lineage and serial, as the state
+    could be changed outside the CLI, e.g. by Atlantis. An entry is also marked stale before TfWrapper runs a command
+    that could change the state, and expires after a TTL.
+    """
+    _lock = threading.Lock()
+
+    def __init__(self, path: Path = LOCAL_TF_OUTPUT_CACHE_FILE, ttl: int = TF_OUTPUT_CACHE_TTL):
+        """
+        :param path: Cache file
+        :param ttl: Time in seconds cached outputs are valid for, 0 disables the cache
+        """
+        self.path = Path(path)
+        self.ttl = ttl
+
+    @staticmethod
+    def key(working_dir: str) -> str:
+        return str(Path(working_dir).resolve())
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r") as infile:
+                return json.load(infile)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable Terraform output cache {self.path}: {e}")
+            return {}
+
+    def _save(self, entries: Dict[str, Any]) -> None:
+        os.makedirs(self.path.parent, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        # outputs hold secrets, keep the file private
+        with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as outfile:
+            json.dump(entries, outfile)
+        os.replace(tmp_path, self.path)
+
+    def get(self, working_dir: str,
+                state_version: Callable[[], Optional[Tuple[Optional[str], Optional[int]]]]) -> Optional[Dict[str, Any]]:
+        """
+        :param working_dir: Terraform module folder
+        :param state_version: Reads lineage and serial of the current module state, None when they could not be read.
+                              Called only when there is a fresh entry
+        :return: Cached outputs, or None when there are none, they were read from another state version, or the
+                 current state version is unknown
+        """
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._load().get(self.key(working_dir))
+        if not entry or entry.get("stale") or time.time() - entry.get("cached_at", 0) > self.ttl:
+            return None
+        version = state_version()
+        if version is None or version != (entry.get("lineage"), entry.get("serial")):
+            logger.debug(f"Cached Terraform outputs of {working_dir} are from another state version, ignoring")
+            return None
+        return entry["outputs"]
+
+    def put(self, working_dir: str, lineage: Optional[str], serial: Optional[int], outputs: Dict[str, Any]) -> None:
+        """
+        :param working_dir: Terraform module folder
+        :param lineage: State lineage
+        :param serial: State serial
+        :param outputs: Output values
+        """
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            entries = self._load()
+            entries[self.key(working_dir)] = {
+                "lineage": lineage,
+                "serial": serial,
+                "cached_at": time.time(),
+                "outputs": outputs,
+            }
+            self._save(entries)
+
+    def invalidate(self, working_dir: Optional[str]) -> None:
+        """
+        Mark cached outputs of a module stale
+        :param working_dir: Terraform module folder
+        """
+        if not working_dir or not self.path.exists():
+            return
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(self.key(working_dir))
+            if entry and not entry.get("stale"):
+                entry["stale"] = True
+                self._save(entries)
+
+
+class TerraformProviderMirror:
+    """
+    Local filesystem mirror of Terraform providers, one per provider version set and platform.
+    The mirror is used by Terraform through a generated CLI configuration, only for the providers it contains,
+    other providers are installed from their registries.
+    """
+    CLI_CONFIG_FILE = "terraform.rc"
+    MARKER_FILE = "mirror.json"
+
+    def __init__(self, exclude: Optional[List[str]] = None, root: Path = LOCAL_TF_PROVIDER_MIRROR_FOLDER):
+        """
+        :param exclude: Provider sources not to download, e.g. providers of unused clouds
+        :param root: Folder of mirrors
+        """
+        exclude = {source.lower() for source in exclude or []}
+        self.providers = {source: version for source, version in sorted(TF_MIRROR_PROVIDERS.items())
+                          if source.lower() not in exclude}
+        self.platform = self.current_platform()
+        # the mirror folder is keyed by the whole version set, so that it is found regardless of exclusions
+        digest = hashlib.sha256(json.dumps([self.platform, sorted(TF_MIRROR_PROVIDERS.items())]).encode())
+        self.path = Path(root) / digest.hexdigest()[:16]
+
+    @staticmethod
+    def current_platform() -> str:
+        machine = platform.machine().lower()
+        arch = {"x86_64": "amd64", "aarch64": "arm64"}.get(machine, machine)
+        return f"{platform.system().lower()}_{arch}"
+
+    @property
+    def config_file(self) -> Path:
+        return self.path / self.CLI_CONFIG_FILE
+
+    def is_ready(self) -> bool:
+        return (self.path / self.MARKER_FILE).exists()
+
+    def populate(self, terraform_bin_path: str) -> Path:
+        """
+        Download the providers with `terraform providers mirror` and generate the CLI configuration using them.
+
+        :param terraform_bin_path: Terraform binary.
+        :return: Mirror folder.
+        """
+        os.makedirs(self.path.parent, exist_ok=True)
+        tmp_path = Path(tempfile.mkdtemp(prefix=f"{self.path.name}.", dir=self.path.parent))
+        try:
+            config_dir = tmp_path / "config"
+            os.makedirs(config_dir)
+            with open(config_dir / "versions.tf", "w") as outfile:
+                outfile.write(self._required_providers())
+            mirror_dir = tmp_path / "mirror"
+            result = subprocess.run([str(terraform_bin_path), "providers", "mirror", str(mirror_dir)],
+                                    cwd=config_dir, capture_output=True, text=True)
+            if result.returncode != 0:
+                raise TerraformExecutionError(result.returncode, result.stdout, result.stderr)
+
+            shutil.rmtree(self.path, ignore_errors=True)
+            os.replace(mirror_dir, self.path)
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+        # mirror layout is <hostname>/<namespace>/<type>/...
+        addresses = sorted(
+            "/".join(p.relative_to(self.path).parts) for p in self.path.glob("*/*/*") if p.is_dir()
+        )
+        with open(self.config_file, "w") as outfile:
+            outfile.write(self._cli_config(addresses))
+        with open(self.path / self.MARKER_FILE, "w") as outfile:
+            json.dump({"platform": self.platform, "providers": self.providers, "addresses": addresses}, outfile,
+                      indent=1)
+        return self.path
+
+    def _required_providers(self) -> str:
+        lines = ["terraform {", "  required_providers {"]
+        for source, version in self.providers.items():
+            name = source.split("/")[-1].lower()
+            constraint = f', version = "{version}"' if version else ""
+            lines.append(f'    {name} = {{ source = "{source}"{constraint} }}')
+        lines += ["  }", "}", ""]
+        return "\n".join(lines)
+
+    def _cli_config(self, addresses: List[str]) -> str:
+        providers = json.dumps(addresses)
+        return (
+            "provider_installation {\n"
+            "  filesystem_mirror {\n"
+            f"    path    = {json.dumps(str(self.path))}\n"
+            f"    include = {providers}\n"
+            "  }\n"
+            "  direct {\n"
+            f"    exclude = {providers}\n"
+            "  }\n"
+            "}\n"
+        )
 
 
 class TfWrapper:
-    def __init__(self, working_dir: str = None):
+    # the plugin cache is not safe for concurrent installs, so that inits of different modules are serialized
+    _init_lock = threading.Lock()
+
+    def __init__(self, working_dir: str = None, env: Optional[Dict[str, str]] = None, name: Optional[str] = None,
+                 profile: TerraformExecutionProfile = TF_PROFILE_DEFAULT):
+        """
+        :param working_dir: Terraform module folder.
+        :param env: Environment variables passed to Terraform on top of the current process environment.
+                    Used instead of mutating os.environ, so that modules could be applied concurrently.
+                    TF_DATA_DIR moves the module data folder, relative to the module folder.
+        :param name: Name of the module log file and resource timings, the module folder name by default.
+        :param profile: Parallelism, refresh mode and targets of plan, apply and destroy runs.
+        """
+        self.profile = profile
         self.terraform_bin_path = LOCAL_TF_TOOL if os.path.exists(LOCAL_TF_TOOL) else 'terraform'
         self.working_dir = working_dir
-        self.tf_command_manager = TerraformCommandManager(self.terraform_bin_path, self.working_dir)
-        self.tf_progress_manager = TerraformProgressBar()
+        self.env = env or {}
+        self.name = name or (os.path.basename(str(working_dir)) if working_dir else "")
+        self.data_dir = Path(working_dir, self.env.get("TF_DATA_DIR") or ".terraform") if working_dir else None
+        self.tf_command_manager = TerraformCommandManager(
+            self.terraform_bin_path, self.working_dir, {**self._provider_env(), **(env or {})}, self.name
+        )
+        self.tf_progress_manager = TerraformProgressBar(self.name)
+        self.last_plan: Optional[TerraformPlanSummary] = None
+
+    @staticmethod
+    def _provider_env() -> Dict[str, str]:
+        """
+        Point Terraform to the shared plugin cache and to the provider mirror when it is populated.
+        Settings of the user environment take precedence.
+
+        :return: Environment variables.
+        """
+        env = {}
+        if "TF_PLUGIN_CACHE_DIR" not in os.environ:
+            os.makedirs(LOCAL_TF_PLUGIN_CACHE_FOLDER, exist_ok=True)
+            env["TF_PLUGIN_CACHE_DIR"] = str(LOCAL_TF_PLUGIN_CACHE_FOLDER)
+            # modules are initialized without a lock file, use the cache for them nevertheless
+            env["TF_PLUGIN_CACHE_MAY_BREAK_DEPENDENCY_LOCK_FILE"] = "true"
+        mirror = TerraformProviderMirror()
+        if mirror.is_ready() and "TF_CLI_CONFIG_FILE" not in os.environ:
+            env["TF_CLI_CONFIG_FILE"] = str(mirror.config_file)
+        return env
+
+    def mirror_providers(self, force: bool = False, exclude: Optional[List[str]] = None) -> Path:
+        """
+        Pre-populate the provider mirror for the provider version set from versions.yaml.
+
+        :param force: Download providers even if the mirror is populated already.
+        :param exclude: Provider sources to skip, e.g. providers of unused clouds.
+        :return: Mirror folder.
+        """
+        mirror = TerraformProviderMirror(exclude)
+        if mirror.is_ready() and not force:
+            logger.info(f"Terraform provider mirror {mirror.path} is up to date.")
+            return mirror.path
+        logger.info(f"Populating Terraform provider mirror {mirror.path}")
+        with TimingRecorder().span("terraform providers mirror", "terraform"):
+            return mirror.populate(self.terraform_bin_path)
 
     def version(self, *args, **kwargs) -> Dict[str, Any]:
         """
@@ -37,50 +434,337 @@ class TfWrapper:
             'version', None, '-json', *args, **kwargs
         )
         logger.info(f"Executing Terraform version with command: {command}")
-        return_code, stdout, stderr = self.run_terraform_command(command)
+        return_code, stdout, stderr = self.run_terraform_command(command, max_lines=None, log_output=False)
         if return_code != 0:
-            raise TerraformExecutionError(return_code, stdout, stderr)
+            raise self._execution_error(return_code, stdout, stderr)
         return json.loads(stdout)
 
-    def init(self, variables: Optional[Dict[str, Any]] = None, *args, **kwargs) -> bool:
+    def init(self, variables: Optional[Dict[str, Any]] = None, *args, force: bool = TF_FORCE_INIT, **kwargs) -> bool:
         """
-        Executes the Terraform init command.
+        Executes the Terraform init command. Init is skipped when the module was initialized already with the same
+        backend and module configuration, lock file, provider settings and arguments.
 
         :param variables: A dictionary of variables to be passed to the command.
         :param args: Additional positional arguments for the command.
+        :param force: Run init even if the module is initialized already.
         :param kwargs: Additional named arguments for the command.
         :return: True if the command was successful, otherwise raises an exception.
         """
+        fingerprint = self._init_fingerprint(variables, args, kwargs)
+        if not force and fingerprint is not None and fingerprint == self._read_init_fingerprint():
+            logger.info(f"Terraform module {self.working_dir} is initialized already, skipping init.")
+            return True
+
         command = self.tf_command_manager.prepare_terraform_command(
             'init', variables, '-reconfigure', *args, **kwargs, input=False
         )
         logger.info(f"Executing Terraform init with command: {command}")
-        return_code, stdout, stderr = self.run_terraform_command(command)
+        # a changed backend configuration could point the module to another state
+        TerraformOutputCache().invalidate(self.working_dir)
+        with self._init_lock:
+            return_code, stdout, stderr = self.run_terraform_command(command)
         if return_code != 0:
-            raise TerraformExecutionError(return_code, stdout, stderr)
+            raise self._execution_error(return_code, stdout, stderr)
+        # init creates or updates the lock file, so that the fingerprint is taken afterwards
+        self._write_init_fingerprint(self._init_fingerprint(variables, args, kwargs))
         return True
 
-    def apply(self, variables: Optional[Dict[str, Any]] = None, *args, **kwargs) -> bool:
+    def _init_marker(self) -> Optional[Path]:
+        return self.data_dir / TF_INIT_FINGERPRINT_FILE if self.data_dir else None
+
+    def _read_init_fingerprint(self) -> Optional[str]:
+        marker = self._init_marker()
+        # backend state and installed providers are created by init and are required by other commands
+        if marker is None or not (marker.parent / "terraform.tfstate").exists():
+            return None
+        if (Path(self.working_dir) / ".terraform.lock.hcl").exists() and not (marker.parent / "providers").exists():
+            return None
+        try:
+            with open(marker, "r") as infile:
+                return json.load(infile).get("fingerprint")
+        except (OSError, ValueError):
+            return None
+
+    def _write_init_fingerprint(self, fingerprint: Optional[str]) -> None:
+        marker = self._init_marker()
+        if marker is None or fingerprint is None or not marker.parent.exists():
+            return
+        with open(marker, "w") as outfile:
+            json.dump({"fingerprint": fingerprint}, outfile)
+
+    def _init_fingerprint(self, variables: Optional[Dict[str, Any]], args: tuple, kwargs: dict) -> Optional[str]:
+        """
+        Digest of everything init depends on: Terraform binary, init arguments, provider installation settings,
+        lock file, and configuration files of the module and of the local modules it calls, backend configuration
+        and remote module versions included.
+
+        :return: Fingerprint, or None when the module folder is not known.
+        """
+        if not self.working_dir:
+            return None
+        digest = hashlib.sha256()
+        try:
+            binary = os.stat(shutil.which(str(self.terraform_bin_path)) or self.terraform_bin_path)
+            digest.update(f"{binary.st_size}:{binary.st_mtime_ns}".encode())
+        except (OSError, TypeError):
+            digest.update(str(self.terraform_bin_path).encode())
+        env = self.tf_command_manager.env or {}
+        digest.update(json.dumps({
+            "variables": variables,
+            "args": [str(arg) for arg in args],
+            "kwargs": sorted((k, str(v)) for k, v in kwargs.items()),
+            "env": sorted((k, str(env.get(k) or os.environ.get(k, ""))) for k in TF_INIT_ENV_VARS),
+        }, sort_keys=True, default=str).encode())
+
+        root = Path(self.working_dir).resolve()
+        lock_file = root / ".terraform.lock.hcl"
+        if lock_file.exists():
+            digest.update(lock_file.read_bytes())
+
+        folders = [root]
+        seen = set()
+        while folders:
+            folder = folders.pop()
+            if folder in seen or not folder.is_dir():
+                continue
+            seen.add(folder)
+            for file_path in sorted(folder.iterdir()):
+                if not file_path.name.endswith((".tf", ".tf.json")) or not file_path.is_file():
+                    continue
+                data = file_path.read_bytes()
+                digest.update(os.path.relpath(file_path, root).encode())
+                digest.update(hashlib.sha256(data).digest())
+                for source in TF_LOCAL_MODULE_SOURCE_RE.findall(data.decode(errors="ignore")):
+                    folders.append((folder / source).resolve())
+        return digest.hexdigest()
+
+    def apply(self, variables: Optional[Dict[str, Any]] = None, *args, plan_first: bool = TF_PLAN_BEFORE_APPLY,
+              **kwargs) -> bool:
         """
         Executes the Terraform apply command with optional variables.
+        When plan_first is set, the changes are planned first and apply is skipped if there are none, otherwise
+        the saved plan is applied, so that Terraform does not plan twice. Counts of planned changes are available
+        in last_plan afterwards.
 
         :param variables: A dictionary of variables to be passed to the command.
-        :param args: Additional positional arguments for the command.
-        :param kwargs: Additional named arguments for the command.
+        :param args: Additional positional arguments for the command, passed to plan when plan_first is set.
+        :param plan_first: Plan before applying and skip apply when there is nothing to change.
+        :param kwargs: Additional named arguments for the command, passed to plan when plan_first is set.
         :return: True if the command was successful, otherwise raises an exception.
         """
-        command = self.tf_command_manager.prepare_terraform_command(
-            'apply', variables, '-auto-approve', *args, **kwargs, input=False
-        )
+        profile_args, details = self._profile_args()
+        if not plan_first:
+            command = self.tf_command_manager.prepare_terraform_command(
+                'apply', variables, '-auto-approve', '-json', *profile_args, *args, **kwargs, input=False
+            )
+            self.last_plan = None
+            return self._apply(command, details=details)
+
+        # the plan file holds variable values, secrets included, so that it is removed right after apply
+        plan_dir = tempfile.mkdtemp(prefix="tfplan")
+        try:
+            plan_file = os.path.join(plan_dir, "tfplan")
+            self.last_plan = self.plan(variables, *args, out=plan_file, **kwargs)
+            if not self.last_plan.has_changes:
+                logger.info(f"Terraform module {self.working_dir} has no changes, skipping apply.")
+                # a plan without refresh did not check the real infrastructure, so that it must not extend
+                # the refresh skip window
+                if details["refresh"] == "full":
+                    self._write_apply_marker()
+                return True
+            # options of a saved plan apply must precede the plan file, refresh and targets are set by the plan
+            command = self.tf_command_manager.prepare_terraform_command(
+                'apply', None, '-input=false', '-json', *self._profile_args(saved_plan=True)[0], plan_file
+            )
+            return self._apply(command, self.last_plan.total, details)
+        finally:
+            shutil.rmtree(plan_dir, ignore_errors=True)
+
+    def _apply(self, command: List[str], total_operations: int = 0, details: Optional[Dict[str, Any]] = None) -> bool:
         logger.info(f"Executing Terraform apply with command: {command}")
-        return_code, stdout, stderr = self.run_terraform_command(command, track_progress=True)
+        # state changes even if apply fails midway
+        TerraformOutputCache().invalidate(self.working_dir)
+        return_code, stdout, stderr = self.run_terraform_command(command, track_progress=True,
+                                                                 total_operations=total_operations, details=details)
         if return_code != 0:
             logger.error(f"Terraform apply failed with return code {return_code}: {stderr}")
-            raise TerraformExecutionError(return_code, stdout, stderr)
+            raise self._execution_error(return_code, stdout, stderr)
+        self._write_apply_marker()
         logger.info("Terraform apply executed successfully.")
         return True
 
-    def output(self, *args, **kwargs) -> Dict[str, Any]:
+    def _profile_args(self, saved_plan: bool = False) -> Tuple[List[str], Dict[str, Any]]:
+        """
+        Command options of the execution profile.
+
+        :param saved_plan: Options of a saved plan apply, which takes parallelism only.
+        :return: Options, and the profile settings recorded in the timing report.
+        """
+        profile = self.profile
+        parallelism = TF_PARALLELISM or profile.parallelism
+        args = [f"-parallelism={parallelism}"] if parallelism else []
+        details = {"profile": profile.name, "parallelism": parallelism or TF_DEFAULT_PARALLELISM}
+        if saved_plan:
+            return args, details
+
+        applied = self._last_applied() if profile.refresh == profile.REFRESH_AUTO else None
+        skip_refresh = profile.refresh == profile.REFRESH_SKIP or \
+            (applied is not None and time.time() - applied < TF_REFRESH_SKIP_WINDOW)
+        details["refresh"] = "skipped" if skip_refresh else "full"
+        if skip_refresh:
+            args.append("-refresh=false")
+            if applied is not None:
+                details["applied"] = f"{int(time.time() - applied)}s ago"
+
+        args.extend(f"-target={target}" for target in profile.targets)
+        if profile.targets:
+            details["targets"] = len(profile.targets)
+        return args, details
+
+    def _apply_marker(self) -> Optional[Path]:
+        return self.data_dir / TF_APPLY_MARKER_FILE if self.data_dir else None
+
+    def _last_applied(self) -> Optional[float]:
+        """
+        :return: Time of the last successful apply of the module through TfWrapper, None if unknown.
+        """
+        marker = self._apply_marker()
+        if marker is None:
+            return None
+        try:
+            with open(marker, "r") as infile:
+                return float(json.load(infile)["applied"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write_apply_marker(self) -> None:
+        marker = self._apply_marker()
+        if marker is None or not marker.parent.exists():
+            return
+        with open(marker, "w") as outfile:
+            json.dump({"applied": time.time()}, outfile)
+
+    def plan(self, variables: Optional[Dict[str, Any]] = None, *args, **kwargs) -> "TerraformPlanSummary":
+        """
+        Executes the Terraform plan command with a detailed exit code.
+
+        :param variables: A dictionary of variables to be passed to the command.
+        :param args: Additional positional arguments for the command.
+        :param kwargs: Additional named arguments for the command, e.g. out to save the plan.
+        :return: Summary of planned changes.
+        """
+        profile_args, details = self._profile_args()
+        command = self.tf_command_manager.prepare_terraform_command(
+            'plan', variables, '-detailed-exitcode', '-json', *profile_args, *args, **kwargs, input=False
+        )
+        logger.info(f"Executing Terraform plan with command: {command}")
+        return_code, stdout, stderr = self.run_terraform_command(command, details=details)
+        # 0 - no changes, 2 - changes present
+        if return_code not in (0, 2):
+            raise self._execution_error(return_code, stdout, stderr)
+
+        summary = TerraformPlanSummary(has_changes=return_code == 2)
+        for line in stdout.splitlines():
+            event = TerraformEvent.parse(line)
+            if event is not None and event.kind == TerraformEvent.SUMMARY:
+                summary.add = event.changes.get("add", 0)
+                summary.change = event.changes.get("change", 0)
+                summary.destroy = event.changes.get("remove", 0)
+        logger.info(f"Terraform plan: {summary.add} to add, {summary.change} to change, "
+                    f"{summary.destroy} to destroy.")
+        return summary
+
+    def output(self, *args, use_cache: bool = True, **kwargs) -> Dict[str, Any]:
+        """
+        Returns the module outputs. Outputs are read from the remote state object with the cloud SDKs, or from
+        the state pulled by Terraform when the backend could not be read, and cached with the state lineage and
+        serial, so that repeated reads do not run Terraform until an apply, destroy or init through TfWrapper could
+        have changed the state.
+
+        :param args: Additional positional arguments for the command, bypass the cache.
+        :param use_cache: Return cached outputs when they are valid.
+        :param kwargs: Additional named arguments for the command, bypass the cache.
+        :return: A dictionary containing the output values.
+        """
+        if args or kwargs or not self.working_dir:
+            return self._output_command(*args, **kwargs)
+
+        result = self.remote_output(use_cache=use_cache)
+        if result is not None:
+            return result
+
+        command = self.tf_command_manager.prepare_terraform_command('state', None, 'pull')
+        logger.info(f"Executing Terraform state pull with command: {command}")
+        # state holds secrets in plain text, so that it is not logged
+        return_code, stdout, stderr = self.run_terraform_command(command, max_lines=None, log_output=False)
+        if return_code != 0:
+            raise self._execution_error(return_code, stdout, stderr)
+
+        try:
+            state = json.loads(stdout) if stdout.strip() else {}
+        except json.JSONDecodeError:
+            logger.error("Failed to parse JSON state from Terraform.")
+            return {}
+
+        result = self._prepare_output(state.get("outputs"))
+        TerraformOutputCache().put(self.working_dir, state.get("lineage"), state.get("serial"), result)
+        return result
+
+    def remote_output(self, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Returns the module outputs without running Terraform: from the cache, or from the state object of the
+        module backend read with the cloud SDKs. Needs neither terraform init nor a Terraform binary.
+
+        :param use_cache: Return cached outputs when they are valid.
+        :return: A dictionary containing the output values, or None when the state could not be read this way.
+        """
+        cache = TerraformOutputCache()
+        if use_cache:
+            cached = cache.get(self.working_dir, self._state_version)
+            if cached is not None:
+                logger.info(f"Using cached Terraform outputs of {self.working_dir}")
+                return cached
+
+        if not TF_REMOTE_STATE_READ:
+            return None
+        backend = TerraformBackend.from_module(self.working_dir)
+        if backend is None or backend.type not in TerraformRemoteStateReader.backends:
+            return None
+        try:
+            state = TerraformRemoteStateReader(self.env).outputs(backend)
+        except Exception as e:
+            logger.warning(f"Could not read {backend.type} state of {self.working_dir}, using Terraform: {e}")
+            return None
+
+        result = self._prepare_output(state.get("outputs"))
+        cache.put(self.working_dir, state.get("lineage"), state.get("serial"), result)
+        return result
+
+    def _state_version(self) -> Optional[Tuple[Optional[str], Optional[int]]]:
+        """
+        Reads the lineage and serial of the current module state without running Terraform: the header of
+        the remote state object, or of the local state file of modules without a backend.
+
+        :return: Lineage and serial, None when they could not be read this way
+        """
+        backend = TerraformBackend.from_module(self.working_dir)
+        if backend is None:
+            state_file = Path(self.working_dir) / "terraform.tfstate"
+            if not state_file.exists():
+                return None
+            with open(state_file, "rb") as infile:
+                state = read_state_keys(iter(lambda: infile.read(TF_STATE_CHUNK_SIZE), b""), TF_STATE_VERSION_KEYS)
+            return state.get("lineage"), state.get("serial")
+
+        if not TF_REMOTE_STATE_READ or backend.type not in TerraformRemoteStateReader.backends:
+            return None
+        try:
+            return TerraformRemoteStateReader(self.env).version(backend)
+        except Exception as e:
+            logger.warning(f"Could not read {backend.type} state version of {self.working_dir}: {e}")
+            return None
+
+    def _output_command(self, *args, **kwargs) -> Dict[str, Any]:
         """
         Executes the Terraform output command and returns the output.
 
@@ -92,9 +776,10 @@ class TfWrapper:
             'output', None, '-json', *args, **kwargs
         )
         logger.info(f"Executing Terraform output with command: {command}")
-        return_code, stdout, stderr = self.run_terraform_command(command)
+        # outputs hold secrets in plain text, so that they are not logged
+        return_code, stdout, stderr = self.run_terraform_command(command, max_lines=None, log_output=False)
         if return_code != 0:
-            raise TerraformExecutionError(return_code, stdout, stderr)
+            raise self._execution_error(return_code, stdout, stderr)
 
         try:
             json_output = json.loads(stdout)
@@ -128,19 +813,28 @@ class TfWrapper:
         :param kwargs: Additional named arguments for the command.
         :return: True if the command was successful, otherwise raises an exception.
         """
+        profile_args, details = self._profile_args()
         command = self.tf_command_manager.prepare_terraform_command(
-            'destroy', variables, '-auto-approve', *args, **kwargs, input=False
+            'destroy', variables, '-auto-approve', '-json', *profile_args, *args, **kwargs, input=False
         )
         logger.info(f"Executing Terraform destroy with command: {command}")
-        return_code, stdout, stderr = self.run_terraform_command(command, track_progress=True)
+        TerraformOutputCache().invalidate(self.working_dir)
+        marker = self._apply_marker()
+        if marker is not None:
+            marker.unlink(missing_ok=True)
+        return_code, stdout, stderr = self.run_terraform_command(command, track_progress=True, details=details)
         if return_code != 0:
-            raise TerraformExecutionError(return_code, stdout, stderr)
+            raise self._execution_error(return_code, stdout, stderr)
         return True
 
     def run_terraform_command(
             self,
             command: list[str],
             track_progress: bool = False,
+            total_operations: int = 0,
+            max_lines: Optional[int] = TF_OUTPUT_BUFFER_LINES,
+            log_output: bool = True,
+            details: Optional[Dict[str, Any]] = None,
     ) -> Tuple[int, str, str]:
         """
         Executes a Terraform command with the option to track its progress. It can use either
@@ -148,112 +842,194 @@ class TfWrapper:
 
         :param command: The Terraform command and arguments as a list.
         :param track_progress: Flag to indicate whether to track progress.
+        :param total_operations: Number of planned operations, read from the command output when 0.
+        :param max_lines: Number of last stdout and stderr lines returned, None returns the whole output.
+        :param log_output: Write the output to the module log file, disable for output with secrets.
+        :param details: Execution profile settings recorded in the timing report.
         :return: Tuple containing the return code of the command, stdout, and stderr.
         """
-        process = self.tf_command_manager.execute_terraform_command(command)
-
-        if track_progress:
-            self.tf_progress_manager.track_progress(process)
-            stdout = self.tf_progress_manager.get_stdout()
-        else:
-            stdout = list(self.tf_command_manager.generate_output(process))
-
-        return_code, stderr = self.tf_command_manager.get_command_result(process)
-        self.tf_command_manager.generate_output()
+        with TimingRecorder().span(f"terraform {command[1]} {self.name}".strip(), "terraform", details) as span:
+            process = self.tf_command_manager.execute_terraform_command(command, max_lines, log_output)
+            lines = self.tf_command_manager.generate_output(process)
+
+            if track_progress:
+                self.tf_progress_manager.track_progress(lines, total_operations)
+                if details is not None:
+                    span["resources"] = len(self.tf_progress_manager.resource_events)
+            else:
+                for _ in lines:
+                    pass
+
+            return_code, stderr = self.tf_command_manager.get_command_result(process)
+            stdout = list(self.tf_command_manager.capture.stdout)
+        if return_code != 0 and '-json' in command:
+            # with -json, errors are reported as diagnostics in stdout
+            errors = [event.message for event in map(TerraformEvent.parse, stdout)
+                      if event is not None and event.kind == TerraformEvent.DIAGNOSTIC and event.severity == "error"]
+            stderr = "\n".join(filter(None, [stderr.strip()] + errors))
         return return_code, ''.join(stdout), stderr
 
+    def _execution_error(self, return_code: int, stdout: str, stderr: str) -> TerraformExecutionError:
+        capture = self.tf_command_manager.capture
+        return TerraformExecutionError(return_code, stdout, stderr, capture.log_file if capture else None)
+
 
 class TerraformProgressBar:
     TF_PROGRESS_BAR_TITTLE = "Terraform Progress"
 
-    def __init__(self):
-        self.saved_output = []
+    def __init__(self, module: str = ""):
+        """
+        :param module: Terraform module name, used to label resource timings.
+        """
+        self.module = module
+        self.resource_events: List[TerraformEvent] = []
 
-    @staticmethod
-    def parse_plan_output(line: str) -> Tuple[int, int, int]:
+    def _consume(self, line: str) -> Optional[TerraformEvent]:
         """
-        Parses a single line of Terraform output to extract the plan summary.
+        Handles the event of an output line of a Terraform command run with -json.
 
         :param line: A single line of output from the Terraform process.
-        :return: A tuple containing the counts of add, change, and destroy operations if the plan summary is found.
+        :return: Parsed event, or None for non-JSON lines.
         """
-        if "Plan:" in line:
-            logger.debug("Plan summary found in output")
-
-            try:
-                # Extract the counts of add, change, and destroy operations
-                parts = line.split(',')
-                add_count = int(parts[0].split()[1])
-                change_count = int(parts[1].split()[0])
-                destroy_count = int(parts[2].split()[0])
-                logger.debug(f"Plan counts - Add: {add_count}, Change: {change_count}, Destroy: {destroy_count}")
-            except (IndexError, ValueError) as e:
-                logger.error(f"Error parsing plan output: {e}")
-                return 0, 0, 0
-
-            return add_count, change_count, destroy_count
-
-        return 0, 0, 0
+        event = TerraformEvent.parse(line)
+        if event is None:
+            logger.debug(f"Reading line: {line.strip()}")
+            return None
 
-    def _monitor_progress(self, process: subprocess.Popen, total_operations: int):
+        logger.debug(f"Terraform {self.module}: {event.message}")
+        if event.kind in (TerraformEvent.COMPLETE, TerraformEvent.ERROR):
+            self.resource_events.append(event)
+            TimingRecorder().add_span(
+                f"{self.module}: {event.address} ({event.action})".strip(),
+                TF_RESOURCE_CATEGORY,
+                event.elapsed,
+                "ok" if event.kind == TerraformEvent.COMPLETE else "error",
+            )
+        return event
+
+    def track_progress(self, lines: Iterable[str], total_operations: int = 0):
         """
-        Updates the progress bar based on the output of the Terraform process.
+        Tracks the progress of a running Terraform process by its JSON event stream and records resource timings.
 
-        :param process: The running Terraform process.
-        :param total_operations: Total number of operations to complete.
+        :param lines: Output lines of the running Terraform process.
+        :param total_operations: Number of planned operations, e.g. of a saved plan, which output has no plan
+                                 summary. Read from the output when 0.
         """
-        completion_keywords = ["Creation complete", "Modifications complete", "Destruction complete"]
+        self.resource_events = []
+        lines = iter(lines)
 
-        with alive_bar(total=total_operations, title=self.TF_PROGRESS_BAR_TITTLE) as bar:
-            for line in iter(process.stdout.readline, ""):
-                self.saved_output.append(line)
-                logger.debug(f"Reading line: {line.strip()}")
+        # Parse the plan summary to determine the total number of operations
+        if total_operations <= 0:
+            for line in lines:
+                event = self._consume(line)
+                if event is not None and event.kind == TerraformEvent.SUMMARY and event.operation == "plan":
+                    total_operations = event.total
+                    break
 
-                if any(keyword in line for keyword in completion_keywords):
-                    bar()
+        if total_operations > 0:
+            with exclusive_progress_bar(total=total_operations, title=self.TF_PROGRESS_BAR_TITTLE) as bar:
+                for line in lines:
+                    event = self._consume(line)
+                    if event is not None and event.kind in (TerraformEvent.COMPLETE, TerraformEvent.ERROR):
+                        bar()
 
-    def track_progress(self, process: subprocess.Popen):
-        """
-        Tracks the progress of a running Terraform process and saves its output.
+        for line in lines:
+            self._consume(line)
 
-        :param process: The running Terraform process.
-        """
-        total_operations = 0
 
-        # Parse the plan output to determine the total number of operations
-        for line in iter(process.stdout.readline, ''):
-            self.saved_output.append(line)
-            logger.debug(f"Reading line during progress tracking: {line.strip()}")
+class TerraformOutputCapture:
+    """
+    Output of a running Terraform command. stderr is drained by a background thread while stdout is consumed,
+    so that a verbose stream could not fill its pipe and block Terraform. Only the last lines of both streams are
+    kept in memory, the whole output is written to a rotating log file of the module.
+    """
 
-            add, change, destroy = self.parse_plan_output(line)
-            total_operations += add + change + destroy
+    def __init__(self, process: subprocess.Popen, name: str, max_lines: Optional[int] = TF_OUTPUT_BUFFER_LINES,
+                 log_output: bool = True):
+        """
+        :param process: Terraform process with piped stdout and stderr.
+        :param name: Name of the log file, e.g. the module name.
+        :param max_lines: Number of last lines kept per stream, None keeps all lines.
+        :param log_output: Write the output to the log file.
+        """
+        self.process = process
+        self.stdout: Deque[str] = deque(maxlen=max_lines)
+        self.stderr: Deque[str] = deque(maxlen=max_lines)
+        self.log_file: Optional[Path] = None
+        self._log = None
+        if log_output:
+            self._log, self.log_file = self._module_log(name)
+            self._log.info(f"$ {' '.join(str(arg) for arg in process.args)}")
+        self._stderr_reader = threading.Thread(target=self._drain_stderr, name=f"tf-stderr-{name}", daemon=True)
+        self._stderr_reader.start()
 
-            if total_operations > 0:
-                break
+    @staticmethod
+    def _module_log(name: str) -> Tuple[logging.Logger, Path]:
+        log_file = LOCAL_TF_LOGS_FOLDER / f"terraform-{name}.log"
+        log = logging.getLogger(f"cgdevx.terraform.{name}")
+        if not log.handlers:
+            os.makedirs(LOCAL_TF_LOGS_FOLDER, exist_ok=True)
+            handler = RotatingFileHandler(log_file, maxBytes=TF_LOG_MAX_BYTES, backupCount=TF_LOG_BACKUP_COUNT)
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            log.addHandler(handler)
+            log.setLevel(logging.INFO)
+            # keep Terraform output off the console
+            log.propagate = False
+        return log, log_file
+
+    def _drain_stderr(self):
+        for line in iter(self.process.stderr.readline, ""):
+            self.stderr.append(line)
+            if self._log:
+                self._log.info(f"stderr: {line.rstrip()}")
+
+    def stdout_lines(self) -> Generator[str, None, None]:
+        """
+        Reads stdout line by line, keeping and logging each line.
 
-        if total_operations > 0:
-            self._monitor_progress(process, total_operations)
+        :yield: Each line of stdout.
+        """
+        for line in iter(self.process.stdout.readline, ""):
+            self.stdout.append(line)
+            if self._log:
+                self._log.info(line.rstrip())
+            yield line
 
-    def get_stdout(self) -> List[str]:
+    def wait(self) -> int:
         """
-        Returns the saved stdout lines.
+        Drains both streams and waits for the process to finish.
 
-        :return: List of saved stdout lines.
+        :return: Return code of the process.
         """
-        return self.saved_output
+        for _ in self.stdout_lines():
+            pass
+        return_code = self.process.wait()
+        self._stderr_reader.join()
+        self.process.stdout.close()
+        self.process.stderr.close()
+        if self._log:
+            self._log.info(f"exit code {return_code}")
+        return return_code
 
 
 class TerraformCommandManager:
-    def __init__(self, terraform_bin_path: str, working_dir: str):
+    def __init__(self, terraform_bin_path: str, working_dir: str, env: Optional[Dict[str, str]] = None,
+                 name: Optional[str] = None):
         self.terraform_bin_path = terraform_bin_path
         self.working_dir = working_dir
+        self.env = env
+        self.name = name
         self.process = None
+        self.capture: Optional[TerraformOutputCapture] = None
 
-    def execute_terraform_command(self, command: list[str]):
+    def execute_terraform_command(self, command: list[str], max_lines: Optional[int] = TF_OUTPUT_BUFFER_LINES,
+                                  log_output: bool = True):
         """
         Runs a Terraform command and initializes a process for further reading its output.
 
         :param command: A list of strings representing the Terraform command and its arguments.
+        :param max_lines: Number of last output lines kept in memory, None keeps the whole output.
+        :param log_output: Write the output to the module log file.
         """
         self.process = subprocess.Popen(
             command,
@@ -262,10 +1038,23 @@ class TerraformCommandManager:
             text=True,
             bufsize=1,
             universal_newlines=True,
-            cwd=self.working_dir
+            cwd=self.working_dir,
+            env=self._prepare_env()
         )
+        name = self.name or (os.path.basename(str(self.working_dir)) if self.working_dir else "terraform")
+        self.capture = TerraformOutputCapture(self.process, name, max_lines, log_output)
         return self.process
 
+    def _prepare_env(self) -> Optional[Dict[str, str]]:
+        """
+        Builds the Terraform process environment. Empty values are skipped, same as `set_envs` does.
+
+        :return: Environment dictionary, or None to inherit the current process environment.
+        """
+        if not self.env:
+            return None
+        return {**os.environ, **{k: str(v) for k, v in self.env.items() if v}}
+
     def generate_output(self, process: Optional[subprocess.Popen] = None) -> Generator[str, None, None]:
         """
         A generator for line-by-line reading of the stdout of a specified or currently running Terraform process.
@@ -281,7 +1070,9 @@ class TerraformCommandManager:
         target_process = process or self.process
 
         # Iterate through each line of the process's stdout and yield it
-        if target_process is not None:
+        if self.capture is not None and self.capture.process is target_process:
+            yield from self.capture.stdout_lines()
+        elif target_process is not None:
             for line in iter(target_process.stdout.readline, ""):
                 yield line
 
@@ -303,9 +1094,13 @@ class TerraformCommandManager:
         if not target_process:
             return None
 
-        # Communicate with the process to retrieve stderr and the return code
-        _, stderr = target_process.communicate()
-        return_code = target_process.returncode
+        # Drain both streams and retrieve the last stderr lines and the return code
+        if self.capture is not None and self.capture.process is target_process:
+            return_code = self.capture.wait()
+            stderr = "".join(self.capture.stderr)
+        else:
+            _, stderr = target_process.communicate()
+            return_code = target_process.returncode
 
         # Reset an internal process if it was used
         if target_process == self.process:
@@ -9,9 +9,12 @@ from git import Repo, GitError, Actor
 
 from common.const.common_path import LOCAL_WORKLOAD_TEMP_FOLDER
 from common.const.const import WL_REPOSITORY_BRANCH, WL_REPOSITORY_URL
-from common.custom_excpetions import RepositoryNotInitializedError
+from common.custom_excpetions import RepositoryNotInitializedError, TemplateRenderError
 from common.logging_config import logger
 from common.tracing_decorator import trace
+from common.utils.git_mirror_cache import GitMirrorCache
+from common.utils.substitution_engine import SubstitutionEngine
+from common.utils.template_renderer import render_tree
 from services.vcs.git_provider_manager import GitProviderManager
 
 
@@ -36,6 +39,7 @@ class WorkloadManager:
         self.wl_repo_folder = LOCAL_WORKLOAD_TEMP_FOLDER / wl_repo_name
         self.template_repo_folder = LOCAL_WORKLOAD_TEMP_FOLDER / self.get_repository_name_from_url(self._template_url)
         self.wl_repo = None
+        self._mirror_cache = GitMirrorCache()
         self.template_repo = None
 
     @property
@@ -64,7 +68,8 @@ class WorkloadManager:
         """
         wl_repo_url = self.repo_manager.get_repository_url(self._git_org_name, self.wl_repo_name)
         self._prepare_clone_folder(folder=self.wl_repo_folder)
-        self.wl_repo = self._clone_repository(url=wl_repo_url, folder=self.wl_repo_folder)
+        # the workload repository is pushed to, so its mirror is always fetched
+        self.wl_repo = self._clone_repository(url=wl_repo_url, folder=self.wl_repo_folder, fetch_interval=0)
         return self.wl_repo_folder
 
     @trace()
@@ -117,6 +122,9 @@ class WorkloadManager:
         except IOError as io_err:
             logger.error(f"I/O error during file processing: {io_err}")
             raise
+        except TemplateRenderError as render_err:
+            logger.error(f"Error during file rendering: {render_err}")
+            raise
 
     @trace()
     def upload(self, author_name: str, author_email: str) -> None:
@@ -184,56 +192,18 @@ class WorkloadManager:
 
     def _replace_placeholders_in_folder(self, folder: Union[str, Path], params: Dict[str, str]) -> None:
         """
-        Replace placeholders in all eligible files within the specified folder.
+        Replace placeholders in all eligible files within the specified folder, files are processed in parallel.
 
         Args:
             folder (Union[str, Path]): Directory containing files to process.
             params (Dict[str, str]): Key-value pairs for placeholder replacement.
-        """
-        logger.debug(f"Scanning folder '{folder}' for files to parameterize.")
-        for root, dirs, files in os.walk(folder):
-            for name in files:
-                if self._is_parametrizable_file(name):
-                    file_path = Path(root) / name
-                    # Process individual file
-                    self._replace_placeholder_in_file(file_path, params)
 
-    @staticmethod
-    def _is_parametrizable_file(file_name: str) -> bool:
+        Raises:
+            TemplateRenderError: If any of the files fails to render, with errors of all failed files.
         """
-        Check if a file is eligible for parameterization based on its extension.
-
-        Args:
-            file_name (str): Name of the file to check.
-
-        Returns:
-            bool: True if the file is eligible for parameterization, False otherwise.
-        """
-        is_parametrizable = file_name.endswith((".tf", ".yaml", ".yml", ".md"))
-        if is_parametrizable:
-            logger.debug(f"File '{file_name}' is eligible for parameterization.")
-        return is_parametrizable
-
-    @staticmethod
-    def _replace_placeholder_in_file(file_path: Path, params: Dict[str, str]) -> None:
-        """
-        Process a single file, replacing placeholders with actual values.
-
-        Args:
-            file_path (Path): Path of the file to process.
-            params (Dict[str, str]): Key-value pairs for placeholder replacement.
-        """
-        with open(file_path, "r") as file:
-            data = file.read()
-
-        # Replace each placeholder in the file
-        for placeholder, value in params.items():
-            data = data.replace(placeholder, value)
-
-        with open(file_path, "w") as file:
-            file.write(data)
-
-        logger.debug(f"File '{file_path}' parameterized successfully.")
+        logger.debug(f"Scanning folder '{folder}' for files to parameterize.")
+        result = render_tree(folder, SubstitutionEngine(params))
+        logger.debug(f"{len(result.changed)} files in '{folder}' parameterized successfully.")
 
     def _remove_git_directory(self) -> None:
         """Removes the .git directory from the template repository folder if it exists."""
@@ -281,15 +251,17 @@ class WorkloadManager:
         os.makedirs(name=folder, exist_ok=True)
         logger.info(f"Folder '{folder}' prepared for cloning.")
 
-    def _clone_repository(self, url: str, folder: Union[str, Path], branch: Optional[str] = None) -> Repo:
+    def _clone_repository(self, url: str, folder: Union[str, Path], branch: Optional[str] = None,
+                          fetch_interval: Optional[int] = None) -> Repo:
         """
-        Clones the repository into the specified folder. If the branch is not specified,
-        clones the default branch.
+        Clones the repository into the specified folder through the local mirror cache. If the branch is not
+        specified, clones the default branch.
 
         Args:
             url (str): URL of the repository to clone.
             folder (Union[str, Path]): Local directory path to clone the repository into.
             branch (Optional[str]): Branch name to clone. If None, the default branch is cloned.
+            fetch_interval (Optional[int]): Max age of the mirror in seconds. If None, the cache default is used.
 
         Returns:
             Repo: The cloned Git repository object.
@@ -299,14 +271,13 @@ class WorkloadManager:
         clone_kwargs = {
             "url": url,
             "to_path": folder,
-            "env": {"GIT_SSH_COMMAND": f"ssh -o StrictHostKeyChecking=no -i {self.ssh_pkey_path}"}
+            "branch": branch,
+            "env": {"GIT_SSH_COMMAND": f"ssh -o StrictHostKeyChecking=no -i {self.ssh_pkey_path}"},
+            "fetch_interval": fetch_interval,
         }
 
-        if branch:
-            clone_kwargs["branch"] = branch
-
         try:
-            repo = Repo.clone_from(**clone_kwargs)
+            repo = self._mirror_cache.clone(**clone_kwargs)
             logger.info("Repository cloned successfully.")
             return repo
         except GitError as e: